@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Times one analysis pass over a single target with the analysis phase run
+sequentially and on the worker pool, against a local stand-in web server
+that adds a fixed latency to every response and echoes the query string
+(so the XSS scanner has something to find).
+
+The per-cycle reachability probe is done before timing starts. The
+speedup is bounded by the slowest single module, since modules run in
+parallel with each other but each one still sends its requests in order.
+
+Also checks that both modes leave identical findings, in identical order,
+in the Knowledge Base.
+
+Usage (from cerebrum_excidium/):
+    python benchmarks/bench_analysis_concurrency.py [--latency-ms 20] [--workers 1 4 8] [--runs 3]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import database as db
+from core.logger import set_level
+from core.module_manager import ModuleManager
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    wbufsize = -1
+    latency = 0.0
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        body = f"<html><body>You searched for {unquote(self.path)}</body></html>".encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def findings(target_id):
+    return [(v['type'], v['description']) for v in db.get_vulnerabilities(target_id)]
+
+def run_pass(manager, host):
+    """Runs one analysis pass against a fresh target; returns (seconds, findings)."""
+    target_id = db.add_target(host)
+    db.add_port_scan_results(target_id, {
+        'ip': '127.0.0.1', 'state': 'up',
+        'protocols': {'tcp': {80: {'state': 'open', 'name': 'http'}}}
+    })
+    manager.begin_cycle()
+    # The reachability probe is a fixed per-pass cost that does not depend
+    # on the worker count; take it outside the timed section
+    manager.reachability.profile(host, target_id)
+    start = time.perf_counter()
+    manager.run_analysis_modules(target_id)
+    elapsed = time.perf_counter() - start
+    result = findings(target_id)
+    db.update_target_status(target_id, 'benchmarked')
+    # Free the hostname for the next pass
+    with db.transaction() as conn:
+        conn.execute("UPDATE targets SET hostname = hostname || '#' || id WHERE id = ?", (target_id,))
+    return elapsed, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--latency-ms', type=float, default=20.0)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 8])
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+
+    set_level('error')
+    db.DB_PATH = os.path.join(tempfile.mkdtemp(), "bench_analysis.db")
+    db.initialize_db()
+
+    Handler.latency = args.latency_ms / 1000
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host = f"127.0.0.1:{server.server_address[1]}"
+
+    print(f"Analysis pass against {host}, {args.latency_ms:.0f} ms per response, {args.runs} runs\n")
+    print(f"{'workers':>7} {'median (s)':>11} {'speedup':>8} {'findings':>9} {'same as sequential':>19}")
+    baseline_time, baseline_findings = None, None
+    for workers in args.workers:
+        manager = ModuleManager(analysis_workers=workers)
+        samples, result = [], None
+        for _ in range(args.runs):
+            elapsed, result = run_pass(manager, host)
+            samples.append(elapsed)
+        manager.shutdown()
+
+        median = statistics.median(samples)
+        if baseline_time is None:
+            baseline_time, baseline_findings = median, result
+        print(f"{workers:>7} {median:>11.2f} {baseline_time / median:>7.1f}x {len(result):>9} "
+              f"{str(result == baseline_findings):>19}")
+
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
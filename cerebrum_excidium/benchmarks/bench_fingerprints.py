@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Fingerprints synthetic responses against a large synthetic signature
+database (plus the shipped one) with the compiled engine, and with the
+substring-check chain the CMS and WAF detectors used before: one `in`
+test over the lower-cased body or headers per signature literal.
+
+Reports compile time, per-response match time for both, and checks that
+both find the same signatures.
+
+Usage (from cerebrum_excidium/):
+    python benchmarks/bench_fingerprints.py [--signatures 1500] [--body-kb 64] [--responses 50]
+"""
+import argparse
+import json
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.fingerprints import DEFAULT_SIGNATURES, FingerprintEngine
+
+WORDS = ["content", "static", "assets", "theme", "plugin", "module", "cdn", "portal", "shop", "cache", "edge", "api"]
+
+def random_literal(rng):
+    return f"{rng.choice(WORDS)}-{''.join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 8)))}"
+
+def build_signatures(n, rng):
+    signatures = []
+    for i in range(n):
+        rules = [{"field": "body", "match": random_literal(rng), "confidence": rng.choice([40, 60, 80])}]
+        if rng.random() < 0.5:
+            rules.append({"field": "header", "header": f"x-{random_literal(rng)}", "confidence": 90})
+        if rng.random() < 0.3:
+            rules.append({"field": "cookie", "match": f"{random_literal(rng)}_", "confidence": 80})
+        if rng.random() < 0.2:
+            rules.append({"field": "meta_generator", "match": random_literal(rng), "confidence": 100})
+        signatures.append({"name": f"tech-{i}", "category": rng.choice(["cms", "waf"]), "rules": rules})
+    return signatures
+
+def build_response(signatures, body_kb, rng):
+    """Filler text with the literals of a few signatures planted in it."""
+    planted = rng.sample(signatures, 8)
+    words = [''.join(rng.choices(string.ascii_lowercase + ' <>/="-', k=rng.randint(2, 12))) for _ in range(body_kb * 120)]
+    headers = {"Server": "nginx", "Content-Type": "text/html"}
+    for signature in planted:
+        for rule in signature["rules"]:
+            if rule["field"] == "body":
+                words.insert(rng.randrange(len(words)), rule["match"].upper())
+            elif rule["field"] == "header":
+                headers[rule["header"]] = "1"
+            elif rule["field"] == "cookie":
+                headers["Set-Cookie"] = f"{rule['match']}abc=1; path=/"
+            elif rule["field"] == "meta_generator":
+                words.insert(0, f'<meta name="generator" content="{rule["match"]}">')
+    return ' '.join(words), headers
+
+def naive_match(signatures, body, headers):
+    """The old approach: lower-case everything, then one substring test per literal."""
+    content = body.lower()
+    header_text = ''.join(f"\n{k}: {v}" for k, v in headers.items()).lower()
+    cookie = str(headers.get("Set-Cookie", "")).lower()
+    generator = content  # the old detectors had no generator parsing; search the body
+    found = set()
+    for signature in signatures:
+        for rule in signature["rules"]:
+            field = rule["field"]
+            if field == "body" and rule["match"] in content:
+                found.add(signature["name"])
+            elif field == "header":
+                lines = [line for line in header_text.split("\n") if line.startswith(f"{rule['header']}:")]
+                if lines and ("match" not in rule or any(rule["match"] in line for line in lines)):
+                    found.add(signature["name"])
+            elif field == "cookie" and rule["match"] in cookie:
+                found.add(signature["name"])
+            elif field == "meta_generator" and rule["match"] in generator:
+                found.add(signature["name"])
+    return found
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--signatures', type=int, default=1500)
+    parser.add_argument('--body-kb', type=int, default=64)
+    parser.add_argument('--responses', type=int, default=50)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    with open(DEFAULT_SIGNATURES) as f:
+        signatures = json.load(f)["signatures"]
+    signatures += build_signatures(args.signatures, rng)
+
+    start = time.perf_counter()
+    engine = FingerprintEngine(signatures)
+    compile_s = time.perf_counter() - start
+    print(f"{len(signatures)} signatures, {engine.rule_count} rules; compiled in {compile_s * 1000:.0f} ms")
+
+    synthetic = signatures[-args.signatures:]
+    responses = [build_response(synthetic, args.body_kb, rng) for _ in range(args.responses)]
+    print(f"{args.responses} responses of ~{args.body_kb} KB, 8 planted signatures each\n")
+
+    start = time.perf_counter()
+    engine_found = [{m.name for m in engine.match(body, headers)} for body, headers in responses]
+    engine_ms = (time.perf_counter() - start) / len(responses) * 1000
+
+    start = time.perf_counter()
+    naive_found = [naive_match(signatures, body, headers) for body, headers in responses]
+    naive_ms = (time.perf_counter() - start) / len(responses) * 1000
+
+    mismatches = sum(1 for a, b in zip(engine_found, naive_found) if a != b)
+    print(f"{'matcher':<18} {'ms/response':>12}")
+    print(f"{'compiled engine':<18} {engine_ms:>12.2f}")
+    print(f"{'substring chain':<18} {naive_ms:>12.2f}")
+    print(f"\nSpeedup: {naive_ms / engine_ms:.1f}x; {mismatches} response(s) with differing results")
+
+if __name__ == "__main__":
+    main()
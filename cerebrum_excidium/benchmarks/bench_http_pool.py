@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Compares bare requests.get() (a new connection per request) with the
+shared pooled HttpClient against a local keep-alive HTTP server, using
+the request pattern of one XSS scan: 7 params x 5 payloads.
+
+The server optionally sleeps before accepting each new connection, to stand
+in for the TCP/TLS handshake cost of a real remote target.
+
+Usage (from cerebrum_excidium/):
+    python benchmarks/bench_http_pool.py [--requests 70] [--handshake-ms 20] [--runs 3]
+"""
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+from core.http_client import HttpClient
+
+BODY = b"<html><body>" + b"x" * 4096 + b"</body></html>"
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # keep-alive
+    wbufsize = -1                   # one write per response, so Nagle does not stall keep-alive
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, *args):
+        pass
+
+
+class CountingServer(ThreadingHTTPServer):
+    daemon_threads = True
+    handshake_delay = 0.0
+    connections = 0
+
+    def get_request(self):
+        conn, addr = super().get_request()
+        self.connections += 1
+        time.sleep(self.handshake_delay)
+        return conn, addr
+
+
+def run_bare(url, n):
+    for i in range(n):
+        requests.get(f"{url}/?q={i}", timeout=5)
+
+def run_pooled(client, url, n):
+    for i in range(n):
+        client.get(f"{url}/?q={i}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=70)
+    parser.add_argument('--handshake-ms', type=float, default=20.0)
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+
+    server = CountingServer(("127.0.0.1", 0), Handler)
+    server.handshake_delay = args.handshake_ms / 1000
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    print(f"{args.requests} GETs per run, {args.handshake_ms:.0f} ms simulated handshake, {args.runs} runs\n")
+    print(f"{'client':<10} {'median (ms)':>12} {'per request (ms)':>17} {'connections':>12}")
+    results = {}
+    for label in ("bare", "pooled"):
+        samples = []
+        server.connections = 0
+        for _ in range(args.runs):
+            client = HttpClient()
+            start = time.perf_counter()
+            if label == "bare":
+                run_bare(url, args.requests)
+            else:
+                run_pooled(client, url, args.requests)
+            samples.append(time.perf_counter() - start)
+            client.close()
+        median = statistics.median(samples) * 1000
+        results[label] = median
+        print(f"{label:<10} {median:>12.1f} {median / args.requests:>17.2f} {server.connections // args.runs:>12}")
+
+    print(f"\nSpeedup: {results['bare'] / results['pooled']:.1f}x")
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Measures Knowledge Base lookup latency before and after the secondary index
+migration, on a scratch database seeded with synthetic rows.
+
+Usage (from cerebrum_excidium/):
+    python benchmarks/bench_kb_indexes.py [--rows 100000] [--repeat 200]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database as db
+import migrations
+
+STATUSES = ['new', 'scanned', 'analysis_complete', 'analyzed_clean', 'compromised', 'scan_failed']
+
+def seed(conn, rows):
+    rng = random.Random(1337)
+    with conn:
+        conn.executemany(
+            "INSERT INTO targets (hostname, status) VALUES (?, ?)",
+            ((f"host{i}.example.com", 'compromised' if i % 1000 == 0 else rng.choice(STATUSES[:4]))
+             for i in range(rows))
+        )
+        conn.executemany(
+            "INSERT INTO vulnerabilities (target_id, type, status) VALUES (?, ?, ?)",
+            ((rng.randint(1, rows), 'REFLECTED_XSS', rng.choice(['potential', 'confirmed', 'failed']))
+             for _ in range(rows * 2))
+        )
+        conn.executemany(
+            "INSERT INTO intelligence (type, source, content) VALUES (?, ?, ?)",
+            (('social_media_profile', 'bench', f"https://github.com/user{i}") for i in range(rows))
+        )
+
+def time_lookups(rows, repeat):
+    rng = random.Random(42)
+    samples = {
+        "get_targets_by_status(['compromised'])": lambda: db.get_targets_by_status(['compromised']),
+        "get_potential_vulnerabilities(id)": lambda: db.get_potential_vulnerabilities(rng.randint(1, rows)),
+        "intelligence duplicate check": lambda: db.get_db_connection().execute(
+            "SELECT id FROM intelligence WHERE content = ? AND type = ?",
+            (f"https://github.com/user{rng.randint(0, rows - 1)}", 'social_media_profile')).fetchone(),
+    }
+    results = {}
+    for name, call in samples.items():
+        start = time.perf_counter()
+        for _ in range(repeat):
+            call()
+        results[name] = (time.perf_counter() - start) / repeat * 1000
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    db.DB_PATH = os.path.join(tempfile.mkdtemp(prefix="kb_bench_"), "bench.db")
+    conn = db.get_db_connection()
+    migrations.migrate(conn, target_version=1)
+    print(f"Seeding {args.rows} targets, {args.rows * 2} vulnerabilities, {args.rows} intelligence rows...")
+    seed(conn, args.rows)
+
+    before = time_lookups(args.rows, args.repeat)
+    migrations.migrate(conn)
+    after = time_lookups(args.rows, args.repeat)
+
+    print(f"\n{'lookup':<42} {'v1 (ms)':>10} {'v' + str(migrations.LATEST_VERSION) + ' (ms)':>10} {'speedup':>9}")
+    for name in before:
+        print(f"{name:<42} {before[name]:>10.3f} {after[name]:>10.3f} {before[name] / after[name]:>8.1f}x")
+
+    db.close_all_connections()
+    os.remove(db.DB_PATH)
+
+if __name__ == "__main__":
+    main()
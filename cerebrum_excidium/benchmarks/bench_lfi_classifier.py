@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Runs the LFI scanner, and the keyword check it used before, against local
+stand-in sites:
+
+  fonts-page     an ordinary page that mentions "fonts" (e.g. a CSS link)
+  echo           echoes the parameter back ("File x not found")
+  passwd-docs    documentation that always shows an /etc/passwd line
+  vulnerable     includes /etc/passwd for 'file' when asked for it
+
+and reports the findings each one records: every finding on the first
+three sites is a false positive, 'vulnerable' should yield exactly one.
+Also times the SimHash of a body of --body-kb KB (averaged over --runs
+hashes) and shows how many bytes a stored baseline takes compared with
+the body itself. --page-words sets the length of the stand-in pages.
+
+Usage (from cerebrum_excidium/):
+    python benchmarks/bench_lfi_classifier.py [--page-words 400] [--body-kb 64] [--runs 20]
+"""
+import argparse
+import os
+import random
+import string
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import database as db
+from core.logger import set_level
+from core.reachability import ReachabilityProfile
+from core.simhash import ResponseFingerprint, simhash
+from core.target_context import TargetContext
+from modules.enabled.analysis.lfi_scanner import LfiScannerModule
+
+PASSWD = "root:x:0:0:root:/root:/bin/bash\ndaemon:x:1:1:daemon:/usr/sbin:/usr/sbin/nologin\n"
+WORDS = ["lorem", "ipsum", "dolor", "sit", "amet", "elit"]
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    wbufsize = -1
+    lorem = ""
+
+    def do_GET(self):
+        site, _, query = self.path.lstrip('/').partition('?')
+        site = site.rstrip('/')
+        params = {k: v[0] for k, v in urllib.parse.parse_qs(query).items()}
+        page = f"<p>{self.lorem}</p>"
+        if site == "fonts-page":
+            page = f'<link href="https://fonts.example/css?family=Sans" rel="stylesheet">{page}'
+        elif site == "echo":
+            page += "".join(f"<p>File {v} not found</p>" for v in params.values())
+        elif site == "passwd-docs":
+            page = f"<h1>Account file format</h1><pre>{PASSWD}</pre>{page}"
+        elif site == "vulnerable" and "etc/passwd" in params.get('file', ''):
+            page = f"<pre>{PASSWD}</pre>{page}"
+        data = f"<html><body>{page}</body></html>".encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+def legacy_scan(scanner, url):
+    """The keyword check the scanner used before baselines."""
+    found = 0
+    for param in scanner.test_params:
+        for payload in scanner.payloads:
+            content = scanner.http.get(f"{url}/?{param}={payload}", timeout=3).text.lower()
+            if "root:x:0:0:" in content or "[extensions]" in content or "fonts" in content:
+                found += 1
+                break
+    return found
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--page-words', type=int, default=400)
+    parser.add_argument('--body-kb', type=int, default=64)
+    parser.add_argument('--runs', type=int, default=20)
+    args = parser.parse_args()
+
+    set_level('error')
+    rng = random.Random(1)
+    Handler.lorem = " ".join(rng.choice(WORDS) for _ in range(args.page_words))
+    db.DB_PATH = os.path.join(tempfile.mkdtemp(), "bench_lfi.db")
+    db.initialize_db()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+
+    scanner = LfiScannerModule()
+    print(f"{'site':<13} {'keyword findings':>17} {'baseline findings':>18}")
+    for site in ("fonts-page", "echo", "passwd-docs", "vulnerable"):
+        host = f"127.0.0.1:{port}/{site}"
+        old = legacy_scan(scanner, f"http://{host}")
+        target_id = db.add_target(host)
+        profile = ReachabilityProfile(host, {'http': {'reachable': True}})
+        scanner.run(TargetContext(db.get_target_by_id(target_id), [], profile))
+        new = len(db.get_vulnerabilities(target_id))
+        print(f"{site:<13} {old:>17} {new:>18}")
+
+    body = ''.join(random.Random(2).choices(string.ascii_lowercase + '      <>/', k=args.body_kb * 1024))
+    start = time.perf_counter()
+    for _ in range(args.runs):
+        simhash(body)
+    per_hash = (time.perf_counter() - start) / args.runs * 1000
+    fingerprint = ResponseFingerprint(200, len(body), simhash(body))
+    print(f"\nSimHash of a {args.body_kb} KB body: {per_hash:.1f} ms; a baseline is "
+          f"{sys.getsizeof(fingerprint) + sys.getsizeof(fingerprint.simhash)} bytes instead of {sys.getsizeof(body):,}")
+
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
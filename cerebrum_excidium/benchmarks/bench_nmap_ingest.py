@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Ingests a synthetic multi-host nmap XML scan into a scratch KB two ways:
+
+  tree      what python-nmap did: parse the whole document, copy it into
+            nested dicts, then hand each host to add_port_scan_results
+  stream    db.ingest_nmap_xml on the gzipped file: one <host> at a time
+
+and reports the time, peak Python memory and port rows stored by each,
+plus the size of the gzipped archive next to the raw XML.
+
+Usage (from cerebrum_excidium/):
+    python benchmarks/bench_nmap_ingest.py [--hosts 2000] [--ports 40]
+"""
+import argparse
+import gzip
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import database as db
+from core.logger import set_level
+from core.nmap_xml import compress
+
+SERVICES = [("ssh", "OpenSSH", "8.9p1"), ("http", "nginx", "1.24.0"), ("https", "nginx", "1.24.0"),
+            ("mysql", "MySQL", "8.0.36"), ("smtp", "Postfix smtpd", "")]
+
+def write_scan(path, hosts, ports):
+    with open(path, 'w') as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n<!DOCTYPE nmaprun>\n'
+                '<nmaprun scanner="nmap" args="nmap -sT -Pn" version="7.94">\n')
+        for h in range(hosts):
+            ip = f"10.{h // 65536 % 256}.{h // 256 % 256}.{h % 256}"
+            f.write(f'<host><status state="up" reason="user-set"/><address addr="{ip}" addrtype="ipv4"/>'
+                    f'<hostnames><hostname name="host{h}.bench.test" type="user"/></hostnames><ports>')
+            for p in range(ports):
+                name, product, version = SERVICES[p % len(SERVICES)]
+                state = "open" if p % 4 else "filtered"
+                f.write(f'<port protocol="tcp" portid="{1000 + p}"><state state="{state}" reason="syn-ack"/>'
+                        f'<service name="{name}" product="{product}" version="{version}" method="probed"/></port>')
+            f.write('</ports></host>\n')
+        f.write('</nmaprun>\n')
+
+def tree_ingest(path):
+    """Whole-document parse into python-nmap style dicts, then add_port_scan_results per host."""
+    with gzip.open(path, 'rb') as f:
+        root = ET.fromstring(f.read())
+    scan = {}
+    for host in root.iter('host'):
+        ip = host.find('address').get('addr')
+        protocols = {}
+        for port in host.iter('port'):
+            service = port.find('service')
+            protocols.setdefault(port.get('protocol'), {})[int(port.get('portid'))] = {
+                'name': service.get('name'), 'product': service.get('product', ''),
+                'version': service.get('version', ''), 'state': port.find('state').get('state')}
+        scan[ip] = {'host': host.find('hostnames/hostname').get('name'), 'ip': ip,
+                    'state': host.find('status').get('state'), 'protocols': protocols}
+    for host in scan.values():
+        db.add_port_scan_results(db.get_target_by_hostname(host['host'])['id'], host)
+
+def fresh_kb(name, hosts):
+    db.DB_PATH = os.path.join(tempfile.mkdtemp(), name)
+    db.initialize_db()
+    db.add_targets_bulk([f"host{h}.bench.test" for h in range(hosts)])
+
+def measure(fn, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    fn(*args)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    rows = db.get_db_connection().execute("SELECT COUNT(*) FROM ports").fetchone()[0]
+    return elapsed, peak, rows
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--hosts', type=int, default=2000)
+    parser.add_argument('--ports', type=int, default=40)
+    args = parser.parse_args()
+    set_level('error')
+
+    xml_path = os.path.join(tempfile.mkdtemp(), "scan.xml")
+    write_scan(xml_path, args.hosts, args.ports)
+    raw_size = os.path.getsize(xml_path)
+    gz_path = compress(xml_path)
+    print(f"{args.hosts} hosts x {args.ports} ports: {raw_size / 1e6:.1f} MB of XML, "
+          f"{os.path.getsize(gz_path) / 1e6:.2f} MB archived\n")
+
+    print(f"{'ingest':<8} {'time':>8} {'peak memory':>12} {'port rows':>10}")
+    for label, fn in (("tree", tree_ingest), ("stream", db.ingest_nmap_xml)):
+        fresh_kb(f"bench_{label}.db", args.hosts)
+        elapsed, peak, rows = measure(fn, gz_path)
+        print(f"{label:<8} {elapsed:>7.2f}s {peak / 1e6:>10.1f}MB {rows:>10,}")
+
+if __name__ == "__main__":
+    main()
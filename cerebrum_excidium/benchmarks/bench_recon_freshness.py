@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Runs the interactive 'scan' of a local stand-in site several times in a row
+and reports, per scan, the requests that reached the server and the
+findings and reachability rows the KB holds afterwards. Scans after the
+first reuse the stored recon results, so they should reach the server
+(almost) never and leave the KB exactly as the first scan did; the script
+exits with status 1 if the finding count changes between scans.
+
+Usage (from cerebrum_excidium/):
+    python benchmarks/bench_recon_freshness.py [--scans 3]
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import database as db
+from core.brain import Brain
+from core.logger import set_level
+
+FOUND = {"/admin/", "/backup/", "/robots.txt/"}
+hits = 0
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    wbufsize = -1
+
+    def do_GET(self):
+        global hits
+        hits += 1
+        status = 200 if self.path == "/" or self.path in FOUND else 404
+        data = b"<html><body>stand-in</body></html>"
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+def count(sql, target_id):
+    return db.get_db_connection().execute(sql, (target_id,)).fetchone()[0]
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--scans', type=int, default=3)
+    args = parser.parse_args()
+    set_level('error')
+    db.DB_PATH = os.path.join(tempfile.mkdtemp(), "bench_freshness.db")
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host = f"127.0.0.1:{server.server_address[1]}"
+
+    brain = Brain(target=None, mode='recon')
+    print(f"{'scan':<5} {'server hits':>12} {'findings':>9} {'reachability rows':>18}")
+    findings = []
+    for scan in range(1, args.scans + 1):
+        global hits
+        hits = 0
+        with contextlib.redirect_stdout(io.StringIO()):
+            brain.interactive_recon(host)
+        target_id = db.get_target_by_hostname(host)['id']
+        findings.append(count("SELECT COUNT(*) FROM vulnerabilities WHERE target_id = ?", target_id))
+        reach = count("SELECT COUNT(*) FROM reachability WHERE target_id = ?", target_id)
+        print(f"{scan:<5} {hits:>12} {findings[-1]:>9} {reach:>18}")
+
+    server.shutdown()
+    if len(set(findings)) != 1:
+        print("\nFinding count changed between scans: stored results were written again.")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Compares the event-driven scheduler with the old fixed-interval loop that
+re-queried the targets table every 5 seconds:
+
+  * idle cost: KB queries issued and CPU time used while there is no work
+  * pickup latency: time from a target being added (in this process, and
+    from another connection standing in for another process) to its recon
+    job starting
+
+Usage (from cerebrum_excidium/):
+    python benchmarks/bench_scheduler.py [--idle 30] [--poll-interval 5]
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import database as db
+from core.logger import set_level
+from core.scheduler import Scheduler
+
+class QueryCounter:
+    """Counts statements run on the calling thread's KB connection."""
+    def __init__(self):
+        self.count = 0
+
+    def attach(self):
+        db.get_db_connection().set_trace_callback(self._trace)
+
+    def _trace(self, statement):
+        self.count += 1
+
+def run_polling(stop, counter, started, interval):
+    """The old Brain.run: look at every phase's targets, then sleep."""
+    counter.attach()
+    while not stop.is_set():
+        for target in db.get_targets_by_status(['new']):
+            started.setdefault(target['hostname'], time.perf_counter())
+            db.update_target_status(target['id'], 'scanned')
+        db.get_targets_by_status(['scanned', 'analysis_complete', 'analyzed_clean'])
+        stop.wait(interval)
+
+def run_scheduler(scheduler, counter, started):
+    counter.attach()
+    def handler(job):
+        target = db.get_target_by_id(job['target_id'])
+        started.setdefault(target['hostname'], time.perf_counter())
+    scheduler.run(handler)
+
+def measure(label, start_worker, stop_worker, idle_seconds):
+    db.DB_PATH = os.path.join(tempfile.mkdtemp(), "bench_scheduler.db")
+    db.initialize_db()
+    counter, started = QueryCounter(), {}
+    worker = start_worker(counter, started)
+    time.sleep(0.5)  # let it settle into its idle state
+
+    queries = counter.count
+    cpu_before = time.process_time()
+    time.sleep(idle_seconds)
+    idle_queries = counter.count - queries
+    idle_cpu = time.process_time() - cpu_before
+
+    added = time.perf_counter()
+    db.add_target("local.example")
+    while "local.example" not in started:
+        time.sleep(0.001)
+    local_latency = started["local.example"] - added
+
+    time.sleep(2)  # idle again, so the external write lands during a backoff
+    other = sqlite3.connect(db.DB_PATH)
+    added = time.perf_counter()
+    other.execute("INSERT INTO targets (hostname) VALUES ('external.example')")
+    other.commit()
+    while "external.example" not in started:
+        time.sleep(0.001)
+    external_latency = started["external.example"] - added
+
+    stop_worker()
+    worker.join()
+    print(f"{label:<22} {idle_queries / idle_seconds:>10.2f} {idle_cpu * 1000:>12.1f} "
+          f"{local_latency * 1000:>14.1f} {external_latency * 1000:>17.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--idle', type=float, default=30.0, help="seconds of idle time to measure")
+    parser.add_argument('--poll-interval', type=float, default=5.0)
+    args = parser.parse_args()
+    set_level('error')
+
+    print(f"Idle period: {args.idle:.0f} s\n")
+    print(f"{'loop':<22} {'queries/s':>10} {'idle CPU ms':>12} {'pickup ms':>14} {'external pickup ms':>17}")
+
+    stop = threading.Event()
+    def start_polling(counter, started):
+        worker = threading.Thread(target=run_polling, args=(stop, counter, started, args.poll_interval))
+        worker.start()
+        return worker
+    measure(f"polling every {args.poll_interval:g} s", start_polling, stop.set, args.idle)
+
+    scheduler = Scheduler(('recon',))
+    def start_scheduler(counter, started):
+        worker = threading.Thread(target=run_scheduler, args=(scheduler, counter, started))
+        worker.start()
+        return worker
+    measure("event-driven", start_scheduler, scheduler.stop, args.idle)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Measures scope lookups against a large synthetic scope: half CIDR blocks
+(/8 to /32), half domain patterns (exact hosts and *.wildcards), plus a
+few percent exclusions. Reports load time and per-lookup cost for IPs and
+hostnames, both in and out of scope, and checks a sample of answers
+against a naive linear scan.
+
+Usage (from cerebrum_excidium/):
+    python benchmarks/bench_scope.py [--entries 100000] [--lookups 50000]
+"""
+import argparse
+import ipaddress
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.scope import Scope, normalize_host
+
+TLDS = ["com", "net", "org", "io", "co.uk"]
+
+def random_domain(rng):
+    return f"{''.join(rng.choices('abcdefghijklmnopqrstuvwxyz', k=rng.randint(4, 10)))}.{rng.choice(TLDS)}"
+
+def build_entries(n, rng):
+    entries = []
+    for _ in range(n // 2):
+        prefix = rng.randint(8, 32)
+        network = ipaddress.ip_network((rng.getrandbits(32), prefix), strict=False)
+        entries.append(str(network))
+    for _ in range(n - n // 2):
+        domain = random_domain(rng)
+        entries.append(f"*.{domain}" if rng.random() < 0.5 else domain)
+    excluded = [f"!{e}" for e in rng.sample(entries, n // 50)]
+    return entries + excluded
+
+def naive_allows(entries, target):
+    """Linear scan over every entry: what the tries replace."""
+    host = normalize_host(target)
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        address = None
+
+    def match(entry):
+        try:
+            network = ipaddress.ip_network(entry, strict=False)
+        except ValueError:
+            if address is not None:
+                return False
+            if entry.startswith('*.'):
+                return host.endswith(entry[1:])
+            return host == entry
+        return address is not None and address.version == network.version and address in network
+
+    includes = [e for e in entries if not e.startswith('!')]
+    excludes = [e[1:] for e in entries if e.startswith('!')]
+    if any(match(e) for e in excludes):
+        return False
+    return any(match(e) for e in includes)
+
+def time_lookups(scope, targets):
+    start = time.perf_counter()
+    hits = sum(1 for t in targets if scope.allows(t))
+    return (time.perf_counter() - start) / len(targets) * 1e6, hits
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--entries', type=int, default=100000)
+    parser.add_argument('--lookups', type=int, default=50000)
+    parser.add_argument('--verify', type=int, default=200, help="lookups to check against the linear scan")
+    args = parser.parse_args()
+
+    rng = random.Random(1337)
+    entries = build_entries(args.entries, rng)
+    domains = [e.lstrip('!*.') for e in entries if not e[-1].isdigit()]
+
+    start = time.perf_counter()
+    # The synthetic hostnames do not exist; skip DNS so only the tries are timed
+    scope = Scope(entries, resolver=lambda host: [])
+    load = time.perf_counter() - start
+    print(f"Loaded {len(entries)} entries ({len(scope.include)} inclusions, {len(scope.exclude)} exclusions) "
+          f"in {load:.2f} s\n")
+
+    samples = {
+        "random IPv4": [str(ipaddress.ip_address(rng.getrandbits(32))) for _ in range(args.lookups)],
+        "listed domains": [rng.choice(domains) for _ in range(args.lookups)],
+        "subdomains": [f"www.{rng.choice(domains)}" for _ in range(args.lookups)],
+        "unlisted hosts": [random_domain(rng) for _ in range(args.lookups)],
+        "URLs": [f"https://api.{rng.choice(domains)}:8443/v1" for _ in range(args.lookups)],
+    }
+    print(f"{'lookup set':<16} {'us/lookup':>10} {'in scope':>9}")
+    for label, targets in samples.items():
+        micros, hits = time_lookups(scope, targets)
+        print(f"{label:<16} {micros:>10.2f} {hits / len(targets):>8.0%}")
+
+    check = [t for targets in samples.values() for t in rng.sample(targets, args.verify // len(samples))]
+    start = time.perf_counter()
+    mismatches = sum(1 for t in check if naive_allows(entries, t) != scope.allows(t))
+    naive = (time.perf_counter() - start) / len(check) * 1e6
+    print(f"\nLinear scan: {naive:,.0f} us/lookup; {len(check)} answers compared, {mismatches} mismatch(es)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Measures cold-start cost of the module manager in fresh interpreters:
+eager loading (import + instantiate every module) versus lazy,
+manifest-driven registration.
+
+Usage (from cerebrum_excidium/):
+    python benchmarks/bench_startup.py [--runs 5]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SNIPPET = """
+import time
+start = time.perf_counter()
+from core.module_manager import ModuleManager
+ModuleManager(lazy={lazy})
+print("{marker}", time.perf_counter() - start)
+"""
+# The timing line is picked out of the child's stdout by this prefix, since
+# the console log (also on stdout, written by a background thread) may
+# interleave with it
+MARKER = "STARTUP_SECONDS"
+
+def cold_start(lazy):
+    """Runs one fresh interpreter and returns (in-process seconds, wall seconds)."""
+    start = time.perf_counter()
+    out = subprocess.run(
+        [sys.executable, "-c", SNIPPET.format(lazy=lazy, marker=MARKER)],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+        env={**os.environ, "CEREBRUM_LOG_LEVEL": "warning"}
+    ).stdout
+    wall = time.perf_counter() - start
+    line = next(line for line in out.splitlines() if line.startswith(MARKER))
+    return float(line.split()[1]), wall
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    # Warm the manifest cache once so lazy runs measure the steady state
+    cold_start(True)
+
+    print(f"{'mode':<8} {'manager median (ms)':>20} {'process median (ms)':>20}")
+    for label, lazy in (("eager", False), ("lazy", True)):
+        samples = [cold_start(lazy) for _ in range(args.runs)]
+        manager = statistics.median(s[0] for s in samples) * 1000
+        wall = statistics.median(s[1] for s in samples) * 1000
+        print(f"{label:<8} {manager:>20.1f} {wall:>20.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Counts the requests the XSS scanner sends to one site, with the old
+every-payload-for-every-parameter loop and with the canary-first scanner,
+against local stand-in sites that reflect:
+
+  nothing   a static page
+  one       only 'q', inside a double-quoted attribute
+  all       every parameter, unencoded, in the page text
+
+Also checks that both find the same vulnerable parameters.
+
+Usage (from cerebrum_excidium/):
+    python benchmarks/bench_xss_requests.py
+"""
+import os
+import sys
+import tempfile
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import database as db
+from core.http_cache import requests_sent
+from core.logger import set_level
+from core.reachability import ReachabilityProfile
+from core.target_context import TargetContext
+from modules.enabled.analysis.xss_scanner import XssScannerModule
+
+SITES = ("nothing", "one", "all")
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    wbufsize = -1
+
+    def do_GET(self):
+        site, _, query = self.path.lstrip('/').partition('?')
+        site = site.rstrip('/')
+        params = urllib.parse.parse_qs(query)
+        if site == "one":
+            value = params.get('q', [''])[0]
+            body = f'<form><input name="q" value="{value}"></form>'
+        elif site == "all":
+            body = "<p>" + " ".join(v[0] for v in params.values()) + "</p>"
+        else:
+            body = "<p>Nothing to see here.</p>"
+        data = f"<html><body>{body}</body></html>".encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+def legacy_scan(scanner, url):
+    """The scanner before canaries: every payload for every parameter until one is reflected."""
+    payloads = ["<script>alert('XSS')</script>", "\" ><script>alert(1)</script>", "<img src=x onerror=alert(1)>",
+                "' onmouseover='alert(1)", "\"><img src=x onerror=alert('Sawyer')>"]
+    found = set()
+    for param in scanner.test_params:
+        for payload in payloads:
+            res = scanner.http.get(f"{url}/?{param}={urllib.parse.quote(payload)}", timeout=3)
+            if payload in res.text:
+                found.add(param)
+                break
+    return found
+
+def vulnerable_params(target_id):
+    return {v['description'].split("'")[1] for v in db.get_vulnerabilities(target_id)}
+
+def main():
+    set_level('error')
+    db.DB_PATH = os.path.join(tempfile.mkdtemp(), "bench_xss.db")
+    db.initialize_db()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+
+    scanner = XssScannerModule()
+    print(f"{'site reflects':<14} {'old requests':>13} {'new requests':>13} {'reduction':>10} {'same findings':>14}")
+    for site in SITES:
+        url = f"http://127.0.0.1:{port}/{site}"
+        sent = requests_sent()
+        old_found = legacy_scan(scanner, url)
+        old_requests = requests_sent() - sent
+
+        # http only, as the reachability profile would report for this server
+        target_id = db.add_target(f"127.0.0.1:{port}/{site}")
+        profile = ReachabilityProfile(f"127.0.0.1:{port}/{site}", {'http': {'reachable': True}})
+        context = TargetContext(db.get_target_by_id(target_id), [], profile)
+        sent = requests_sent()
+        scanner.run(context)
+        # The connectivity check goes through the response cache in real runs
+        new_requests = requests_sent() - sent - 1
+        new_found = vulnerable_params(target_id)
+
+        print(f"{site:<14} {old_requests:>13} {new_requests:>13} {old_requests / max(new_requests, 1):>9.1f}x "
+              f"{str(old_found == new_found):>14}")
+
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -1,185 +1,225 @@
-import time
+import sqlite3
+from core.logger import get_logger
 from core.module_manager import ModuleManager
 from core.report_generator import ReportGenerator
+from core.recon_results import DIR_SCAN, PORT_SCAN, UPTIME
+from core.scheduler import Scheduler
+from core.scope import in_scope
 import database as db
 
-def log_message(level, message):
-    timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
-    print(f"[{timestamp}] [{level.upper()}] {message}")
+logger = get_logger(__name__)
 
 class Brain:
-    def __init__(self, target=None, mode='recon'):
-        log_message("info", "Initializing Cerebrum Excidium AI Core...")
+    def __init__(self, target=None, mode='recon', analysis_workers=None, force_rescan=False):
+        logger.info("Initializing Cerebrum Excidium AI Core...")
         
         self.initial_target = target
         self.mode = mode
+        # Rescan even when stored recon results are still fresh
+        self.force_rescan = force_rescan
         
         # Initialize Database
         db.initialize_db()
-        log_message("info", "Database initialized successfully.")
+        logger.info("Database initialized successfully.")
         
-        # Load Modules
-        self.module_manager = ModuleManager()
-        self.module_manager.load_modules()
+        # Register Modules (each is imported on first use)
+        self.module_manager = ModuleManager(analysis_workers=analysis_workers)
         
         self.reporter = ReportGenerator()
         
-        self.osint_queries_run = set() # Keep track of OSINT queries to avoid repetition
-        log_message("info", "Cerebrum Excidium AI Core is waking up. Knowledge Base and Module Manager are online.")
+        # OSINT seeds already searched, including by earlier runs
+        self.osint_queries_run = db.get_osint_seeds()
+        logger.info("Cerebrum Excidium AI Core is waking up. Knowledge Base and Module Manager are online.")
 
     def run(self):
-        log_message("info", "AI Core is now operational. Beginning operational cycles.")
+        logger.info("AI Core is now operational. Waiting for work.")
+        # Jobs still marked running were cut short by the last shutdown or
+        # crash; their targets' checkpoints let them pick up where they stopped
+        requeued, abandoned = db.requeue_interrupted_jobs()
+        if requeued:
+            logger.info("Resuming %s job(s) interrupted by the last shutdown.", requeued)
+        if abandoned:
+            logger.warning("Gave up on %s job(s) interrupted too many times.", abandoned)
         self.seed_initial_target()
 
-        while self.main_loop():
-            log_message("info", "Cycle complete. Pausing for 5 seconds for reflection...")
-            time.sleep(5)
-            
-        log_message("info", "AI Core has concluded its scheduled operational cycles.")
+        # Work is driven by the KB's job queue: adding a target queues its
+        # recon, a scanned target queues its analysis, and so on.
+        self.scheduler = Scheduler(self.job_kinds())
+        self.scheduler.run(self.handle_job, on_busy=self.begin_cycle)
 
-    def seed_initial_target(self):
-        """Adds the initial seed target to the database if provided."""
-        if self.initial_target and not db.get_target_by_hostname(self.initial_target):
-            log_message("info", f"Seeding initial target {self.initial_target} into Knowledge Base.")
-            db.add_target(hostname=self.initial_target)
-
-    def main_loop(self):
-        log_message("info", "Starting new operational cycle.")
-        
-        # 1. OSINT Phase
-        self.run_osint()
-        
-        # 2. Reconnaissance Phase
-        self.run_reconnaissance()
+        logger.info("AI Core has concluded its scheduled operational cycles.")
 
-        # 3. Target Selection
-        target = self.select_target()
-        if not target:
-            log_message("info", "No actionable targets found for this cycle. Standing by.")
-            # If there's nothing to attack, we can still continue OSINT and Recon
-            return True 
-        
-        log_message("info", f"Selected '{target['hostname']}' (ID: {target['id']}) as current focus target.")
-        
+    def job_kinds(self):
+        """The job kinds this mode works on; 'recon' mode stops after investigation."""
         if self.mode == 'recon':
-            log_message("info", "Mode is 'recon'. Concluding cycle after investigation phase.")
-            return True
+            return ('osint', 'recon')
+        return ('osint', 'recon', 'analysis', 'exploitation')
 
-        # 4. Analysis Phase
-        self.run_analysis(target)
+    def seed_initial_target(self):
+        """Adds the initial seed target to the database if provided, and queues its OSINT."""
+        if not self.initial_target:
+            return
+        if not in_scope(self.initial_target):
+            logger.warning("Initial target %s is outside the engagement scope; not seeding it.", self.initial_target)
+            return
+        if not db.get_target_by_hostname(self.initial_target):
+            logger.info("Seeding initial target %s into Knowledge Base.", self.initial_target)
+            db.add_target(hostname=self.initial_target)
+        if self.initial_target not in self.osint_queries_run:
+            db.enqueue_job('osint', subject=self.initial_target)
 
-        # 5. Exploitation Phase
-        self.run_exploitation(target)
+    def begin_cycle(self):
+        """Starts an operational cycle each time work arrives after a quiet spell."""
+        logger.info("Starting new operational cycle.")
+        self.module_manager.begin_cycle()
 
-        return True
+    def handle_job(self, job):
+        """Runs one job claimed from the queue."""
+        if job['kind'] == 'osint':
+            self.run_osint(job['subject'])
+            return
+
+        target = db.get_target_by_id(job['target_id'])
+        if not target:
+            logger.warning("Job %s (%s) refers to a target that no longer exists.", job['id'], job['kind'])
+            return
 
-    def run_osint(self):
-        """Runs OSINT modules to gather intelligence and discover new targets."""
-        log_message("info", "Entering OSINT Phase.")
-        # Create a query based on the initial target
-        if self.initial_target and self.initial_target not in self.osint_queries_run:
-            query = f"site:*.{self.initial_target} | site:{self.initial_target}"
-            self.module_manager.run_osint_modules(query)
-            self.osint_queries_run.add(self.initial_target)
+        if job['kind'] == 'recon':
+            if target['status'] != 'new':
+                logger.info("%s was already investigated (Status: %s).", target['hostname'], target['status'])
+                return
+            self.run_reconnaissance(target)
+        elif job['kind'] == 'analysis':
+            logger.info("Selected '%s' (ID: %s) as current focus target.", target['hostname'], target['id'])
+            self.run_analysis(target)
+        elif job['kind'] == 'exploitation':
+            self.run_exploitation(target)
         else:
-            log_message("info", "No new OSINT queries to run in this cycle.")
+            logger.warning("Unknown job kind '%s' (job %s).", job['kind'], job['id'])
 
-    def run_reconnaissance(self):
-        log_message("info", "Entering Reconnaissance Phase.")
-        targets_to_scan = db.get_targets_by_status(['new'])
-        if not targets_to_scan:
-            log_message("info", "No new targets require investigation.")
+    def run_osint(self, seed):
+        """Runs OSINT modules to gather intelligence and discover new targets around seed."""
+        logger.info("Entering OSINT Phase.")
+        if seed in self.osint_queries_run:
+            logger.info("OSINT for %s has already been run.", seed)
             return
-            
-        for target in targets_to_scan:
-            log_message("info", f"Investigating new target: {target['hostname']}")
-            scan_results = self.module_manager.run_recon_modules(target['hostname'])
-            
+        query = f"site:*.{seed} | site:{seed}"
+        self.module_manager.run_osint_modules(query)
+        db.record_osint_seed(seed, query)
+        self.osint_queries_run.add(seed)
+
+    def run_reconnaissance(self, target):
+        logger.info("Entering Reconnaissance Phase.")
+        logger.info("Investigating new target: %s", target['hostname'])
+        scan_results = self.module_manager.run_recon_modules(target['hostname'], target['id'], force=self.force_rescan)
+
+        # The results, the status change and dropping the phase's checkpoints
+        # commit together, so a crash or a failed insert leaves either all or
+        # none of them (a failure fails the job, and the checkpoints let the
+        # retry pick up where this pass stopped).
+        # Results reused from the KB are already stored.
+        new_results = [result for result in scan_results if result.age is None]
+        with db.transaction():
             if scan_results:
-                db.add_port_scan_results(target['id'], scan_results)
+                if new_results:
+                    db.store_recon_results(target['id'], new_results)
                 db.update_target_status(target['id'], 'scanned')
-                log_message("info", f"Investigation of {target['hostname']} complete. Results stored in KB.")
             else:
                 db.update_target_status(target['id'], 'scan_failed')
-                log_message("warning", f"Investigation of {target['hostname']} failed.")
+            db.clear_module_checkpoints(target['id'], 'recon')
 
-    def select_target(self):
-        if self.mode == 'recon': return None
-        targets = db.get_targets_by_status(['scanned', 'analysis_complete', 'analyzed_clean'])
-        return targets[0] if targets else None
+        if scan_results:
+            logger.info("Investigation of %s complete. Results stored in KB.", target['hostname'])
+        else:
+            logger.warning("Investigation of %s failed.", target['hostname'])
 
     def run_analysis(self, target):
         target_id = target['id']
         hostname = target['hostname']
-        log_message("info", f"Entering Analysis Phase for {hostname}.")
+        logger.info("Entering Analysis Phase for %s.", hostname)
 
         self.module_manager.run_analysis_modules(target_id)
         
         # Check if any vulns were added
-        if db.get_potential_vulnerabilities(target_id):
-            db.update_target_status(target_id, 'analysis_complete')
-            log_message("info", f"Analysis for {hostname} complete. Potential vulnerabilities were found.")
+        found = bool(db.get_potential_vulnerabilities(target_id))
+        with db.transaction():
+            db.update_target_status(target_id, 'analysis_complete' if found else 'analyzed_clean')
+            db.clear_module_checkpoints(target_id, 'analysis')
+
+        if found:
+            logger.info("Analysis for %s complete. Potential vulnerabilities were found.", hostname)
         else:
-            db.update_target_status(target_id, 'analyzed_clean')
-            log_message("info", f"Analysis for {hostname} complete. No obvious vulnerabilities found.")
+            logger.info("Analysis for %s complete. No obvious vulnerabilities found.", hostname)
 
     def run_exploitation(self, target):
         target_id = target['id']
         hostname = target['hostname']
         if target['status'] != 'analysis_complete':
-            log_message("info", f"Skipping exploitation for {hostname} (Status: {target['status']}).")
+            logger.info("Skipping exploitation for %s (Status: %s).", hostname, target['status'])
             return
 
-        log_message("info", f"Entering Exploitation Phase for {hostname}.")
+        logger.info("Entering Exploitation Phase for %s.", hostname)
         exploit_result = self.module_manager.run_exploitation_modules(target_id)
         
         if exploit_result and exploit_result.get("status") == "success":
-            log_message("critical", f"Target {hostname} has been COMPROMISED.")
+            logger.critical("Target %s has been COMPROMISED.", hostname)
             db.update_target_status(target_id, 'compromised')
         else:
-            log_message("warning", f"Exploitation attempt failed on {hostname}.")
+            logger.warning("Exploitation attempt failed on %s.", hostname)
 
     # --- Interactive Methods for SAINT-JOSEPH Chatbot ---
 
-    def interactive_recon(self, target_hostname):
-        """Manually triggers a recon scan on a specific target."""
+    def interactive_recon(self, target_hostname, force=False):
+        """
+        Manually triggers a recon scan on a specific target. Modules whose
+        last result is still fresh report it from the KB unless force is set.
+        """
+        if not in_scope(target_hostname):
+            print(f"[-] {target_hostname} is outside the engagement scope. Refusing to scan.")
+            return
+
         # Ensure target exists in DB
         existing = db.get_target_by_hostname(target_hostname)
         if not existing:
             db.add_target(hostname=target_hostname)
             existing = db.get_target_by_hostname(target_hostname)
         
-        log_message("info", f"Interactive: Launching Recon on {target_hostname}...")
-        results_list = self.module_manager.run_recon_modules(target_hostname)
-        
+        logger.info("Interactive: Launching Recon on %s...", target_hostname)
+        results_list = self.module_manager.run_recon_modules(target_hostname, existing['id'],
+                                                             force=force or self.force_rescan)
+
+        # Everything the modules found goes into the KB in one transaction,
+        # together with the status change and closing the pass's checkpoints.
+        # Results reused from the KB are already stored and are only shown.
+        new_results = [result for result in results_list if result.age is None]
+        try:
+            with db.transaction():
+                if new_results:
+                    db.store_recon_results(existing['id'], new_results)
+                if any(result.kind == PORT_SCAN for result in results_list):
+                    db.update_target_status(existing['id'], 'scanned')
+                db.clear_module_checkpoints(existing['id'], 'recon')
+        except sqlite3.Error as e:
+            print(f"[-] Could not store the scan results: {e}")
+            return
+
         if results_list:
             scan_count = 0
-            for results in results_list:
-                if 'protocols' in results:
-                    # Nmap Result
-                    db.add_port_scan_results(existing['id'], results)
-                    db.update_target_status(existing['id'], 'scanned')
-                    print(f"[+] Port Scan Complete. Open Ports: {len(results.get('protocols', {}).get('tcp', {}))}")
+            for result in results_list:
+                if result.age is not None:
+                    print(f"[*] {result.module}: stored result from {result.age:.0f}s ago (scan --force to rerun).")
+                if result.kind == PORT_SCAN:
+                    print(f"[+] Port Scan Complete. Open Ports: {len(result.data.get('protocols', {}).get('tcp', {}))}")
                     scan_count += 1
                 
-                elif 'dir_scan' in results:
-                    # Dir Scanner Result
-                    paths = results['dir_scan']
-                    print(f"[+] Directory Scan Complete. Found {len(paths)} paths.")
-                    for p in paths:
+                elif result.kind == DIR_SCAN:
+                    print(f"[+] Directory Scan Complete. Found {len(result.data)} paths.")
+                    for p in result.data:
                         print(f"    - {p['url']} ({p['status']})")
-                        # Add as vulnerability for tracking
-                        db.add_vulnerability(
-                            target_id=existing['id'],
-                            vuln_type="SENSITIVE_DIR",
-                            description=f"Found: {p['url']} ({p['status']})",
-                            severity="info"
-                        )
                     scan_count += 1
 
-                elif 'uptime_scan' in results:
-                    # Uptime Monitor Result
-                    up = results['uptime_scan']
+                elif result.kind == UPTIME:
+                    up = result.data
                     print(f"[+] Uptime Check: {up['status']} (HTTP {up.get('code','N/A')}) - {up['latency_ms']}ms")
                     scan_count += 1
             
@@ -226,10 +266,9 @@ class Brain:
         self.run_exploitation(target)
         print("[+] Attack sequence finished.")
 
-    def print_status(self):
-        """Prints a summary of the Knowledge Base."""
-        conn = db.get_db_connection()
-        cursor = conn.cursor()
+    def print_status(self, perf=False):
+        """Prints a summary of the Knowledge Base, optionally with module timings."""
+        cursor = db.get_db_connection().cursor()
         cursor.execute("SELECT status, COUNT(*) as count FROM targets GROUP BY status")
         stats = cursor.fetchall()
         print("\n--- KNOWLEDGE BASE STATUS ---")
@@ -239,7 +278,27 @@ class Brain:
         cursor.execute("SELECT count(*) as count FROM credentials")
         creds = cursor.fetchone()
         print(f"- LOOT (Credentials): {creds['count']}")
-        conn.close()
+
+        pending = db.count_jobs('pending')
+        if pending:
+            print("- QUEUED JOBS: " + ", ".join(f"{kind} {count}" for kind, count in sorted(pending.items())))
+
+        if perf:
+            self.print_module_perf()
+
+    def print_module_perf(self, window=200):
+        """Prints p50/p95 latency per module over its most recent runs."""
+        stats = db.get_module_run_stats(window)
+        print(f"\n--- MODULE PERFORMANCE (last {window} runs per module) ---")
+        if not stats:
+            print("- No module runs recorded yet.")
+            return
+        print(f"{'module':<32} {'phase':<13} {'runs':>5} {'errors':>6} {'skipped':>7} {'p50 ms':>9} {'p95 ms':>9} {'avg results':>11} {'avg reqs':>8}")
+        for s in stats:
+            p50 = f"{s['p50_ms']:.1f}" if s['p50_ms'] is not None else "-"
+            p95 = f"{s['p95_ms']:.1f}" if s['p95_ms'] is not None else "-"
+            print(f"{s['module'][:32]:<32} {s['phase']:<13} {s['runs']:>5} {s['errors']:>6} {s['skipped']:>7} "
+                  f"{p50:>9} {p95:>9} {s['avg_results']:>11.1f} {s['avg_requests']:>8.1f}")
 
     def toggle_protection(self):
         """Toggles 'Use Tor' / Self-Protection mode."""
@@ -249,10 +308,10 @@ class Brain:
             self.use_tor = False
         
         self.use_tor = not self.use_tor
-        log_message("info", f"Self-Protection (Tor) set to: {self.use_tor}")
+        logger.info("Self-Protection (Tor) set to: %s", self.use_tor)
         return self.use_tor
 
-    def generate_report(self):
-        filename = self.reporter.generate_mission_report()
-        log_message("success", f"Mission Report Generated: {filename}")
+    def generate_report(self, fmt="markdown", incremental=True):
+        filename = self.reporter.generate_report(fmt=fmt, incremental=incremental)
+        logger.success("Mission Report Generated: %s", filename)
         return filename
@@ -0,0 +1,196 @@
+import csv
+import html
+import json
+
+class Exporter:
+    """
+    Base class for report exporters.
+    An exporter receives targets one at a time from db.iter_target_records()
+    and writes each straight to the output file, so exports of any size run
+    in constant memory.
+    """
+    name = None
+    extension = None
+
+    def __init__(self, f):
+        self.f = f
+
+    def begin(self, meta):
+        """Writes anything that precedes the first target. meta holds 'date' and 'total_targets'."""
+        pass
+
+    def write_target(self, target, ports, vulns, creds):
+        raise NotImplementedError("Exporters must implement 'write_target'.")
+
+    def end(self):
+        """Writes anything that follows the last target."""
+        pass
+
+
+class MarkdownExporter(Exporter):
+    name = "markdown"
+    extension = "md"
+
+    def begin(self, meta):
+        self.f.write(f"# SAINT-JOSEPH Mission Report\n")
+        self.f.write(f"**Date**: {meta['date']}\n")
+        self.f.write(f"**Total Targets**: {meta['total_targets']}\n")
+        if meta.get('changed_since'):
+            self.f.write(f"**Changed Since Last Report**: {meta['changed']} target(s) since {meta['changed_since']} UTC\n")
+        self.f.write("\n---\n")
+
+    def write_target(self, target, ports, vulns, creds):
+        self.f.write(self.render_target(target, ports, vulns, creds))
+
+    @staticmethod
+    def render_target(target, ports, vulns, creds):
+        """Renders the Markdown section for a single target."""
+        host = target['hostname']
+        ip = target['ip_address'] or "N/A"
+        status = target['status']
+
+        lines = [
+            f"## Target: {host} ({ip})\n",
+            f"- **Status**: {status}\n",
+        ]
+
+        # Ports
+        if ports:
+            lines.append(f"### Open Ports\n")
+            lines.append("| Port | Protocol | Service | Product | Version |\n")
+            lines.append("|---|---|---|---|---|\n")
+            for p in ports:
+                lines.append(f"| {p['port_number']} | {p['protocol']} | {p['service_name']} | {p['product'] or '-'} | {p['version'] or '-'} |\n")
+            lines.append("\n")
+        else:
+            lines.append("- No open ports found.\n\n")
+
+        # Vulnerabilities
+        if vulns:
+            lines.append(f"### Vulnerabilities\n")
+            for v in vulns:
+                lines.append(f"> [!WARNING] **{v['type']}** ({v['severity'] or 'unrated'}, {v['status']})\n")
+                lines.append(f"> {v['description']}\n>\n")
+            lines.append("\n")
+
+        # Credentials
+        if creds:
+            lines.append(f"### EXFILTRATED CREDENTIALS\n")
+            lines.append("```\n")
+            for c in creds:
+                lines.append(f"Service: {c['service']}\n")
+                lines.append(f"User: {c['username']}\n")
+                lines.append(f"Pass: {c['password']}\n")
+                lines.append("---\n")
+            lines.append("```\n")
+
+        lines.append("\n---\n")
+        return "".join(lines)
+
+
+class JsonLinesExporter(Exporter):
+    """One JSON object per target, with its ports, vulnerabilities and credentials nested."""
+    name = "jsonl"
+    extension = "jsonl"
+
+    def write_target(self, target, ports, vulns, creds):
+        record = dict(target)
+        record['ports'] = [dict(p) for p in ports]
+        record['vulnerabilities'] = [dict(v) for v in vulns]
+        record['credentials'] = [dict(c) for c in creds]
+        self.f.write(json.dumps(record, default=str))
+        self.f.write("\n")
+
+
+class CsvExporter(Exporter):
+    """
+    Flat CSV with one row per target, port, vulnerability and credential.
+    The record_type column says which of the detail columns are filled in.
+    """
+    name = "csv"
+    extension = "csv"
+    columns = [
+        "record_type", "target_id", "hostname", "ip_address", "target_status",
+        "port", "protocol", "service", "product", "version",
+        "vuln_type", "severity", "vuln_status", "description", "tool", "command",
+        "username", "password",
+    ]
+
+    def begin(self, meta):
+        self.writer = csv.DictWriter(self.f, fieldnames=self.columns, extrasaction='ignore')
+        self.writer.writeheader()
+
+    def write_target(self, target, ports, vulns, creds):
+        base = {
+            "target_id": target['id'],
+            "hostname": target['hostname'],
+            "ip_address": target['ip_address'],
+            "target_status": target['status'],
+        }
+        rows = [dict(base, record_type="target")]
+        for p in ports:
+            rows.append(dict(base, record_type="port", port=p['port_number'], protocol=p['protocol'],
+                             service=p['service_name'], product=p['product'], version=p['version']))
+        for v in vulns:
+            rows.append(dict(base, record_type="vulnerability", vuln_type=v['type'], severity=v['severity'],
+                             vuln_status=v['status'], description=v['description'], tool=v['tool'],
+                             command=v['command']))
+        for c in creds:
+            rows.append(dict(base, record_type="credential", service=c['service'],
+                             username=c['username'], password=c['password']))
+        self.writer.writerows(rows)
+
+
+class HtmlExporter(Exporter):
+    """Self-contained HTML page (inline CSS, no external assets)."""
+    name = "html"
+    extension = "html"
+    style = """
+        body { font-family: monospace; background: #111; color: #ddd; margin: 2em; }
+        h1 { color: #a0f; } h2 { color: #c6f; border-bottom: 1px solid #444; }
+        table { border-collapse: collapse; margin: .5em 0; }
+        th, td { border: 1px solid #444; padding: 2px 8px; text-align: left; }
+        .vuln { border-left: 4px solid #e90; padding-left: .5em; margin: .5em 0; }
+        .loot { background: #200; padding: .5em; }
+    """
+
+    def begin(self, meta):
+        self.f.write("<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\">"
+                     "<title>SAINT-JOSEPH Mission Report</title>"
+                     f"<style>{self.style}</style></head><body>\n")
+        self.f.write("<h1>SAINT-JOSEPH Mission Report</h1>\n")
+        self.f.write(f"<p><b>Date</b>: {html.escape(meta['date'])}<br>"
+                     f"<b>Total Targets</b>: {meta['total_targets']}</p>\n")
+
+    def write_target(self, target, ports, vulns, creds):
+        e = lambda value: html.escape(str(value)) if value is not None else "-"
+        parts = [f"<section><h2>Target: {e(target['hostname'])} ({e(target['ip_address'] or 'N/A')})</h2>",
+                 f"<p><b>Status</b>: {e(target['status'])}</p>"]
+        if ports:
+            parts.append("<h3>Open Ports</h3><table><tr><th>Port</th><th>Protocol</th>"
+                         "<th>Service</th><th>Product</th><th>Version</th></tr>")
+            for p in ports:
+                parts.append(f"<tr><td>{e(p['port_number'])}</td><td>{e(p['protocol'])}</td><td>{e(p['service_name'])}</td>"
+                             f"<td>{e(p['product'])}</td><td>{e(p['version'])}</td></tr>")
+            parts.append("</table>")
+        else:
+            parts.append("<p>No open ports found.</p>")
+        if vulns:
+            parts.append("<h3>Vulnerabilities</h3>")
+            for v in vulns:
+                parts.append(f"<div class=\"vuln\"><b>{e(v['type'])}</b> ({e(v['severity'] or 'unrated')}, "
+                             f"{e(v['status'])})<br>{e(v['description'])}</div>")
+        if creds:
+            parts.append("<h3>Exfiltrated Credentials</h3><table class=\"loot\">"
+                         "<tr><th>Service</th><th>User</th><th>Pass</th></tr>")
+            for c in creds:
+                parts.append(f"<tr><td>{e(c['service'])}</td><td>{e(c['username'])}</td><td>{e(c['password'])}</td></tr>")
+            parts.append("</table>")
+        parts.append("</section>\n")
+        self.f.write("".join(parts))
+
+    def end(self):
+        self.f.write("</body></html>\n")
+
+
+EXPORTERS = {cls.name: cls for cls in (MarkdownExporter, JsonLinesExporter, CsvExporter, HtmlExporter)}
@@ -0,0 +1,223 @@
+# Technology fingerprinting shared by the CMS and WAF detectors.
+# Signatures live in a JSON database (fingerprints.json next to this file by
+# default). Each signature names a technology and lists rules; a rule looks
+# for a literal in one field of a response:
+#
+#   {"field": "body", "match": "wp-content/", "confidence": 60}
+#   {"field": "header", "header": "server", "match": "cloudflare", "confidence": 90}
+#   {"field": "header", "header": "cf-ray", "confidence": 90}      (header present)
+#   {"field": "cookie", "match": "visid_incap_", "confidence": 90}
+#   {"field": "meta_generator", "match": "wordpress", "confidence": 100,
+#    "version": "wordpress ([\\d.]+)"}
+#
+# Matching is case-insensitive. The literals of every rule on a field are
+# compiled into one regex shaped like a trie (common prefixes factored out),
+# so each field is scanned once however many signatures there are. A rule's
+# optional "version" regex only runs after its literal has been found.
+#
+# A signature's confidence combines its matched rules as independent
+# evidence: 1 - (1 - c1) * (1 - c2) * ...
+import json
+import os
+import re
+import threading
+from core.logger import get_logger
+
+logger = get_logger(__name__)
+
+FIELDS = ("body", "header", "cookie", "meta_generator")
+DEFAULT_SIGNATURES = os.path.join(os.path.dirname(__file__), "fingerprints.json")
+
+_META_GENERATOR = re.compile(
+    r'<meta[^>]+name=["\']?generator["\']?[^>]*content=["\']([^"\']*)'
+    r'|<meta[^>]+content=["\']([^"\']*)["\'][^>]*name=["\']?generator',
+    re.IGNORECASE)
+
+
+class FingerprintMatch:
+    """One technology found in a response, with the rules that gave it away."""
+    __slots__ = ('name', 'category', 'confidence', 'version', 'evidence')
+
+    def __init__(self, name, category, confidence, version=None, evidence=()):
+        self.name = name
+        self.category = category
+        self.confidence = confidence      # 0-100
+        self.version = version
+        self.evidence = list(evidence)    # "field: literal" of each matched rule
+
+    def __repr__(self):
+        version = f" {self.version}" if self.version else ""
+        return f"FingerprintMatch({self.name}{version!s}, {self.category}, {self.confidence}%)"
+
+
+class _Rule:
+    __slots__ = ('signature', 'field', 'literal', 'header', 'confidence', 'version')
+
+    def __init__(self, signature, field, literal, header, confidence, version):
+        self.signature = signature
+        self.field = field
+        self.literal = literal
+        self.header = header
+        self.confidence = confidence
+        self.version = version
+
+
+def _trie_regex(literals):
+    """
+    Compiles literals into one regex that, at any position, matches the
+    longest literal starting there. Branches are factored on common
+    prefixes, so a position is rejected after looking at one character
+    instead of trying every literal in turn.
+    """
+    trie = {}
+    for literal in literals:
+        node = trie
+        for char in literal:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def emit(node):
+        terminal = '' in node
+        branches = [re.escape(char) + emit(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        # Greedy '?' tries the longer continuation first
+        if terminal:
+            return '(?:' + body + ')?' if len(branches) == 1 else body + '?'
+        return body
+
+    # A lookahead matches at every position without consuming, so literals
+    # that overlap each other are all found
+    return re.compile('(?=(' + emit(trie) + '))', re.DOTALL)
+
+
+class _FieldMatcher:
+    """Every rule literal for one field, matched in one pass."""
+    def __init__(self, rules):
+        self.rules = {}
+        for rule in rules:
+            self.rules.setdefault(rule.literal, []).append(rule)
+        literals = sorted(self.rules)
+        self.pattern = _trie_regex(literals) if literals else None
+        # A literal found at some position means its prefixes are there too
+        literal_set = set(literals)
+        self.prefixes = {
+            literal: [literal[:i] for i in range(1, len(literal)) if literal[:i] in literal_set]
+            for literal in literals
+        }
+
+    def scan(self, text):
+        """Yields (rule, position) for every occurrence of a rule's literal in text."""
+        if self.pattern is None or not text:
+            return
+        for match in self.pattern.finditer(text):
+            longest = match.group(1)
+            for literal in (longest, *self.prefixes[longest]):
+                for rule in self.rules[literal]:
+                    yield rule, match.start()
+
+
+class FingerprintEngine:
+    def __init__(self, signatures):
+        """signatures: the 'signatures' list of a signature database."""
+        self.signatures = {}
+        rules = {field: [] for field in FIELDS}
+        for signature in signatures:
+            name = signature['name']
+            self.signatures[name] = signature.get('category', 'other')
+            for spec in signature.get('rules', ()):
+                field = spec.get('field')
+                if field not in rules:
+                    logger.warning("Signature '%s' has a rule on unknown field '%s'; ignored.", name, field)
+                    continue
+                header = spec.get('header', '').lower() or None
+                literal = spec.get('match', '').lower()
+                if not literal:
+                    if field != 'header' or not header:
+                        logger.warning("Signature '%s' has a %s rule with nothing to match; ignored.", name, field)
+                        continue
+                    # Header presence: the header block has one '\n<name>:' line per header
+                    literal = f"\n{header}:"
+                version = re.compile(spec['version'], re.IGNORECASE) if spec.get('version') else None
+                rules[field].append(_Rule(name, field, literal, header, spec.get('confidence', 50) / 100, version))
+
+        self.rule_count = sum(len(r) for r in rules.values())
+        self._matchers = {field: _FieldMatcher(field_rules) for field, field_rules in rules.items()}
+
+    @classmethod
+    def from_file(cls, path=DEFAULT_SIGNATURES):
+        with open(path) as f:
+            database = json.load(f)
+        engine = cls(database.get('signatures', []))
+        logger.debug("Loaded %d fingerprint signature(s) (%d rules) from %s.",
+                     len(engine.signatures), engine.rule_count, path)
+        return engine
+
+    @staticmethod
+    def fields_of(body='', headers=None):
+        """Splits a response into the lower-cased text of each field."""
+        headers = headers or {}
+        body = body.lower()
+        header_block = ''.join(f"\n{name}: {value}" for name, value in headers.items()).lower()
+        cookie = ''.join(f"\n{value}" for name, value in headers.items() if name.lower() == 'set-cookie').lower()
+        generator = ''
+        if 'generator' in body:
+            generator = '\n'.join(a or b for a, b in _META_GENERATOR.findall(body))
+        return {'body': body, 'header': header_block, 'cookie': cookie, 'meta_generator': generator}
+
+    def match(self, body='', headers=None, category=None):
+        """
+        Fingerprints a response body and its headers. Returns a
+        FingerprintMatch per signature with at least one rule matched,
+        highest confidence first; category limits the result to one kind.
+        """
+        fields = self.fields_of(body, headers)
+        found = {}
+        matched = set()
+        for field, matcher in self._matchers.items():
+            text = fields[field]
+            for rule, position in matcher.scan(text):
+                if rule in matched or (category and self.signatures[rule.signature] != category):
+                    continue
+                if rule.header and not rule.literal.startswith('\n'):
+                    # The literal must sit in the named header's value
+                    line_start = text.rfind('\n', 0, position) + 1
+                    if not text.startswith(f"{rule.header}:", line_start):
+                        continue
+                version = None
+                if rule.version is not None:
+                    version_match = rule.version.search(text)
+                    if version_match is None:
+                        continue
+                    version = version_match.group(1) if version_match.groups() else None
+                matched.add(rule)
+                found.setdefault(rule.signature, []).append((rule, version))
+
+        matches = []
+        for name, hits in found.items():
+            miss = 1.0
+            for rule, _ in hits:
+                miss *= 1 - rule.confidence
+            version = next((v for _, v in hits if v), None)
+            evidence = [f"{rule.field}: {rule.literal.strip()}" for rule, _ in hits]
+            matches.append(FingerprintMatch(name, self.signatures[name], round((1 - miss) * 100), version, evidence))
+        matches.sort(key=lambda m: (-m.confidence, m.name))
+        return matches
+
+    def match_response(self, response, category=None):
+        """match() for a CachedResponse or requests.Response."""
+        return self.match(response.text or '', response.headers, category)
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+def get_fingerprint_engine():
+    """The engine built from the default signature database, shared by every module."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = FingerprintEngine.from_file()
+    return _engine
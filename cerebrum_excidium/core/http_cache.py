@@ -0,0 +1,157 @@
+# Cycle-scoped HTTP response cache shared by every module through the ModuleManager.
+# Several modules fetch the same root URL of a target only to check that it
+# answers or to read its headers; the first fetch is kept here and every
+# later module gets the stored copy instead of going back to the network.
+import threading
+import time
+from collections import OrderedDict
+from core.logger import get_logger
+
+logger = get_logger(__name__)
+
+MAX_ENTRIES = 256
+TTL_SECONDS = 120
+MAX_BODY_CHARS = 256 * 1024
+
+
+# Requests actually sent by the calling thread; cache hits never reach the
+# network and are not counted. Lives here rather than in core.http_client
+# so that reading it does not import requests.
+_sent = threading.local()
+
+def count_request():
+    """Called by the HTTP client for every request it sends."""
+    _sent.count = getattr(_sent, 'count', 0) + 1
+
+def requests_sent():
+    """Running total of requests sent by the calling thread."""
+    return getattr(_sent, 'count', 0)
+
+
+class CachedResponse:
+    """
+    The parts of a response the modules read: status code, headers and the
+    (possibly truncated) body text, plus how long the original fetch took.
+    """
+    __slots__ = ('url', 'status_code', 'headers', 'text', 'truncated', 'elapsed_ms')
+
+    def __init__(self, url, status_code, headers, text, truncated=False, elapsed_ms=0.0):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.text = text
+        self.truncated = truncated
+        self.elapsed_ms = elapsed_ms
+
+    @classmethod
+    def from_response(cls, response, elapsed_ms, max_body=MAX_BODY_CHARS):
+        text = response.text or ""
+        return cls(
+            url=response.url,
+            status_code=response.status_code,
+            headers=response.headers.copy(),
+            text=text[:max_body],
+            truncated=len(text) > max_body,
+            elapsed_ms=elapsed_ms
+        )
+
+
+def cached_get(cache, url, timeout=5):
+    """
+    GETs a URL with the shared HTTP client through the given cache (or a
+    throwaway one when cache is None) and returns a CachedResponse.
+    """
+    # Imported here so that nothing pulls in requests until a fetch happens
+    from core.http_client import get_http_client
+
+    fetcher = lambda: get_http_client().get(url, timeout=timeout)
+    return (cache if cache is not None else ResponseCache(max_entries=1)).get(url, fetcher)
+
+
+class ResponseCache:
+    """
+    LRU cache of responses keyed by (method, URL), with a TTL per entry.
+    Failed fetches are cached too, so a host that times out only costs one
+    timeout per cycle. Concurrent requests for the same key wait for the
+    first one instead of fetching in parallel.
+    """
+    def __init__(self, max_entries=MAX_ENTRIES, ttl=TTL_SECONDS, max_body=MAX_BODY_CHARS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_body = max_body
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()   # key -> (expires_at, CachedResponse or Exception)
+        self._inflight = {}             # key -> lock held while fetching
+        self._lock = threading.Lock()
+
+    def fetch(self, method, url, fetcher):
+        """
+        Returns the cached response for method+URL, calling fetcher() to get
+        it on a miss. Re-raises the cached exception if the fetch failed.
+        """
+        key = (method.upper(), url)
+        found, value = self._lookup(key)
+        if not found:
+            with self._lock:
+                key_lock = self._inflight.setdefault(key, threading.Lock())
+            with key_lock:
+                # Whoever held the lock before us may have filled the entry
+                found, value = self._lookup(key)
+                if not found:
+                    value = self._fetch(url, fetcher)
+                    self._store(key, value)
+            with self._lock:
+                self._inflight.pop(key, None)
+        with self._lock:
+            if found:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        if isinstance(value, Exception):
+            raise value.with_traceback(None)
+        return value
+
+    def get(self, url, fetcher):
+        return self.fetch("GET", url, fetcher)
+
+    def clear(self):
+        """Drops every entry; called at the start of each operational cycle."""
+        with self._lock:
+            if self.hits or self.misses:
+                logger.debug("Response cache: %d hit(s), %d miss(es), %d entries dropped.",
+                             self.hits, self.misses, len(self._entries))
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _fetch(self, url, fetcher):
+        start = time.perf_counter()
+        try:
+            response = fetcher()
+        except Exception as e:
+            return e
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        return CachedResponse.from_response(response, elapsed_ms, self.max_body)
+
+    def _lookup(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] < time.monotonic():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                return False, None
+            self._entries.move_to_end(key)
+            return True, entry[1]
+
+    def _store(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
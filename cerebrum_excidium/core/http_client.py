@@ -0,0 +1,120 @@
+# Shared HTTP client for all modules.
+# Every thread gets its own requests.Session (sessions are not thread-safe),
+# but they all mount the same HTTPAdapter, so the per-host connection pools,
+# and the TCP/TLS handshakes they hold, are reused by every module in a pass.
+import threading
+from http.cookiejar import DefaultCookiePolicy
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from core.http_cache import count_request
+from core.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_TIMEOUT = 5       # seconds, used when a caller does not pass one
+POOL_CONNECTIONS = 32     # hosts whose pools are kept
+POOL_MAXSIZE = 16         # keep-alive connections kept per host
+
+RETRY_WAIT_CAP = 3.0      # seconds; longest wait before a retry, whatever Retry-After asks for
+
+
+class BoundedRetry(Retry):
+    """
+    Retry whose waits are short and bounded: the backoff applies from the
+    first retry on (urllib3 2 retries the first time immediately), and a
+    server's Retry-After is honoured but cut to RETRY_WAIT_CAP, so a
+    rate-limiting host gets its pause while a 503 challenge page asking
+    for minutes cannot stall a module.
+    """
+    def get_backoff_time(self):
+        retries = len([h for h in self.history if h.status is not None or h.error is not None])
+        if not retries:
+            return 0
+        return min(self.backoff_factor * 2 ** (retries - 1), RETRY_WAIT_CAP)
+
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        return None if retry_after is None else min(retry_after, RETRY_WAIT_CAP)
+
+
+def default_retries():
+    """
+    Up to two retries for idempotent requests answered with 429 or a
+    gateway-type failure (502/503/504), after 0.5 s and then 1 s, or after
+    the server's Retry-After capped at RETRY_WAIT_CAP. Connect errors and
+    read timeouts are not retried, so a dead or hanging host costs one
+    timeout rather than two. Worst case per request: one timeout, or three
+    responses and 2 * RETRY_WAIT_CAP seconds of waiting (1.5 s without
+    Retry-After).
+    """
+    return BoundedRetry(
+        total=2,
+        connect=0,
+        read=0,
+        status=2,
+        backoff_factor=0.5,
+        status_forcelist=(429, 502, 503, 504),
+        allowed_methods=frozenset(['GET', 'HEAD', 'OPTIONS']),
+        raise_on_status=False
+    )
+
+
+class HttpClient:
+    """
+    A pooled, keep-alive HTTP client with default timeouts and retries.
+    Mirrors the requests API modules already use (get/head/request).
+    """
+    def __init__(self, timeout=DEFAULT_TIMEOUT, retries=None,
+                 pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE):
+        self.timeout = timeout
+        self.adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=retries if retries is not None else default_retries()
+        )
+        self._local = threading.local()
+
+    @property
+    def session(self):
+        """The calling thread's session."""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            # Like bare requests.get, nothing carries over from one request to the next
+            session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+            session.mount('http://', self.adapter)
+            session.mount('https://', self.adapter)
+            self._local.session = session
+        return session
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        count_request()
+        return self.session.request(method, url, **kwargs)
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def head(self, url, **kwargs):
+        kwargs.setdefault('allow_redirects', False)
+        return self.request('HEAD', url, **kwargs)
+
+    def close(self):
+        """Closes every pooled connection."""
+        self.adapter.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_http_client():
+    """Returns the process-wide client, creating it on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = HttpClient()
+                logger.debug("HTTP client ready (timeout %ss, %d host pools x %d connections).",
+                             DEFAULT_TIMEOUT, POOL_CONNECTIONS, POOL_MAXSIZE)
+    return _client
@@ -0,0 +1,158 @@
+# Logging backend for Cerebrum Excidium.
+# Built on the standard library: callers get per-module loggers whose level
+# check happens before any record is built, records travel through a queue,
+# and a background listener does the formatting and I/O.
+import atexit
+import datetime
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+
+ROOT_LOGGER = "cerebrum"
+SUCCESS = 25
+logging.addLevelName(SUCCESS, "SUCCESS")
+
+LEVELS = {
+    "debug": logging.DEBUG,
+    "info": logging.INFO,
+    "success": SUCCESS,
+    "warning": logging.WARNING,
+    "error": logging.ERROR,
+    "critical": logging.CRITICAL,
+}
+
+CONSOLE_FORMAT = "[%(asctime)s] [%(levelname)s] %(message)s"
+CONSOLE_DATEFMT = "%Y-%m-%d %H:%M:%S"
+
+
+class CerebrumLogger(logging.Logger):
+    """Logger with an extra 'success' level between INFO and WARNING."""
+    def success(self, msg, *args, **kwargs):
+        if self.isEnabledFor(SUCCESS):
+            self._log(SUCCESS, msg, args, **kwargs)
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Formats each record as a single JSON object."""
+    def format(self, record):
+        entry = {
+            "ts": datetime.datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+_lock = threading.Lock()
+_queue = None
+_listener = None
+
+
+def parse_level(level):
+    """Accepts a level name ('debug', 'SUCCESS', ...) or number."""
+    if isinstance(level, int):
+        return level
+    try:
+        return LEVELS[str(level).lower()]
+    except KeyError:
+        raise ValueError(f"Unknown log level '{level}'. Choose from: {', '.join(LEVELS)}")
+
+
+def get_logger(name=ROOT_LOGGER):
+    """
+    Returns the logger for a module, namespaced under 'cerebrum'. Pass
+    __name__ so that levels can be tuned per module or per package.
+    """
+    if name == "__main__":
+        name = ROOT_LOGGER
+    elif name != ROOT_LOGGER and not name.startswith(ROOT_LOGGER + "."):
+        name = f"{ROOT_LOGGER}.{name}"
+
+    if _listener is None:
+        configure_logging()
+
+    with _lock:
+        previous = logging.getLoggerClass()
+        logging.setLoggerClass(CerebrumLogger)
+        try:
+            return logging.getLogger(name)
+        finally:
+            logging.setLoggerClass(previous)
+
+
+def set_level(level, name=ROOT_LOGGER):
+    """Sets the threshold for a logger (and, unless overridden, its children)."""
+    get_logger(name).setLevel(parse_level(level))
+
+
+def configure_logging(level=None, log_file=None, module_levels=None):
+    """
+    (Re)configures the backend. Defaults come from the environment:
+      CEREBRUM_LOG_LEVEL   overall threshold (default 'info')
+      CEREBRUM_LOG_FILE    optional JSON-lines log file
+      CEREBRUM_LOG_LEVELS  per-module overrides, e.g. 'database=warning,modules.enabled.analysis=debug'
+    """
+    global _queue, _listener
+
+    level = level or os.environ.get("CEREBRUM_LOG_LEVEL", "info")
+    log_file = log_file or os.environ.get("CEREBRUM_LOG_FILE")
+    if module_levels is None:
+        module_levels = {}
+        for pair in filter(None, os.environ.get("CEREBRUM_LOG_LEVELS", "").split(",")):
+            module, _, module_level = pair.partition("=")
+            module_levels[module.strip()] = module_level.strip()
+
+    # stdout, like the print-based logger this replaces
+    console = logging.StreamHandler(sys.stdout)
+    console.setFormatter(logging.Formatter(CONSOLE_FORMAT, CONSOLE_DATEFMT))
+    handlers = [console]
+    if log_file:
+        file_handler = logging.FileHandler(log_file, encoding="utf-8")
+        file_handler.setFormatter(JsonLinesFormatter())
+        handlers.append(file_handler)
+
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+        _queue = queue.Queue()
+        _listener = logging.handlers.QueueListener(_queue, *handlers, respect_handler_level=True)
+
+        previous = logging.getLoggerClass()
+        logging.setLoggerClass(CerebrumLogger)
+        try:
+            root = logging.getLogger(ROOT_LOGGER)
+        finally:
+            logging.setLoggerClass(previous)
+        for handler in root.handlers[:]:
+            root.removeHandler(handler)
+        root.addHandler(logging.handlers.QueueHandler(_queue))
+        root.setLevel(parse_level(level))
+        root.propagate = False
+        _listener.start()
+
+    for module, module_level in module_levels.items():
+        set_level(module_level, module)
+
+
+def flush_logs():
+    """Blocks until every queued record has been written."""
+    if _queue is not None:
+        _queue.join()
+
+
+def shutdown_logging():
+    global _listener
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+atexit.register(shutdown_logging)
@@ -1,109 +1,538 @@
-
 import os
+import ast
+import json
 import importlib
 import inspect
-from utils import log_message
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import database as db
+from core.http_cache import ResponseCache, requests_sent
+from core.logger import get_logger
+from core.profiler import profiler
+from core.reachability import CircuitBreaker, ReachabilityTracker
+from core.recon_results import UPTIME, ReconResult
+from core.routing import RoutingIndex
+from core.scope import in_scope
+from core.target_context import TargetContext
 from modules.base_module import ReconModule, AnalysisModule, ExploitationModule, OSINTModule
 
+logger = get_logger(__name__)
+
+MANIFEST_FILE = "module_manifest.json"
+MANIFEST_VERSION = 5
+
+# Class-level attributes copied into the manifest, with their defaults,
+# so the manager can route modules without importing them
+MANIFEST_CLASS_ATTRS = {'http_module': False, 'services': [], 'ports': [], 'result_kind': None, 'freshness_ttl': 0}
+
+# Concurrency per phase. One analysis worker keeps the original
+# one-module-at-a-time behaviour; recon modules (a slow nmap run next to
+# quick HTTP checks) run side by side by default. The per-host limit caps
+# HTTP modules hitting the same host at once. Workers run whole modules,
+# and each module still sends its own requests in order, so a target's
+# pass can never finish faster than its slowest module.
+# Defaults; CEREBRUM_ANALYSIS_WORKERS, CEREBRUM_RECON_WORKERS and
+# CEREBRUM_PER_HOST_LIMIT override them when a manager is built.
+ANALYSIS_WORKERS = 1
+RECON_WORKERS = 4
+PER_HOST_LIMIT = 4
+
+def _env_int(name, default):
+    """A positive integer setting from the environment; default (with a warning) if it is not one."""
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    try:
+        number = int(value)
+        if number < 1:
+            raise ValueError
+    except ValueError:
+        logger.warning("Ignoring %s=%r: expected a positive integer. Using %s.", name, value, default)
+        return default
+    return number
+
+# Phase names as they appear in log messages
+PHASE_LABELS = {'recon': 'recon', 'analysis': 'analysis', 'exploitation': 'exploitation', 'osint': 'OSINT'}
+
+# Base class each module type must subclass, by phase
+PHASE_BASES = {
+    'recon': ReconModule,
+    'analysis': AnalysisModule,
+    'exploitation': ExploitationModule,
+    'osint': OSINTModule,
+}
+
+class LazyModule:
+    """
+    A module known from the manifest. The underlying Python module is only
+    imported, and the class only instantiated, the first time it is used.
+    """
+    def __init__(self, entry, shared=None):
+        self.name = entry['name']
+        self.phase = entry['phase']
+        self.class_path = entry['class_path']
+        self.description = entry['description']
+        for attr, default in MANIFEST_CLASS_ATTRS.items():
+            setattr(self, attr, entry.get(attr, default))
+        self._shared = shared or {}
+        self._run_parameters = None
+        self._instance = None
+        self._error = None
+
+    @property
+    def loaded(self):
+        return self._instance is not None
+
+    @property
+    def instance(self):
+        if self._instance is None:
+            if self._error:
+                raise RuntimeError(f"module previously failed to load: {self._error}")
+            module_name, class_name = self.class_path.rsplit('.', 1)
+            try:
+                cls = getattr(importlib.import_module(module_name), class_name)
+                if not issubclass(cls, PHASE_BASES[self.phase]):
+                    raise TypeError(f"{class_name} is not a {PHASE_BASES[self.phase].__name__}")
+                self._instance = cls()
+                for attr, value in self._shared.items():
+                    setattr(self._instance, attr, value)
+            except Exception as e:
+                self._error = str(e)
+                logger.error("Failed to load module %s: %s", module_name, e)
+                raise
+            logger.info("Successfully loaded %s module: %s", self.phase.capitalize(), self._instance.name)
+        return self._instance
+
+    def run(self, **kwargs):
+        instance = self.instance
+        if self._run_parameters is None:
+            self._run_parameters = frozenset(inspect.signature(instance.run).parameters)
+        if 'context' in kwargs and 'context' not in self._run_parameters:
+            # Modules written before TargetContext take the bare target ID
+            kwargs['target_id'] = kwargs.pop('context').target_id
+        return instance.run(**kwargs)
+
+    def __getattr__(self, attr):
+        # Anything not described by the manifest comes from the real module
+        if attr.startswith('_'):
+            raise AttributeError(attr)
+        return getattr(self.instance, attr)
+
+
 class ModuleManager:
-    def __init__(self, module_path='modules.enabled'):
+    def __init__(self, module_path='modules.enabled', lazy=True, analysis_workers=None, per_host_limit=None,
+                 recon_workers=None):
         self.module_path = module_path
+        self.lazy = lazy
+        self.analysis_workers = max(1, analysis_workers or _env_int("CEREBRUM_ANALYSIS_WORKERS", ANALYSIS_WORKERS))
+        self.recon_workers = max(1, recon_workers or _env_int("CEREBRUM_RECON_WORKERS", RECON_WORKERS))
+        self.per_host_limit = max(1, per_host_limit or _env_int("CEREBRUM_PER_HOST_LIMIT", PER_HOST_LIMIT))
+        self._executors = {}
+        self._host_slots = {}
+        self._host_slots_lock = threading.Lock()
+        self.response_cache = ResponseCache()
+        self.circuit_breaker = CircuitBreaker()
+        self.reachability = ReachabilityTracker(self.response_cache, self.circuit_breaker)
         self.recon_modules = []
         self.analysis_modules = []
         self.exploitation_modules = []
         self.osint_modules = []
+        self.analysis_routes = RoutingIndex([])
         self.load_modules()
 
     def load_modules(self):
         """
-        Dynamically discovers and loads all modules from the enabled modules directory.
+        Registers every enabled module from the cached manifest. Modules are
+        imported on first use unless the manager was created with lazy=False.
         """
-        log_message("info", "Module Manager is discovering and loading all enabled modules...")
+        logger.info("Module Manager is discovering all enabled modules...")
         base_path = self.module_path.replace('.', '/')
-        
+
+        self.recon_modules, self.analysis_modules = [], []
+        self.exploitation_modules, self.osint_modules = [], []
+
         if not os.path.exists(base_path):
-            log_message("warning", f"Module directory not found at '{base_path}'. No modules will be loaded.")
+            logger.warning("Module directory not found at '%s'. No modules will be loaded.", base_path)
             return
 
-        for module_type in ['recon', 'analysis', 'exploitation', 'osint']:
-            module_dir = os.path.join(base_path, module_type)
+        for entry in self._load_manifest(base_path):
+            module = LazyModule(entry, {
+                'response_cache': self.response_cache,
+                'circuit_breaker': self.circuit_breaker,
+            })
+            getattr(self, f"{module.phase}_modules").append(module)
+            if not self.lazy:
+                self._load_and_instantiate(module)
+        self.analysis_routes = RoutingIndex(self.analysis_modules)
+
+        logger.info("Registered %s recon, %s analysis, %s exploitation, and %s OSINT module(s).",
+                    len(self.recon_modules), len(self.analysis_modules),
+                    len(self.exploitation_modules), len(self.osint_modules))
+
+    def all_modules(self):
+        return self.recon_modules + self.analysis_modules + self.exploitation_modules + self.osint_modules
+
+    def preload(self):
+        """Imports and instantiates every registered module now."""
+        for module in self.all_modules():
+            self._load_and_instantiate(module)
+
+    def _load_and_instantiate(self, module):
+        try:
+            with profiler.timed('plugin', module.name):
+                return module.instance
+        except Exception:
+            # Already logged; the module stays registered but will not run
+            return None
+
+    # --- MANIFEST ---
+
+    def _source_files(self, base_path):
+        """Yields (phase, filename, path) for every candidate module file."""
+        for phase in PHASE_BASES:
+            module_dir = os.path.join(base_path, phase)
             try:
-                for filename in os.listdir(module_dir):
-                    if filename.endswith('.py') and not filename.startswith('__'):
-                        module_name = f"{self.module_path}.{module_type}.{filename[:-3]}"
-                        self._load_and_instantiate(module_name, module_type)
+                filenames = sorted(os.listdir(module_dir))
             except FileNotFoundError:
-                log_message("debug", f"No '{module_type}' modules found or directory is missing.")
+                logger.debug("No '%s' modules found or directory is missing.", phase)
+                continue
+            for filename in filenames:
+                if filename.endswith('.py') and not filename.startswith('__'):
+                    yield phase, filename, os.path.join(module_dir, filename)
+
+    def _load_manifest(self, base_path):
+        """
+        Returns the manifest entries, rebuilding the cached manifest file if
+        any module source was added, removed or modified since it was written.
+        """
+        manifest_path = os.path.join(base_path, MANIFEST_FILE)
+        sources = {}
+        for _, _, path in self._source_files(base_path):
+            stat = os.stat(path)
+            sources[path] = [stat.st_mtime_ns, stat.st_size]
+
+        try:
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+            if manifest.get('version') == MANIFEST_VERSION and manifest.get('sources') == sources:
+                return manifest['modules']
+        except (OSError, ValueError):
+            pass
+
+        logger.info("Module manifest is missing or stale. Rebuilding it from module sources...")
+        entries = []
+        for phase, filename, path in self._source_files(base_path):
+            module_name = f"{self.module_path}.{phase}.{filename[:-3]}"
+            try:
+                entries.extend(self._describe_module(path, module_name, phase))
+            except (OSError, SyntaxError) as e:
+                logger.error("Failed to read module %s: %s", module_name, e)
+
+        try:
+            with open(manifest_path, 'w') as f:
+                json.dump({'version': MANIFEST_VERSION, 'sources': sources, 'modules': entries}, f, indent=2)
+        except OSError as e:
+            logger.debug("Could not write module manifest to %s: %s", manifest_path, e)
+        return entries
+
+    def _describe_module(self, path, module_name, phase):
+        """
+        Reads a module's source without importing it and returns a manifest
+        entry for every class that directly subclasses the phase's base class.
+        Name and description come from the literal 'self.name = ...' and
+        'self.description = ...' assignments in __init__; the attributes in
+        MANIFEST_CLASS_ATTRS from literal assignments in the class body.
+        """
+        with open(path) as f:
+            tree = ast.parse(f.read(), filename=path)
+
+        base_name = PHASE_BASES[phase].__name__
+        entries = []
+        for node in tree.body:
+            if not isinstance(node, ast.ClassDef):
+                continue
+            bases = {b.id if isinstance(b, ast.Name) else getattr(b, 'attr', None) for b in node.bases}
+            if base_name not in bases:
+                continue
+
+            attrs = {}
+            class_attrs = dict(MANIFEST_CLASS_ATTRS)
+            for item in node.body:
+                if (isinstance(item, ast.Assign) and len(item.targets) == 1
+                        and isinstance(item.targets[0], ast.Name)
+                        and item.targets[0].id in MANIFEST_CLASS_ATTRS):
+                    try:
+                        class_attrs[item.targets[0].id] = ast.literal_eval(item.value)
+                    except ValueError:
+                        logger.warning("%s.%s is not a literal; using the default.", node.name, item.targets[0].id)
+                if isinstance(item, ast.FunctionDef) and item.name == '__init__':
+                    for stmt in ast.walk(item):
+                        if (isinstance(stmt, ast.Assign) and len(stmt.targets) == 1
+                                and isinstance(stmt.targets[0], ast.Attribute)
+                                and isinstance(stmt.targets[0].value, ast.Name)
+                                and stmt.targets[0].value.id == 'self'
+                                and isinstance(stmt.value, ast.Constant)):
+                            attrs[stmt.targets[0].attr] = stmt.value.value
 
-        log_message("info", f"Loaded {len(self.recon_modules)} recon, {len(self.analysis_modules)} analysis, "
-                            f"{len(self.exploitation_modules)} exploitation, and {len(self.osint_modules)} OSINT module(s).")
+            entries.append({
+                'name': attrs.get('name', node.name),
+                'phase': phase,
+                'class_path': f"{module_name}.{node.name}",
+                'description': attrs.get('description', ''),
+                **class_attrs,
+            })
+        return entries
 
-    def _load_and_instantiate(self, module_name, module_type):
+    # --- EXECUTION ---
+
+    def begin_cycle(self):
+        """
+        Starts a new operational cycle: responses cached and reachability
+        profiles built by the last one are dropped.
+        """
+        self.response_cache.clear()
+        self.reachability.begin_cycle()
+
+    def _skip(self, module, phase, subject, reason):
+        """Records a module that was not run against this subject."""
+        logger.info("Skipping %s module %s: %s.", PHASE_LABELS[phase], module.name, reason)
+        db.record_module_run(module=module.name, phase=phase, subject=subject, status='skipped', wall_ms=0)
+
+    def _resume(self, modules, done, phase, subject):
+        """Drops the modules checkpointed as done in this phase; returns the rest."""
+        pending = []
+        for module in modules:
+            if module.name in done:
+                self._skip(module, phase, subject, "already completed before the last restart")
+            else:
+                pending.append(module)
+        return pending
+
+    def _http_profile(self, modules, hostname, target_id=None):
+        """Probes the host once if any of the modules needs HTTP; returns its profile or None."""
+        if hostname and any(module.http_module for module in modules):
+            return self.reachability.profile(hostname, target_id)
+        return None
+
+    def _invoke(self, module, phase, subject, checkpoint=None, **kwargs):
+        """
+        Runs one module with the same error isolation as before, and records
+        its wall time, error count, result size and the HTTP requests it sent
+        in the KB. With a target ID as checkpoint, a successful run (for
+        recon, one that returned a result) is also checkpointed so a restart
+        does not repeat it.
+        """
+        result = None
+        error_count = 0
+        sent_before = requests_sent()
+        start = time.perf_counter()
         try:
-            module = importlib.import_module(module_name)
-            base_classes = {ReconModule, AnalysisModule, ExploitationModule, OSINTModule}
-            
-            for name, cls in inspect.getmembers(module, inspect.isclass):
-                if cls in base_classes: continue # Skip the base classes themselves
-
-                if module_type == 'recon' and issubclass(cls, ReconModule):
-                    instance = cls()
-                    self.recon_modules.append(instance)
-                    log_message("info", f"Successfully loaded Recon module: {instance.name}")
-                elif module_type == 'analysis' and issubclass(cls, AnalysisModule):
-                    instance = cls()
-                    self.analysis_modules.append(instance)
-                    log_message("info", f"Successfully loaded Analysis module: {instance.name}")
-                elif module_type == 'exploitation' and issubclass(cls, ExploitationModule):
-                    instance = cls()
-                    self.exploitation_modules.append(instance)
-                    log_message("info", f"Successfully loaded Exploitation module: {instance.name}")
-                elif module_type == 'osint' and issubclass(cls, OSINTModule):
-                    instance = cls()
-                    self.osint_modules.append(instance)
-                    log_message("info", f"Successfully loaded OSINT module: {instance.name}")
+            result = module.run(**kwargs)
         except Exception as e:
-            log_message("error", f"Failed to load module {module_name}: {e}")
+            error_count = 1
+            logger.error("Error running %s module %s: %s", PHASE_LABELS[phase], module.name, e)
+        wall_ms = (time.perf_counter() - start) * 1000
+        db.record_module_run(
+            module=module.name,
+            phase=phase,
+            subject=subject,
+            status='error' if error_count else 'ok',
+            wall_ms=wall_ms,
+            error_count=error_count,
+            result_size=_result_size(result),
+            request_count=requests_sent() - sent_before
+        )
+        if checkpoint is not None and not error_count:
+            # Recon results are only stored once the whole phase has run;
+            # keep them with the checkpoint until then. A recon module that
+            # returned nothing soft-failed and is left to run again on resume.
+            if phase != 'recon' or result is not None:
+                db.save_module_checkpoint(checkpoint, phase, module.name, result if phase == 'recon' else None)
+            # A None result is a soft failure (nmap missing, DNS failed...);
+            # reusing it would suppress the module until the TTL ran out
+            if phase == 'recon' and module.freshness_ttl and result is not None:
+                db.save_recon_freshness(checkpoint, module.name, result, module.freshness_ttl)
+        return result
+
+    def _slots_for(self, host):
+        """The semaphore capping concurrent HTTP modules against one host."""
+        with self._host_slots_lock:
+            slots = self._host_slots.get(host)
+            if slots is None:
+                slots = self._host_slots[host] = threading.BoundedSemaphore(self.per_host_limit)
+            return slots
+
+    def _run_concurrently(self, modules, phase, subject, host, **kwargs):
+        """
+        Runs modules on the worker pool and returns their results in module
+        order. Each module's KB writes are queued on its worker and applied
+        here, in module order, so the KB ends up as after a sequential run.
+        """
+        executor = self._executors.get(phase)
+        if executor is None:
+            executor = self._executors[phase] = ThreadPoolExecutor(
+                max_workers=getattr(self, f"{phase}_workers"), thread_name_prefix=f"{phase}-worker")
+        host_slots = self._slots_for(host.lower())
+
+        def task(module):
+            with db.deferred_writes() as writes:
+                if module.http_module:
+                    with host_slots:
+                        result = self._invoke(module, phase, subject, **kwargs)
+                else:
+                    result = self._invoke(module, phase, subject, **kwargs)
+            return result, writes
+
+        futures = [executor.submit(task, module) for module in modules]
+        results = []
+        for future in futures:
+            result, writes = future.result()
+            db.apply_writes(writes)
+            results.append(result)
+        return results
+
+    def shutdown(self):
+        """Stops the worker pools, if any were started."""
+        for executor in self._executors.values():
+            executor.shutdown(wait=True)
+        self._executors.clear()
+
+    def _check_scope(self, phase, host):
+        """Last line of defence: hosts that left the scope after being added are not touched."""
+        if in_scope(host):
+            return True
+        logger.warning("Not running %s modules against out-of-scope target %s.", PHASE_LABELS[phase], host)
+        return False
 
     def run_osint_modules(self, query):
         """
-        Runs all loaded OSINT modules with a given query.
+        Runs all loaded OSINT modules with a given query. Queries are search
+        strings rather than hosts, so scope is enforced on what they find:
+        out-of-scope hosts never make it into the targets table.
         """
-        log_message("info", f"Running {len(self.osint_modules)} OSINT module(s) for query: '{query}'.")
+        logger.info("Running %s OSINT module(s) for query: '%s'.", len(self.osint_modules), query)
         for module in self.osint_modules:
-            try:
-                module.run(query=query)
-            except Exception as e:
-                log_message("error", f"Error running OSINT module {module.name}: {e}")
+            self._invoke(module, 'osint', query, query=query)
+
+    def run_recon_modules(self, target_hostname, target_id=None, force=False):
+        """
+        Runs the recon modules against a hostname, side by side when there
+        are workers for it, and returns their non-empty results as
+        ReconResult envelopes in module order. Given the target's ID, each
+        finished module is checkpointed, and modules that finished before a
+        restart contribute their stored result instead of running again.
+        So do modules whose last result is younger than their freshness_ttl,
+        unless force is set.
+        """
+        if not self._check_scope('recon', target_hostname):
+            return []
+        done = db.get_module_checkpoints(target_id, 'recon') if target_id is not None else {}
+        pending = self._resume(self.recon_modules, done, 'recon', target_hostname)
+
+        fresh = {}
+        if target_id is not None and not force:
+            stored = db.get_fresh_recon_results(target_id)
+            for module in list(pending):
+                if module.freshness_ttl and module.name in stored:
+                    fresh[module.name] = stored[module.name]
+                    pending.remove(module)
+                    self._skip(module, 'recon', target_hostname, f"its result from {stored[module.name][1]:.0f}s ago "
+                                                                 f"is still fresh (TTL {module.freshness_ttl}s)")
+
+        logger.info("Running %s recon module(s) against %s.", len(pending), target_hostname)
+        profile = self._http_profile(pending, target_hostname)
+        runnable = []
+        for module in pending:
+            if module.http_module and profile and not profile.any_up:
+                self._skip(module, 'recon', target_hostname, f"{target_hostname} answers on neither HTTP nor HTTPS")
+                continue
+            runnable.append(module)
+
+        if self.recon_workers > 1 and len(runnable) > 1:
+            results = self._run_concurrently(runnable, 'recon', target_hostname, target_hostname,
+                                             checkpoint=target_id, target_hostname=target_hostname)
+        else:
+            results = [self._invoke(module, 'recon', target_hostname, checkpoint=target_id,
+                                    target_hostname=target_hostname)
+                       for module in runnable]
+        results_by_module = dict(done)
+        results_by_module.update((module.name, result) for module, result in zip(runnable, results))
+        results_by_module.update((name, result) for name, (result, _) in fresh.items())
 
-    def run_recon_modules(self, target_hostname):
         all_results = []
-        log_message("info", f"Running {len(self.recon_modules)} recon module(s) against {target_hostname}.")
         for module in self.recon_modules:
-            try:
-                result = module.run(target_hostname=target_hostname)
-                if result:
-                    all_results.append(result)
-            except Exception as e:
-                log_message("error", f"Error running recon module {module.name}: {e}")
+            result = results_by_module.get(module.name)
+            if not result:
+                continue
+            age = fresh[module.name][1] if module.name in fresh else None
+            envelope = ReconResult.wrap(module.name, module.result_kind, result, age)
+            all_results.append(envelope)
+            # The Uptime Monitor checks both schemes; keep this cycle's profile
+            # in step with it (the KB copy is written with the other results)
+            if envelope.kind == UPTIME and envelope.data.get('schemes'):
+                self.reachability.update(target_hostname, envelope.data['schemes'], persist=False)
         return all_results
 
     def run_analysis_modules(self, target_id):
-        log_message("info", f"Running {len(self.analysis_modules)} analysis module(s) against target ID {target_id}.")
-        for module in self.analysis_modules:
-            try:
-                module.run(target_id=target_id)
-            except Exception as e:
-                log_message("error", f"Error running analysis module {module.name}: {e}")
+        logger.info("Running %s analysis module(s) against target ID %s.", len(self.analysis_modules), target_id)
+        # One read of the target and its ports, shared by every module
+        context = TargetContext.load(target_id, response_cache=self.response_cache)
+        if context is None:
+            logger.error("Analysis aborted: could not find target with ID %s in KB.", target_id)
+            return
+        if not self._check_scope('analysis', context.hostname):
+            return
+
+        # Modules that do not consume any service the target exposes are
+        # dropped before anything touches the network
+        modules, not_applicable = self.analysis_routes.route(self.analysis_modules, context.ports)
+        for module in not_applicable:
+            self._skip(module, 'analysis', target_id, f"no matching service open on {context.hostname}")
+
+        modules = self._resume(modules, db.get_module_checkpoints(target_id, 'analysis'), 'analysis', target_id)
+        profile = self._http_profile(modules, context.hostname, target_id)
+        if profile is not None:
+            context = TargetContext(context.target, context.ports, profile, self.response_cache)
+
+        runnable = []
+        for module in modules:
+            if module.http_module and profile and not profile.any_up:
+                self._skip(module, 'analysis', target_id, f"{context.hostname} answers on neither HTTP nor HTTPS")
+                continue
+            runnable.append(module)
+
+        if self.analysis_workers > 1 and len(runnable) > 1:
+            self._run_concurrently(runnable, 'analysis', target_id, context.hostname,
+                                   checkpoint=target_id, context=context)
+        else:
+            for module in runnable:
+                self._invoke(module, 'analysis', target_id, checkpoint=target_id, context=context)
 
     def run_exploitation_modules(self, target_id):
-        log_message("info", f"Running {len(self.exploitation_modules)} exploitation module(s) against target ID {target_id}.")
+        target = db.get_target_by_id(target_id)
+        if target and not self._check_scope('exploitation', target['hostname']):
+            return {"status": "failure", "reason": "out_of_scope"}
+        logger.info("Running %s exploitation module(s) against target ID %s.",
+                    len(self.exploitation_modules), target_id)
         for module in self.exploitation_modules:
-            try:
-                result = module.run(target_id=target_id)
-                if result and result.get("status") == "success":
-                    log_message("critical", f"Exploitation module {module.name} reported SUCCESS.")
-                    return result
-            except Exception as e:
-                log_message("error", f"Error running exploitation module {module.name}: {e}")
+            result = self._invoke(module, 'exploitation', target_id, target_id=target_id)
+            if result and result.get("status") == "success":
+                logger.critical("Exploitation module %s reported SUCCESS.", module.name)
+                return result
         return {"status": "failure", "reason": "all_modules_failed"}
+
+
+def _result_size(result):
+    """
+    Counts the records in a module result: items of lists, dicts that hold
+    only scalars (one record each), or 1 for any other non-empty value.
+    """
+    if result is None:
+        return 0
+    if isinstance(result, (list, tuple, set)):
+        return sum(_result_size(item) for item in result)
+    if isinstance(result, dict):
+        nested = [v for v in result.values() if isinstance(v, (dict, list, tuple, set))]
+        return sum(_result_size(v) for v in nested) if nested else 1
+    return 1
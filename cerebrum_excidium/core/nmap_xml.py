@@ -0,0 +1,98 @@
+# Streaming reader for nmap's XML output, and the archive the raw scans are kept in.
+# nmap writes its XML (-oX) to a file under ARCHIVE_DIR, which is gzipped once
+# the scan ends. Hosts are read back one <host> element at a time and each
+# element is dropped once it has been turned into a dict, so a scan file with
+# thousands of hosts never sits in memory as a whole tree. Archived scans can
+# be ingested again later (main.py --ingest-nmap) without rescanning.
+import gzip
+import os
+import re
+import shutil
+import time
+import xml.etree.ElementTree as ET
+
+ARCHIVE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scans", "nmap")
+
+_UNSAFE = re.compile(r"[^\w.-]")
+
+
+def archive_path(hostname):
+    """A fresh path under ARCHIVE_DIR for nmap to write a scan of hostname to."""
+    os.makedirs(ARCHIVE_DIR, exist_ok=True)
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    return os.path.join(ARCHIVE_DIR, f"{_UNSAFE.sub('_', hostname)}_{stamp}_{os.getpid()}.xml")
+
+
+def compress(path):
+    """Gzips a finished scan file in place of the original; returns the new path."""
+    packed = path + ".gz"
+    # Written under a name archived_scans() ignores until it is complete
+    with open(path, 'rb') as src, gzip.open(packed + ".part", 'wb') as dst:
+        shutil.copyfileobj(src, dst)
+    os.replace(packed + ".part", packed)
+    os.remove(path)
+    return packed
+
+
+def archived_scans(path=None):
+    """The scan files in a directory (default ARCHIVE_DIR), oldest first; a file path is returned as is."""
+    path = path or ARCHIVE_DIR
+    if not os.path.isdir(path):
+        return [path]
+    scans = [os.path.join(path, n) for n in os.listdir(path) if n.endswith((".xml", ".xml.gz"))]
+    return sorted(scans, key=os.path.getmtime)
+
+
+def _open(path):
+    return gzip.open(path, 'rb') if path.endswith(".gz") else open(path, 'rb')
+
+
+def iter_hosts(path, open_only=True):
+    """
+    Yields one dict per <host> in an nmap XML file (plain or gzipped), in
+    the PORT_SCAN result shape plus the host's DNS names:
+    {'host', 'hostnames', 'ip', 'state', 'protocols': {proto: {port: {...}}}}.
+    Only open ports are included unless open_only is False.
+    """
+    with _open(path) as f:
+        events = ET.iterparse(f, events=('start', 'end'))
+        _, root = next(events)
+        for event, elem in events:
+            if event == 'end' and elem.tag == 'host':
+                yield _host(elem, open_only)
+                # Drop the finished host (and anything before it) from the tree
+                root.clear()
+
+
+def _host(elem, open_only):
+    ip = None
+    for address in elem.iter('address'):
+        if address.get('addrtype') in ('ipv4', 'ipv6'):
+            ip = address.get('addr')
+            break
+    hostnames = [h.get('name') for h in elem.iter('hostname') if h.get('name')]
+    status = elem.find('status')
+
+    protocols = {}
+    for port in elem.iter('port'):
+        state = port.find('state')
+        port_state = state.get('state') if state is not None else 'unknown'
+        if open_only and port_state != 'open':
+            continue
+        service = port.find('service')
+        service = service.attrib if service is not None else {}
+        protocols.setdefault(port.get('protocol'), {})[int(port.get('portid'))] = {
+            "name": service.get('name', 'unknown'),
+            "product": service.get('product', ''),
+            "version": service.get('version', ''),
+            "state": port_state,
+            "reason": state.get('reason', 'unknown') if state is not None else 'unknown'
+        }
+
+    return {
+        "host": hostnames[0] if hostnames else ip,
+        "hostnames": hostnames,
+        "ip": ip,
+        "state": status.get('state') if status is not None else 'unknown',
+        "protocols": protocols
+    }
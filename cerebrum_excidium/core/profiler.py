@@ -0,0 +1,103 @@
+# Startup profiler for the Cerebrum Excidium entry points.
+# Only uses the standard library so it can be enabled before anything else is imported.
+import sys
+import time
+from contextlib import contextmanager
+from importlib.abc import Loader, MetaPathFinder
+
+class _TimedLoader(Loader):
+    """Wraps a module loader and records how long executing the module takes."""
+    def __init__(self, loader, fullname, profiler):
+        self._loader = loader
+        self._fullname = fullname
+        self._profiler = profiler
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        with self._profiler.timed('import', self._fullname):
+            self._loader.exec_module(module)
+
+    def __getattr__(self, attr):
+        return getattr(self._loader, attr)
+
+
+class _ImportTimer(MetaPathFinder):
+    """Meta path hook that hands every found module spec a timing loader."""
+    def __init__(self, profiler):
+        self._profiler = profiler
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+        if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+            spec.loader = _TimedLoader(spec.loader, fullname, self._profiler)
+        return spec
+
+
+class StartupProfiler:
+    """
+    Collects timings for module imports, plugin construction and database
+    initialization, and prints them as a ranked table. Does nothing until
+    enable() is called.
+    """
+    def __init__(self):
+        self.enabled = False
+        self.records = []   # (category, name, self seconds, total seconds)
+        self._stack = []    # child time accumulated by each open timer
+        self._started = None
+
+    def enable(self):
+        if self.enabled:
+            return
+        self.enabled = True
+        self._started = time.perf_counter()
+        sys.meta_path.insert(0, _ImportTimer(self))
+
+    @contextmanager
+    def timed(self, category, name):
+        """Times the enclosed block. Nested timers are subtracted from self time."""
+        if not self.enabled:
+            yield
+            return
+        self._stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            total = time.perf_counter() - start
+            children = self._stack.pop()
+            if self._stack:
+                self._stack[-1] += total
+            self.records.append((category, name, total - children, total))
+
+    def report(self, limit=25):
+        """Prints the slowest entries by self time, plus totals per category."""
+        if not self.enabled:
+            return
+        elapsed = time.perf_counter() - self._started
+        ranked = sorted(self.records, key=lambda r: r[2], reverse=True)
+
+        print("\n=== STARTUP PROFILE ===")
+        print(f"{'#':>3}  {'category':<10} {'name':<52} {'self ms':>9} {'total ms':>9}")
+        for rank, (category, name, own, total) in enumerate(ranked[:limit], 1):
+            print(f"{rank:>3}  {category:<10} {name[:52]:<52} {own * 1000:>9.1f} {total * 1000:>9.1f}")
+
+        print("\n--- By category (self time) ---")
+        totals = {}
+        for category, _, own, _ in self.records:
+            count, seconds = totals.get(category, (0, 0.0))
+            totals[category] = (count + 1, seconds + own)
+        for category, (count, seconds) in sorted(totals.items(), key=lambda kv: kv[1][1], reverse=True):
+            print(f"- {category:<10} {count:>4} entries {seconds * 1000:>9.1f} ms")
+        print(f"\nTime since profiler enabled: {elapsed * 1000:.1f} ms")
+        print("=======================")
+
+profiler = StartupProfiler()
@@ -0,0 +1,163 @@
+# Per-target reachability profiles and the dead-host circuit breaker.
+# Each target is probed on both URL schemes once per cycle (through the shared
+# response cache, so the probe doubles as every module's root request), the
+# result is stored in the KB, and schemes that did not answer are tripped in
+# the circuit breaker so HTTP modules give up on them without waiting out
+# their own timeouts.
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+import database as db
+from core.http_cache import cached_get
+from core.logger import get_logger
+
+logger = get_logger(__name__)
+
+SCHEMES = ("http", "https")
+PROBE_TIMEOUT = 3       # seconds per scheme; both schemes are probed in parallel
+PROFILE_TTL = 300       # seconds a profile is reused when no new cycle has started
+BREAKER_COOLDOWN = 300  # seconds before a tripped scheme is tried again
+
+
+class CircuitOpenError(ConnectionError):
+    """Raised instead of sending a request to a scheme known to be down."""
+
+
+class CircuitBreaker:
+    """
+    Tracks (scheme, host) pairs that failed their reachability probe. An open
+    circuit closes again after BREAKER_COOLDOWN seconds, or as soon as a probe
+    sees the scheme answer.
+    """
+    def __init__(self, cooldown=BREAKER_COOLDOWN):
+        self.cooldown = cooldown
+        self._open = {}     # (scheme, host) -> monotonic time the circuit opened
+        self._lock = threading.Lock()
+
+    def trip(self, scheme, host):
+        with self._lock:
+            self._open[(scheme, host.lower())] = time.monotonic()
+
+    def reset(self, scheme, host):
+        with self._lock:
+            self._open.pop((scheme, host.lower()), None)
+
+    def is_open(self, url):
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.netloc.lower())
+        with self._lock:
+            opened = self._open.get(key)
+            if opened is None:
+                return False
+            if time.monotonic() - opened > self.cooldown:
+                del self._open[key]
+                return False
+            return True
+
+    def check(self, url):
+        if self.is_open(url):
+            raise CircuitOpenError(f"circuit open for {url}: scheme did not answer its last probe")
+
+
+class ReachabilityProfile:
+    """Which schemes of a host answer, with status code and round-trip time of each."""
+    __slots__ = ('hostname', 'schemes', 'checked_at')
+
+    def __init__(self, hostname, schemes, checked_at=None):
+        self.hostname = hostname
+        self.schemes = schemes      # scheme -> {'reachable', 'status_code', 'rtt_ms', 'error'}
+        self.checked_at = checked_at if checked_at is not None else time.monotonic()
+
+    def is_up(self, scheme):
+        return bool(self.schemes.get(scheme, {}).get('reachable'))
+
+    @property
+    def up_schemes(self):
+        return tuple(scheme for scheme in SCHEMES if self.is_up(scheme))
+
+    @property
+    def any_up(self):
+        return bool(self.up_schemes)
+
+    def __repr__(self):
+        return f"ReachabilityProfile({self.hostname!r}, up={self.up_schemes})"
+
+
+def probe_scheme(hostname, scheme, cache=None, timeout=PROBE_TIMEOUT):
+    """
+    GETs scheme://hostname and returns its reachability entry. Any HTTP
+    response counts as reachable, 5xx included: a WAF or CDN answering with
+    a 503 challenge page is up, and is exactly what the WAF and CMS
+    detectors are for. Only connect errors and timeouts make a scheme
+    unreachable and trip the circuit breaker.
+    """
+    try:
+        res = cached_get(cache, f"{scheme}://{hostname}", timeout)
+    except Exception as e:
+        return {'reachable': False, 'status_code': None, 'rtt_ms': None, 'error': str(e)[:200]}
+    return {
+        'reachable': True,
+        'status_code': res.status_code,
+        'rtt_ms': round(res.elapsed_ms, 2),
+        'error': None,
+    }
+
+
+class ReachabilityTracker:
+    """
+    Owned by the ModuleManager. Hands out one profile per host per cycle,
+    persists it, and keeps the circuit breaker in line with it.
+    """
+    def __init__(self, response_cache, breaker):
+        self.response_cache = response_cache
+        self.breaker = breaker
+        self._profiles = {}
+        self._lock = threading.Lock()
+
+    def begin_cycle(self):
+        with self._lock:
+            self._profiles.clear()
+
+    def profile(self, hostname, target_id=None):
+        """Returns this cycle's profile of hostname, probing it the first time."""
+        key = hostname.lower()
+        with self._lock:
+            profile = self._profiles.get(key)
+            if profile is not None and time.monotonic() - profile.checked_at < PROFILE_TTL:
+                return profile
+
+        with ThreadPoolExecutor(max_workers=len(SCHEMES)) as pool:
+            results = pool.map(lambda scheme: probe_scheme(hostname, scheme, self.response_cache), SCHEMES)
+            schemes = dict(zip(SCHEMES, results))
+        return self.update(hostname, schemes, target_id)
+
+    def update(self, hostname, schemes, target_id=None, persist=True):
+        """
+        Records probe results for some or all schemes of a host (from the
+        probe above or from the Uptime Monitor) and returns the new profile.
+        With persist=False the KB is left to the caller.
+        """
+        key = hostname.lower()
+        with self._lock:
+            previous = self._profiles.get(key)
+            merged = dict(previous.schemes) if previous is not None else {}
+            merged.update(schemes)
+            profile = self._profiles[key] = ReachabilityProfile(hostname, merged)
+
+        for scheme, result in schemes.items():
+            if result['reachable']:
+                self.breaker.reset(scheme, hostname)
+            else:
+                self.breaker.trip(scheme, hostname)
+
+        if persist:
+            if target_id is None:
+                target = db.get_target_by_hostname(hostname)
+                target_id = target['id'] if target else None
+            if target_id is not None:
+                db.save_reachability(target_id, schemes)
+
+        logger.debug("Reachability of %s: %s", hostname,
+                     ", ".join(f"{s}={'up' if r['reachable'] else 'down'}" for s, r in merged.items()))
+        return profile
@@ -0,0 +1,41 @@
+# Typed envelopes for recon module output.
+# Each recon module declares the kind of result it returns (class attribute
+# 'result_kind'); the manager wraps whatever the module returns in a
+# ReconResult, and consumers dispatch on .kind instead of probing dict keys.
+
+PORT_SCAN = "port_scan"   # data: {'host', 'ip', 'state', 'protocols': {proto: {port: {...}}}, 'xml': archived scan}
+DIR_SCAN = "dir_scan"     # data: [{'url', 'status'}, ...]
+UPTIME = "uptime"         # data: {'status', 'code', 'latency_ms', 'url', 'schemes': {...}}
+
+KINDS = (PORT_SCAN, DIR_SCAN, UPTIME)
+
+# Top-level keys used by recon modules written before result_kind existed
+_LEGACY_KEYS = {'protocols': PORT_SCAN, 'dir_scan': DIR_SCAN, 'uptime_scan': UPTIME}
+
+
+class ReconResult:
+    __slots__ = ('module', 'kind', 'data', 'age')
+
+    def __init__(self, module, kind, data, age=None):
+        self.module = module
+        self.kind = kind
+        self.data = data
+        self.age = age      # seconds, for results reused from the KB; None if just produced
+
+    @classmethod
+    def wrap(cls, module_name, kind, result, age=None):
+        """
+        Wraps a module's return value. Modules without a result_kind get the
+        kind of their legacy result shape, with the old wrapper key removed.
+        """
+        if kind is None and isinstance(result, dict):
+            for key, legacy_kind in _LEGACY_KEYS.items():
+                if key in result:
+                    kind = legacy_kind
+                    if key != 'protocols':
+                        result = result[key]
+                    break
+        return cls(module_name, kind or "unknown", result, age)
+
+    def __repr__(self):
+        return f"ReconResult({self.module!r}, {self.kind!r})"
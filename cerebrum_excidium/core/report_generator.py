@@ -1,6 +1,13 @@
 import database as db
 import datetime
 import os
+from core.exporters import EXPORTERS, MarkdownExporter
+
+# Bump whenever MarkdownExporter.render_target's output changes, so cached sections rebuild.
+SECTION_FORMAT = "1"
+WATERMARK_KEY = "mission_report.watermark"
+FORMAT_KEY = "mission_report.section_format"
+SECTION_BATCH = 500
 
 class ReportGenerator:
     def __init__(self):
@@ -8,63 +15,85 @@ class ReportGenerator:
         if not os.path.exists(self.output_dir):
             os.makedirs(self.output_dir)
 
-    def generate_mission_report(self):
+    def generate_mission_report(self, incremental=True):
         """
         Generates a full report of all targets and findings in the database.
+
+        Each target's section is rendered once and cached in the KB. In
+        incremental mode only targets whose updated_at moved past the last
+        report's watermark are re-rendered; the report itself is then
+        assembled by streaming the cached sections.
         """
         timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
         filename = f"{self.output_dir}/mission_report_{timestamp}.md"
-        
-        targets = db.get_all_targets()
-        
+
+        since, changed = self._refresh_sections(incremental)
+
         with open(filename, "w") as f:
-            f.write(f"# SAINT-JOSEPH Mission Report\n")
-            f.write(f"**Date**: {timestamp}\n")
-            f.write(f"**Total Targets**: {len(targets)}\n")
-            f.write("\n---\n")
-            
-            for target in targets:
-                t_id = target['id']
-                host = target['hostname']
-                ip = target['ip_address'] or "N/A"
-                status = target['status']
-                
-                f.write(f"## Target: {host} ({ip})\n")
-                f.write(f"- **Status**: {status}\n")
-                
-                # Ports
-                ports = db.get_ports_by_target(t_id)
-                if ports:
-                    f.write(f"### Open Ports\n")
-                    f.write("| Port | Protocol | Service | Product | Version |\n")
-                    f.write("|---|---|---|---|---|\n")
-                    for p in ports:
-                        f.write(f"| {p['port_number']} | {p['protocol']} | {p['service_name']} | {p['product'] or '-'} | {p['version'] or '-'} |\n")
-                    f.write("\n")
-                else:
-                    f.write("- No open ports found.\n\n")
-                
-                # Vulnerabilities
-                vulns = db.get_vulnerabilities(t_id)
-                if vulns:
-                    f.write(f"### Vulnerabilities\n")
-                    for v in vulns:
-                        f.write(f"> [!WARNING] **{v['vuln_type']}** ({v['severity']})\n")
-                        f.write(f"> {v['description']}\n>\n")
-                    f.write("\n")
-                
-                # Credentials
-                creds = db.get_credentials(t_id)
-                if creds:
-                    f.write(f"### EXFILTRATED CREDENTIALS\n")
-                    f.write("```\n")
-                    for c in creds:
-                         f.write(f"Service: {c['service']}\n")
-                         f.write(f"User: {c['username']}\n")
-                         f.write(f"Pass: {c['password']}\n")
-                         f.write("---\n")
-                    f.write("```\n")
-                
-                f.write("\n---\n")
-        
+            MarkdownExporter(f).begin({
+                'date': timestamp,
+                'total_targets': db.count_targets(),
+                'changed_since': since,
+                'changed': changed,
+            })
+            for section in db.iter_report_sections():
+                f.write(section)
+
         return filename
+
+    def generate_report(self, fmt="markdown", incremental=True):
+        """Generates a report in the given format ('markdown', 'jsonl', 'csv' or 'html')."""
+        if fmt == "markdown":
+            return self.generate_mission_report(incremental=incremental)
+        return self.export(fmt)
+
+    def export(self, fmt):
+        """
+        Streams the whole KB through the named exporter into a new file and
+        returns its path.
+        """
+        if fmt not in EXPORTERS:
+            raise ValueError(f"Unknown report format '{fmt}'. Choose from: {', '.join(EXPORTERS)}")
+        exporter_cls = EXPORTERS[fmt]
+
+        timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        filename = f"{self.output_dir}/mission_report_{timestamp}.{exporter_cls.extension}"
+
+        # newline='' lets the csv module control line endings itself
+        with open(filename, "w", encoding="utf-8", newline="") as f:
+            exporter = exporter_cls(f)
+            exporter.begin({'date': timestamp, 'total_targets': db.count_targets()})
+            for target, ports, vulns, creds in db.iter_target_records():
+                exporter.write_target(target, ports, vulns, creds)
+            exporter.end()
+
+        return filename
+
+    def _refresh_sections(self, incremental):
+        """
+        Re-renders the cached sections of every target changed since the last
+        report (or all of them). Returns (since, number of sections rendered),
+        where since is None for a full rebuild.
+        """
+        # Taken before reading, so changes made while rendering are picked
+        # up again next time rather than missed.
+        watermark = db.get_kb_timestamp()
+        since = db.get_meta(WATERMARK_KEY) if incremental else None
+        if since is None or db.get_meta(FORMAT_KEY) != SECTION_FORMAT:
+            since = None
+            db.clear_report_sections()
+
+        changed = 0
+        batch = []
+        for target, ports, vulns, creds in db.iter_target_records(since=since):
+            batch.append((target['id'], MarkdownExporter.render_target(target, ports, vulns, creds)))
+            changed += 1
+            if len(batch) >= SECTION_BATCH:
+                db.save_report_sections(batch)
+                batch = []
+        if batch:
+            db.save_report_sections(batch)
+
+        db.set_meta(WATERMARK_KEY, watermark)
+        db.set_meta(FORMAT_KEY, SECTION_FORMAT)
+        return since, changed
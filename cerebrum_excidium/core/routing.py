@@ -0,0 +1,56 @@
+# Routing of analysis modules by the services they consume.
+# Modules declare the nmap service names and/or port numbers they work on
+# (class attributes 'services' and 'ports', copied into the module manifest),
+# and the index below maps a target's open ports to the modules that apply,
+# without importing a module or querying anything.
+
+
+class RoutingIndex:
+    """
+    Built once from the registered modules. Modules that declare neither
+    services nor ports apply to every target.
+    """
+    def __init__(self, modules):
+        self.by_port = {}
+        self.by_service = {}
+        self.unrouted = []
+        self.indexed = set()
+        for module in modules:
+            self.indexed.add(id(module))
+            ports = getattr(module, 'ports', ()) or ()
+            services = getattr(module, 'services', ()) or ()
+            if not ports and not services:
+                self.unrouted.append(module)
+            for port in ports:
+                self.by_port.setdefault(int(port), []).append(module)
+            for service in services:
+                self.by_service.setdefault(service.lower(), []).append(module)
+
+    def applicable(self, open_ports):
+        """
+        Returns the set of modules that apply to a target with the given open
+        port rows (anything with 'port_number' and 'service_name').
+        """
+        selected = set(map(id, self.unrouted))
+        for port in open_ports:
+            selected.update(map(id, self.by_port.get(port['port_number'], ())))
+            if port['service_name']:
+                selected.update(map(id, self.by_service.get(port['service_name'].lower(), ())))
+        return selected
+
+    def route(self, modules, open_ports):
+        """
+        Splits modules (in their original order) into (applicable, skipped).
+        With no port data at all, HTTP modules are kept: whether the host
+        speaks HTTP is then left to the reachability probe. Modules the index
+        was not built with are always kept.
+        """
+        selected = self.applicable(open_ports)
+        applicable, skipped = [], []
+        for module in modules:
+            if (id(module) in selected or id(module) not in self.indexed
+                    or (not open_ports and getattr(module, 'http_module', False))):
+                applicable.append(module)
+            else:
+                skipped.append(module)
+        return applicable, skipped
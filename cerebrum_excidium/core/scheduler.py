@@ -0,0 +1,117 @@
+# Event-driven job scheduler for the AI core.
+# Work arrives as rows in the KB's jobs table, mostly enqueued by triggers
+# when a target is added or changes status. The scheduler drains the queue
+# back to back and, once it is empty, blocks on a wake-up event that KB
+# writers in this process set. Writes from other processes (e.g. the
+# interactive console) are caught by an idle poll that backs off
+# exponentially and only queries the queue when SQLite's data_version says
+# another connection has committed since the last look.
+import sqlite3
+import threading
+import database as db
+from core.logger import get_logger
+
+logger = get_logger(__name__)
+
+MIN_IDLE_WAIT = 0.5   # seconds; first idle wait after the queue runs dry
+MAX_IDLE_WAIT = 60.0  # seconds; the idle wait doubles up to this
+
+
+class Scheduler:
+    def __init__(self, kinds, min_wait=MIN_IDLE_WAIT, max_wait=MAX_IDLE_WAIT):
+        self.kinds = tuple(kinds)
+        self.min_wait = min_wait
+        self.max_wait = max_wait
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+
+    def notify(self):
+        """Wakes the scheduler; called by KB writers that may have enqueued a job."""
+        self._wake.set()
+
+    def stop(self):
+        self._stopped.set()
+        self._wake.set()
+
+    @property
+    def stopped(self):
+        return self._stopped.is_set()
+
+    def wait_for_job(self):
+        """
+        Blocks until a job of one of our kinds can be claimed, and returns it.
+        Returns None once stop() has been called.
+        """
+        wait = self.min_wait
+        data_version = None
+        while not self.stopped:
+            # Clear before looking so a notify() racing with the claim is not lost
+            self._wake.clear()
+            try:
+                job = db.claim_job(self.kinds)
+                if job is not None:
+                    return job
+                data_version = db.get_data_version()
+            except sqlite3.Error as e:
+                # e.g. "database is locked" while other writers hold the KB;
+                # back off like an idle queue and look again
+                logger.warning("Could not read the job queue (%s); retrying in %.1fs.", e, wait)
+                data_version = None
+
+            while not self.stopped:
+                if self._wake.wait(wait):
+                    wait = self.min_wait
+                    break
+                wait = min(wait * 2, self.max_wait)
+                # Nothing committed by anyone else: the queue cannot have changed
+                try:
+                    current = db.get_data_version()
+                except sqlite3.Error:
+                    current = None
+                if data_version is None or current != data_version:
+                    break
+                logger.debug("Job queue idle; next check in %.1fs.", wait)
+        return None
+
+    def _claim_next(self):
+        """Claims a job without waiting; None if there is none or the queue cannot be read right now."""
+        try:
+            return db.claim_job(self.kinds)
+        except sqlite3.Error as e:
+            logger.warning("Could not claim a job (%s); waiting before the next try.", e)
+            return None
+
+    def run(self, handler, on_busy=None):
+        """
+        Hands each claimed job to handler(job) until stop() is called, and
+        closes it as 'done'. A job whose handler raised is queued again, up
+        to db.MAX_JOB_ATTEMPTS attempts, then closed as 'failed'. on_busy() is
+        called whenever work resumes after the queue had run dry.
+        """
+        db.add_job_listener(self.notify)
+        try:
+            idle = True
+            while not self.stopped:
+                job = self._claim_next() if not idle else None
+                if job is None:
+                    idle = True
+                    job = self.wait_for_job()
+                    if job is None:
+                        break
+                if idle:
+                    idle = False
+                    if on_busy:
+                        on_busy()
+
+                try:
+                    handler(job)
+                except Exception as e:
+                    if db.fail_job(job['id'], str(e)[:500]) == 'pending':
+                        logger.error("Job %s (%s) failed: %s. Queued again.", job['id'], job['kind'], e)
+                    else:
+                        logger.error("Job %s (%s) failed: %s. Giving up after %s attempts.",
+                                     job['id'], job['kind'], e, db.MAX_JOB_ATTEMPTS)
+                else:
+                    db.finish_job(job['id'])
+        finally:
+            db.remove_job_listener(self.notify)
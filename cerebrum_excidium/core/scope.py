@@ -0,0 +1,236 @@
+# Engagement scope enforcement.
+# A scope file lists what may be touched, one entry per line:
+#   10.0.0.0/8          a CIDR block (IPv4 or IPv6); a bare IP is a /32 or /128
+#   example.com         exactly this host
+#   *.example.com       any subdomain of example.com (not example.com itself)
+#   !dev.example.com    an exclusion; any entry form can be excluded with '!'
+#   # comment
+# Exclusions win over inclusions. With no scope loaded, everything is in scope.
+# A hostname the domain entries do not decide is resolved and checked against
+# the CIDRs: it is included only if every address it resolves to is, and
+# excluded if any of them is.
+#
+# CIDRs are kept in a binary radix trie per address family and domains in a
+# trie of reversed labels, so a lookup costs one walk of at most 32/128 bits
+# or of the host's labels, whatever the size of the scope.
+import ipaddress
+import os
+import socket
+import threading
+from urllib.parse import urlsplit
+from core.logger import get_logger
+
+logger = get_logger(__name__)
+
+_EXACT = '$'      # domain trie marker: the path so far is a listed host
+_WILDCARD = '*'   # domain trie marker: anything below the path so far
+
+
+class _CidrTrie:
+    """Binary trie of network prefixes. Nodes are [zero child, one child, terminal]."""
+    def __init__(self, bits):
+        self.bits = bits
+        self.root = [None, None, False]
+        self.size = 0
+
+    def add(self, network):
+        self.size += 1
+        value = int(network.network_address)
+        node = self.root
+        for depth in range(network.prefixlen):
+            if node[2]:
+                return  # already covered by a shorter prefix
+            bit = (value >> (self.bits - 1 - depth)) & 1
+            if node[bit] is None:
+                node[bit] = [None, None, False]
+            node = node[bit]
+        node[2] = True
+        node[0] = node[1] = None  # everything below is covered now
+
+    def contains(self, value):
+        node = self.root
+        shift = self.bits - 1
+        while node is not None:
+            if node[2]:
+                return True
+            if shift < 0:
+                return False
+            node = node[(value >> shift) & 1]
+            shift -= 1
+        return False
+
+
+class _DomainTrie:
+    """Trie of reversed domain labels ('www.example.com' -> com, example, www)."""
+    def __init__(self):
+        self.root = {}
+        self.size = 0
+
+    def add(self, pattern):
+        wildcard = pattern.startswith('*.')
+        labels = (pattern[2:] if wildcard else pattern).split('.')
+        node = self.root
+        for label in reversed(labels):
+            node = node.setdefault(label, {})
+        node[_WILDCARD if wildcard else _EXACT] = True
+        self.size += 1
+
+    def contains(self, labels):
+        """labels: the host's labels, already reversed."""
+        node = self.root
+        last = len(labels) - 1
+        for i, label in enumerate(labels):
+            node = node.get(label)
+            if node is None:
+                return False
+            if i < last and _WILDCARD in node:
+                return True
+        return _EXACT in node
+
+
+class _Matcher:
+    """One set of entries (the inclusions or the exclusions)."""
+    def __init__(self):
+        self.networks = {4: _CidrTrie(32), 6: _CidrTrie(128)}
+        self.domains = _DomainTrie()
+
+    def __len__(self):
+        return self.networks[4].size + self.networks[6].size + self.domains.size
+
+    def add(self, entry):
+        try:
+            network = ipaddress.ip_network(entry, strict=False)
+        except ValueError:
+            self.domains.add(entry)
+        else:
+            self.networks[network.version].add(network)
+
+    @property
+    def has_networks(self):
+        return bool(self.networks[4].size or self.networks[6].size)
+
+    def matches(self, address, labels):
+        if address is not None:
+            return self.networks[address.version].contains(int(address))
+        return self.domains.contains(labels)
+
+
+def resolve_host(host):
+    """The IP addresses a hostname resolves to; empty if it does not resolve."""
+    try:
+        infos = socket.getaddrinfo(host, None, proto=socket.IPPROTO_TCP)
+    except (socket.gaierror, UnicodeError):
+        return []
+    return list({ipaddress.ip_address(info[4][0].split('%', 1)[0]) for info in infos})
+
+
+def normalize_host(target):
+    """Reduces a hostname, 'host:port' or URL to the bare lower-case host."""
+    target = target.strip().lower()
+    if '://' in target:
+        target = urlsplit(target).hostname or ''
+    elif target.startswith('['):
+        target = target[1:].split(']', 1)[0]          # [v6]:port
+    elif target.count(':') == 1:
+        target = target.split(':', 1)[0]              # host:port
+    return target.rstrip('.')
+
+
+class Scope:
+    def __init__(self, entries=(), resolver=resolve_host):
+        self.include = _Matcher()
+        self.exclude = _Matcher()
+        self.resolver = resolver
+        for entry in entries:
+            self.add(entry)
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path) as f:
+            scope = cls(f)
+        logger.info("Loaded scope from %s: %s inclusion(s), %s exclusion(s).",
+                    path, len(scope.include), len(scope.exclude))
+        return scope
+
+    def add(self, entry):
+        entry = entry.split('#', 1)[0].strip().lower()
+        if not entry:
+            return
+        if entry.startswith('!'):
+            self.exclude.add(entry[1:].strip())
+        else:
+            self.include.add(entry)
+
+    def allows(self, target):
+        """True if the host (hostname, IP, host:port or URL) is in scope."""
+        host = normalize_host(target)
+        if not host:
+            return False
+        address, labels = None, None
+        # Hostnames end in a letter (their TLD); only try to parse the rest as IPs
+        if ':' in host or host[-1].isdigit():
+            try:
+                address = ipaddress.ip_address(host)
+            except ValueError:
+                pass
+        if address is None:
+            labels = host.split('.')[::-1]
+
+        # A hostname is only resolved when a CIDR entry could decide it
+        resolved = None
+        def addresses():
+            nonlocal resolved
+            if resolved is None:
+                resolved = self.resolver(host)
+            return resolved
+
+        if len(self.exclude):
+            if self.exclude.matches(address, labels):
+                return False
+            if address is None and self.exclude.has_networks and \
+                    any(self.exclude.matches(a, None) for a in addresses()):
+                return False
+        if not len(self.include):
+            return True
+        if self.include.matches(address, labels):
+            return True
+        if address is None and self.include.has_networks:
+            found = addresses()
+            return bool(found) and all(self.include.matches(a, None) for a in found)
+        return False
+
+
+# --- ACTIVE SCOPE ---
+# Set from --scope or the CEREBRUM_SCOPE_FILE environment variable.
+
+_active = None
+_active_loaded = False
+_lock = threading.Lock()
+
+def set_active_scope(scope):
+    """Makes scope (a Scope, or None for no restriction) the one every check uses."""
+    global _active, _active_loaded
+    with _lock:
+        _active = scope
+        _active_loaded = True
+
+def load_scope(path):
+    """Loads a scope file and makes it the active scope."""
+    scope = Scope.from_file(path)
+    set_active_scope(scope)
+    return scope
+
+def get_active_scope():
+    global _active, _active_loaded
+    if not _active_loaded:
+        with _lock:
+            if not _active_loaded:
+                path = os.environ.get("CEREBRUM_SCOPE_FILE")
+                _active = Scope.from_file(path) if path else None
+                _active_loaded = True
+    return _active
+
+def in_scope(target):
+    """Checks a host against the active scope; everything is in scope when none is set."""
+    scope = get_active_scope()
+    return scope is None or scope.allows(target)
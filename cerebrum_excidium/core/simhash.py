@@ -0,0 +1,82 @@
+# SimHash fingerprints for comparing HTTP responses without keeping them.
+# A response is reduced to its status code, body length and a 64-bit
+# SimHash of its words; two bodies that differ by a few words get hashes a
+# few bits apart, so "did this payload change the page?" becomes a length
+# check and a Hamming distance instead of a diff of two stored bodies.
+import hashlib
+import re
+from collections import Counter
+
+BITS = 64
+MAX_CHARS = 64 * 1024   # only the start of very large bodies is hashed
+
+_WORD = re.compile(r"\w+")
+
+
+# Per-bit counters are packed into one big integer, FIELD_BITS bits each, so
+# adding a feature is eight table lookups and one addition instead of a loop
+# over 64 bits. _SPREAD[i][b] is byte b of a hash spread over the counters
+# of bits 8i..8i+7. Counts stay far below 2**FIELD_BITS since only
+# MAX_CHARS characters are hashed.
+FIELD_BITS = 20
+_FIELD_MASK = (1 << FIELD_BITS) - 1
+_SPREAD = [
+    [sum(1 << (FIELD_BITS * (8 * lane + i)) for i in range(8) if byte >> i & 1) for byte in range(256)]
+    for lane in range(BITS // 8)
+]
+
+
+def simhash(text):
+    """64-bit SimHash of a text's words, each weighted by how often it occurs."""
+    t0, t1, t2, t3, t4, t5, t6, t7 = _SPREAD
+    packed = 0
+    total = 0
+    for word, count in Counter(_WORD.findall(text[:MAX_CHARS].lower())).items():
+        d = hashlib.blake2b(word.encode(), digest_size=8).digest()
+        packed += count * (t0[d[0]] + t1[d[1]] + t2[d[2]] + t3[d[3]] + t4[d[4]] + t5[d[5]] + t6[d[6]] + t7[d[7]])
+        total += count
+
+    # A bit is set when more of the words' weight has it set than not
+    value = 0
+    for bit in range(BITS):
+        if 2 * (packed >> (FIELD_BITS * bit) & _FIELD_MASK) > total:
+            value |= 1 << bit
+    return value
+
+
+def hamming_distance(a, b):
+    return bin(a ^ b).count('1')
+
+
+class ResponseFingerprint:
+    """Status code, body length and body SimHash of one response."""
+    __slots__ = ('status_code', 'length', 'simhash')
+
+    # How far a response may stray from a baseline and still count as the same page
+    MAX_DISTANCE = 3      # SimHash bits
+    LENGTH_SLACK = 16     # characters, on top of the caller's allowance
+
+    def __init__(self, status_code, length, simhash_value):
+        self.status_code = status_code
+        self.length = length
+        self.simhash = simhash_value
+
+    @classmethod
+    def of(cls, response):
+        text = response.text or ""
+        return cls(response.status_code, len(text), simhash(text))
+
+    def differs_from(self, baseline, allowance=0):
+        """
+        True if this response is not just another rendering of the baseline
+        page. allowance is how much the length may change anyway, e.g. the
+        length of a request value the page echoes back.
+        """
+        if self.status_code != baseline.status_code:
+            return True
+        if abs(self.length - baseline.length) > allowance + self.LENGTH_SLACK:
+            return True
+        return hamming_distance(self.simhash, baseline.simhash) > self.MAX_DISTANCE
+
+    def __repr__(self):
+        return f"ResponseFingerprint({self.status_code}, {self.length}, {self.simhash:016x})"
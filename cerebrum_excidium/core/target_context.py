@@ -0,0 +1,77 @@
+# Read-only view of one target, built once per analysis pass and handed to
+# every analysis module, so the modules no longer query the KB for the
+# target row and its ports one after another.
+from types import MappingProxyType
+import database as db
+
+
+class TargetContext:
+    """
+    Everything the analysis modules need to know about a target:
+      target            the targets row (sqlite3.Row)
+      ports             open port rows, in KB order
+      ports_by_number   port number -> tuple of rows (one per protocol)
+      ports_by_service  lower-cased service name -> tuple of rows
+      reachability      ReachabilityProfile for this cycle, or None
+      response_cache    the manager's shared ResponseCache, or None
+    Instances cannot be modified once built.
+    """
+    __slots__ = ('target', 'ports', 'ports_by_number', 'ports_by_service', 'reachability', 'response_cache')
+
+    def __init__(self, target, ports, reachability=None, response_cache=None):
+        ports = tuple(ports)
+        by_number, by_service = {}, {}
+        for port in ports:
+            by_number.setdefault(port['port_number'], []).append(port)
+            if port['service_name']:
+                by_service.setdefault(port['service_name'].lower(), []).append(port)
+
+        set_ = object.__setattr__
+        set_(self, 'target', target)
+        set_(self, 'ports', ports)
+        set_(self, 'ports_by_number', MappingProxyType({k: tuple(v) for k, v in by_number.items()}))
+        set_(self, 'ports_by_service', MappingProxyType({k: tuple(v) for k, v in by_service.items()}))
+        set_(self, 'reachability', reachability)
+        set_(self, 'response_cache', response_cache)
+
+    @classmethod
+    def load(cls, target_id, reachability=None, response_cache=None):
+        """Builds the context of a target with two KB queries. Returns None for an unknown ID."""
+        target = db.get_target_by_id(target_id)
+        if target is None:
+            return None
+        return cls(target, db.get_open_ports_for_target(target_id), reachability, response_cache)
+
+    def __setattr__(self, attr, value):
+        raise AttributeError(f"TargetContext is read-only (tried to set '{attr}')")
+
+    def __delattr__(self, attr):
+        raise AttributeError(f"TargetContext is read-only (tried to delete '{attr}')")
+
+    @property
+    def target_id(self):
+        return self.target['id']
+
+    @property
+    def hostname(self):
+        return self.target['hostname']
+
+    def has_port(self, *numbers):
+        return any(number in self.ports_by_number for number in numbers)
+
+    def has_service(self, *names):
+        return any(name.lower() in self.ports_by_service for name in names)
+
+    def port(self, number):
+        """The first open port row with this number, or None."""
+        rows = self.ports_by_number.get(number)
+        return rows[0] if rows else None
+
+    @property
+    def http_urls(self):
+        """Base URLs of the schemes worth trying: those that answered this cycle, or both if unknown."""
+        schemes = self.reachability.up_schemes if self.reachability is not None else ("http", "https")
+        return [f"{scheme}://{self.hostname}" for scheme in schemes]
+
+    def __repr__(self):
+        return f"TargetContext(id={self.target_id}, hostname={self.hostname!r}, ports={sorted(self.ports_by_number)})"
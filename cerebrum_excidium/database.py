@@ -1,332 +1,784 @@
 
+import functools
+import hashlib
+import json
 import sqlite3
-from utils import log_message
+import threading
+import xml.etree.ElementTree as ET
+from itertools import groupby
+from contextlib import contextmanager
+from core.logger import get_logger
+from core.profiler import profiler
+from core import nmap_xml, recon_results
+from core.scope import in_scope
+import migrations
 import os
 
+logger = get_logger(__name__)
+
 DB_NAME = "knowledge_base.db"
 DB_PATH = os.path.join(os.path.dirname(__file__), DB_NAME)
 
+# Pragmas applied to every connection when it is opened. WAL lets readers
+# proceed while a module is writing, and NORMAL sync is durable under WAL.
+CONNECTION_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -16000,      # ~16 MB page cache (negative = KiB)
+    "mmap_size": 268435456,    # 256 MB memory-mapped I/O
+    "temp_store": "MEMORY",
+}
+BUSY_TIMEOUT = 30  # seconds to wait on a locked database
+
+# --- CONNECTION MANAGEMENT ---
+
+class ConnectionManager:
+    """
+    Hands out one long-lived connection per thread and tracks nested
+    units of work so that only the outermost one commits or rolls back.
+    """
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []
+
+    def _open(self, path):
+        conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT)
+        conn.row_factory = sqlite3.Row
+        for pragma, value in CONNECTION_PRAGMAS.items():
+            conn.execute(f"PRAGMA {pragma} = {value}")
+        with self._lock:
+            self._connections.append(conn)
+        return conn
+
+    def get(self):
+        """Returns this thread's connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        # DB_PATH may be repointed (e.g. to a scratch database); follow it.
+        if conn is None or self._local.path != DB_PATH:
+            if conn is not None:
+                self._discard(conn)
+            conn = self._open(DB_PATH)
+            self._local.conn = conn
+            self._local.path = DB_PATH
+            self._local.depth = 0
+        return conn
+
+    @contextmanager
+    def unit_of_work(self):
+        """
+        Runs the enclosed block in a single transaction. Nested blocks join
+        the outer transaction instead of committing on their own.
+        """
+        conn = self.get()
+        if self._local.depth:
+            self._local.depth += 1
+            try:
+                yield conn
+            finally:
+                self._local.depth -= 1
+            return
+
+        self._local.depth = 1
+        try:
+            with conn:
+                yield conn
+        finally:
+            self._local.depth = 0
+
+    def in_unit_of_work(self):
+        """True while the calling thread is inside a unit of work."""
+        return bool(getattr(self._local, "depth", 0))
+
+    def _discard(self, conn):
+        with self._lock:
+            if conn in self._connections:
+                self._connections.remove(conn)
+        conn.close()
+
+    def close(self):
+        """Closes the calling thread's connection."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            self._discard(conn)
+            self._local.conn = None
+
+    def close_all(self):
+        """Closes every connection handed out so far (shutdown only)."""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.ProgrammingError:
+                # Connections owned by other threads can only be closed
+                # there; they are released when those threads exit.
+                pass
+        self._local.conn = None
+
+_manager = ConnectionManager()
+
 def get_db_connection():
-    """Establishes a connection to the database."""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+    """Returns the calling thread's long-lived connection to the database."""
+    return _manager.get()
+
+def transaction():
+    """Context manager wrapping a block of KB work in one transaction."""
+    return _manager.unit_of_work()
+
+def in_transaction():
+    """
+    True while the calling thread is inside a transaction() block. Write
+    helpers that log and swallow their errors re-raise them instead when
+    this is true, so that the enclosing unit of work rolls back as a whole.
+    """
+    return _manager.in_unit_of_work()
+
+def close_db_connection():
+    """Closes the calling thread's connection to the database."""
+    _manager.close()
+
+def close_all_connections():
+    """Closes every connection opened by the manager."""
+    _manager.close_all()
+
+# --- DEFERRED WRITES ---
+# Modules running on worker threads queue their KB writes instead of applying
+# them, so the manager can apply them in a fixed order regardless of which
+# module finished first.
+
+_deferred = threading.local()
+
+def deferrable(func):
+    """Write helpers marked with this are queued while the calling thread is inside deferred_writes()."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        queue = getattr(_deferred, 'queue', None)
+        if queue is not None:
+            queue.append((func, args, kwargs))
+            return None
+        return func(*args, **kwargs)
+    return wrapper
+
+@contextmanager
+def deferred_writes():
+    """Queues the calling thread's deferrable writes; yields the list they are appended to."""
+    previous = getattr(_deferred, 'queue', None)
+    _deferred.queue = queue = []
+    try:
+        yield queue
+    finally:
+        _deferred.queue = previous
+
+def apply_writes(queue):
+    """Applies writes queued by deferred_writes(), in order, in one transaction."""
+    if not queue:
+        return
+    with transaction():
+        for func, args, kwargs in queue:
+            func(*args, **kwargs)
+
+# SQLite caps the number of bound parameters per statement; stay well below it.
+MAX_BATCH_PARAMS = 500
+
+def _chunked(items, size=MAX_BATCH_PARAMS):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+def _placeholders(items):
+    return ','.join('?' * len(items))
 
 def initialize_db():
-    """Initializes the database and creates tables if they don't exist."""
-    log_message("info", f"Connecting to database at {DB_PATH}")
+    """Initializes the database and brings its schema up to the latest version."""
+    logger.info("Connecting to database at %s", DB_PATH)
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        # Target Table: Main table for discovered hosts
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS targets (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                hostname TEXT UNIQUE NOT NULL,
-                ip_address TEXT,
-                status TEXT NOT NULL DEFAULT 'new', -- e.g., 'new', 'scanned', 'compromised', 'scan_failed'
-                os TEXT,
-                state TEXT, -- 'up', 'down'
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            );
-        """)
-
-        # Ports Table: Stores open ports and services for each target
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS ports (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                target_id INTEGER NOT NULL,
-                port_number INTEGER NOT NULL,
-                protocol TEXT NOT NULL,
-                service_name TEXT,
-                product TEXT,
-                version TEXT,
-                state TEXT DEFAULT 'open',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (target_id) REFERENCES targets (id),
-                UNIQUE (target_id, port_number, protocol)
-            );
-        """)
-
-        # Vulnerabilities Table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS vulnerabilities (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                target_id INTEGER NOT NULL,
-                port_id INTEGER,
-                type TEXT NOT NULL, -- e.g., 'SQL_INJECTION_COMMAND', 'WEAK_SSH_CREDENTIALS'
-                description TEXT,
-                tool TEXT, -- e.g., 'sqlmap', 'nmap'
-                command TEXT,
-                status TEXT NOT NULL DEFAULT 'potential', -- 'potential', 'confirmed', 'failed'
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (target_id) REFERENCES targets (id),
-                FOREIGN KEY (port_id) REFERENCES ports (id)
-            );
-        """)
-
-        # Credentials Table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS credentials (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                target_id INTEGER,
-                service TEXT,
-                username TEXT,
-                password TEXT NOT NULL,
-                type TEXT, -- e.g., 'hash', 'plaintext'
-                source TEXT, -- Where it was found, e.g., 'exploitation', 'osint'
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (target_id) REFERENCES targets (id)
-            );
-        """)
-        
-        # Intelligence Table: For storing unstructured data, links, notes, etc.
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS intelligence (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                target_id INTEGER,
-                type TEXT NOT NULL, -- e.g., 'social_media_profile', 'email_address', 'employee_name'
-                source TEXT, -- The module or method that found it
-                content TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (target_id) REFERENCES targets (id)
-            );
-        """)
-
-        # Triggers to update 'updated_at' timestamps
-        cursor.execute("""
-            CREATE TRIGGER IF NOT EXISTS update_targets_updated_at
-            AFTER UPDATE ON targets
-            FOR EACH ROW
-            BEGIN
-                UPDATE targets SET updated_at = CURRENT_TIMESTAMP WHERE id = OLD.id;
-            END;
-        """)
-
-        conn.commit()
-        log_message("info", "Database initialized successfully.")
+        with profiler.timed('db', 'initialize_db'):
+            version = migrations.migrate(get_db_connection())
+        logger.info("Database initialized successfully (schema v%s).", version)
     except sqlite3.Error as e:
-        log_message("error", f"Database initialization failed: {e}")
-    finally:
-        if conn:
-            conn.close()
+        logger.error("Database initialization failed: %s", e)
 
 # --- TARGET MANAGEMENT ---
 
 def add_target(hostname, ip_address=None, status='new'):
-    """Adds a new target to the database if it doesn't already exist."""
+    """
+    Adds a new target to the database if it doesn't already exist.
+    Returns its ID, or None if the host is outside the engagement scope.
+    """
+    if not in_scope(hostname):
+        logger.warning("Refusing to add out-of-scope target: %s", hostname)
+        return None
     sql = "INSERT INTO targets (hostname, ip_address, status) VALUES (?, ?, ?)"
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute(sql, (hostname, ip_address, status))
-        conn.commit()
-        log_message("info", f"Added new target to KB: {hostname}")
+        with transaction() as conn:
+            cursor = conn.execute(sql, (hostname, ip_address, status))
+        logger.info("Added new target to KB: %s", hostname)
+        _notify_jobs()
         return cursor.lastrowid
     except sqlite3.IntegrityError:
-        log_message("debug", f"Target {hostname} already exists in KB.")
+        logger.debug("Target %s already exists in KB.", hostname)
         # Get the existing target's ID
-        cursor.execute("SELECT id FROM targets WHERE hostname = ?", (hostname,))
+        cursor = get_db_connection().execute("SELECT id FROM targets WHERE hostname = ?", (hostname,))
         return cursor.fetchone()['id']
     except sqlite3.Error as e:
-        log_message("error", f"Failed to add target {hostname}: {e}")
+        logger.error("Failed to add target %s: %s", hostname, e)
         return None
-    finally:
-        if conn:
-            conn.close()
 
 def update_target_status(target_id, status):
     """Updates the status of a specific target."""
     sql = "UPDATE targets SET status = ? WHERE id = ?"
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute(sql, (status, target_id))
-        conn.commit()
+        with transaction() as conn:
+            conn.execute(sql, (status, target_id))
     except sqlite3.Error as e:
-        log_message("error", f"Failed to update status for target ID {target_id}: {e}")
-    finally:
-        if conn:
-            conn.close()
+        logger.error("Failed to update status for target ID %s: %s", target_id, e)
+        return
+    _notify_jobs()
 
 def get_target_by_hostname(hostname):
     """Retrieves a target by its hostname."""
     sql = "SELECT * FROM targets WHERE hostname = ?"
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute(sql, (hostname,))
-        return cursor.fetchone()
+        return get_db_connection().execute(sql, (hostname,)).fetchone()
     except sqlite3.Error as e:
-        log_message("error", f"Failed to get target {hostname}: {e}")
+        logger.error("Failed to get target %s: %s", hostname, e)
         return None
-    finally:
-        if conn:
-            conn.close()
-            
+
 def get_target_by_id(target_id):
     """Retrieves a target by its ID."""
     sql = "SELECT * FROM targets WHERE id = ?"
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute(sql, (target_id,))
-    target = cursor.fetchone()
-    conn.close()
-    return target
+    return get_db_connection().execute(sql, (target_id,)).fetchone()
+
+def add_targets_bulk(hostnames, status='new'):
+    """
+    Adds many targets in a single transaction, skipping ones already in the KB
+    and ones outside the engagement scope.
+    Returns (inserted, existing): two dicts mapping hostname -> target ID.
+    """
+    hostnames = list(dict.fromkeys(h for h in hostnames if h))
+    allowed = [h for h in hostnames if in_scope(h)]
+    if len(allowed) < len(hostnames):
+        logger.warning("Dropped %s out-of-scope target(s).", len(hostnames) - len(allowed))
+        hostnames = allowed
+    inserted, existing = {}, {}
+    if not hostnames:
+        return inserted, existing
+
+    select_sql = "SELECT hostname, id FROM targets WHERE hostname IN ({})"
+    insert_sql = "INSERT OR IGNORE INTO targets (hostname, status) VALUES (?, ?)"
+    try:
+        with transaction() as conn:
+            for chunk in _chunked(hostnames):
+                for row in conn.execute(select_sql.format(_placeholders(chunk)), chunk):
+                    existing[row['hostname']] = row['id']
+
+            new_hostnames = [h for h in hostnames if h not in existing]
+            conn.executemany(insert_sql, ((h, status) for h in new_hostnames))
+            for chunk in _chunked(new_hostnames):
+                for row in conn.execute(select_sql.format(_placeholders(chunk)), chunk):
+                    inserted[row['hostname']] = row['id']
+    except sqlite3.Error as e:
+        logger.error("Failed to bulk add %s targets: %s", len(hostnames), e)
+        return {}, {}
+
+    logger.info("Added %s new target(s) to KB (%s already known).", len(inserted), len(existing))
+    if inserted:
+        _notify_jobs()
+    return inserted, existing
 
 def get_targets_by_status(status_list):
     """Gets all targets with a given status."""
     sql = f"SELECT * FROM targets WHERE status IN ({','.join('?'*len(status_list))})"
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute(sql, status_list)
-    targets = cursor.fetchall()
-    conn.close()
-    return targets
+    return get_db_connection().execute(sql, status_list).fetchall()
 
 
 # --- PORT MANAGEMENT ---
 
+_SQL_UPDATE_TARGET_HOST = "UPDATE targets SET ip_address = ?, state = ? WHERE id = ?"
+_SQL_INSERT_PORT = """
+    INSERT OR IGNORE INTO ports (target_id, port_number, protocol, service_name, product, version, state)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+def _insert_port_rows(conn, target_id, nmap_results):
+    conn.execute(_SQL_UPDATE_TARGET_HOST, (nmap_results.get('ip'), nmap_results.get('state'), target_id))
+    conn.executemany(_SQL_INSERT_PORT, (
+        (
+            target_id,
+            port_num,
+            proto,
+            port_data.get('name'),
+            port_data.get('product'),
+            port_data.get('version'),
+            port_data.get('state')
+        )
+        for proto, ports in nmap_results['protocols'].items()
+        for port_num, port_data in ports.items()
+        if port_data['state'] == 'open'
+    ))
+
 def add_port_scan_results(target_id, nmap_results):
     """Adds port scan results from an Nmap scan to the database."""
     if not nmap_results or 'protocols' not in nmap_results:
         return
 
-    # Update target main info
-    sql_update_target = "UPDATE targets SET ip_address = ?, state = ? WHERE id = ?"
-    conn = get_db_connection()
     try:
-        with conn: # Using 'with' handles commit/rollback
-            conn.execute(sql_update_target, (nmap_results.get('ip'), nmap_results.get('state'), target_id))
-            
-            sql_insert_port = """
-                INSERT OR IGNORE INTO ports (target_id, port_number, protocol, service_name, product, version, state) 
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """
-            for proto, ports in nmap_results['protocols'].items():
-                for port_num, port_data in ports.items():
-                    if port_data['state'] == 'open':
-                        conn.execute(sql_insert_port, (
-                            target_id,
-                            port_num,
-                            proto,
-                            port_data.get('name'),
-                            port_data.get('product'),
-                            port_data.get('version'),
-                            port_data.get('state')
-                        ))
-        log_message("info", f"Updated port information for target ID {target_id}.")
+        with transaction() as conn:
+            _insert_port_rows(conn, target_id, nmap_results)
+        logger.info("Updated port information for target ID %s.", target_id)
     except sqlite3.Error as e:
-        log_message("error", f"Failed to add port scan results for target ID {target_id}: {e}")
-    finally:
-        if conn:
-            conn.close()
-            
+        logger.error("Failed to add port scan results for target ID %s: %s", target_id, e)
+        if in_transaction():
+            raise
+
+def _target_id_for_host(conn, host):
+    """The KB target an nmap host belongs to: by hostname first, then by stored IP."""
+    names = [name for name in host['hostnames'] + [host['ip']] if name]
+    if names:
+        row = conn.execute(f"SELECT id FROM targets WHERE hostname IN ({','.join('?' * len(names))}) LIMIT 1",
+                           names).fetchone()
+        if row:
+            return row['id']
+    if host['ip']:
+        row = conn.execute("SELECT id FROM targets WHERE ip_address = ? LIMIT 1", (host['ip'],)).fetchone()
+        if row:
+            return row['id']
+    return None
+
+def ingest_nmap_xml(path, target_id=None):
+    """
+    Streams an nmap XML scan file (plain or gzipped) into the port rows of
+    the KB, one host at a time, in one transaction. Hosts go to target_id
+    if given, otherwise to the known target with a matching hostname or IP;
+    hosts not in the KB are skipped. Returns (hosts ingested, hosts skipped).
+    """
+    ingested = skipped = 0
+    try:
+        with transaction() as conn:
+            for host in nmap_xml.iter_hosts(path):
+                host_target = target_id or _target_id_for_host(conn, host)
+                if host_target is None:
+                    logger.debug("No target in KB for nmap host %s (%s); skipped.", host['host'], host['ip'])
+                    skipped += 1
+                    continue
+                _insert_port_rows(conn, host_target, host)
+                ingested += 1
+        logger.info("Ingested %s host(s) from %s (%s not in KB).", ingested, path, skipped)
+    except (OSError, EOFError, ET.ParseError, sqlite3.Error) as e:
+        logger.error("Failed to ingest nmap scan %s: %s", path, e)
+        return 0, 0
+    return ingested, skipped
+
+def store_recon_results(target_id, results):
+    """
+    Merges a recon pass into the KB in one transaction: port scans become
+    port rows, directory scan hits SENSITIVE_DIR findings, and uptime checks
+    the target's reachability rows. results are ReconResult envelopes.
+    Returns True if the transaction committed. Inside an enclosing
+    transaction() a failure is raised instead, so the caller's unit of work
+    (e.g. the target's status change) rolls back with it.
+    """
+    sql_dir = """
+        INSERT INTO vulnerabilities (target_id, type, description, severity)
+        VALUES (?, 'SENSITIVE_DIR', ?, 'info')
+    """
+    try:
+        with transaction() as conn:
+            for result in results:
+                if result.kind == recon_results.PORT_SCAN:
+                    add_port_scan_results(target_id, result.data)
+                elif result.kind == recon_results.DIR_SCAN:
+                    conn.executemany(sql_dir, ((target_id, f"Found: {p['url']} ({p['status']})") for p in result.data))
+                elif result.kind == recon_results.UPTIME:
+                    if result.data.get('schemes'):
+                        save_reachability(target_id, result.data['schemes'])
+                else:
+                    logger.debug("No KB mapping for %s result from %s; not stored.", result.kind, result.module)
+        logger.info("Stored %s recon result(s) for target ID %s.", len(results), target_id)
+        return True
+    except sqlite3.Error as e:
+        logger.error("Failed to store recon results for target ID %s: %s", target_id, e)
+        if in_transaction():
+            raise
+        return False
+
 def get_open_ports_for_target(target_id):
     """Retrieves all open ports for a specific target."""
     sql = "SELECT * FROM ports WHERE target_id = ? AND state = 'open'"
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute(sql, (target_id,))
-    ports = cursor.fetchall()
-    conn.close()
-    return ports
+    return get_db_connection().execute(sql, (target_id,)).fetchall()
 
 # --- VULNERABILITY MANAGEMENT ---
-def add_vulnerability(target_id, vuln_type, tool, command, port_id=None, description=None):
+@deferrable
+def add_vulnerability(target_id, vuln_type, tool=None, command=None, port_id=None, description=None, severity=None):
     sql = """
-        INSERT INTO vulnerabilities (target_id, port_id, type, description, tool, command)
-        VALUES (?, ?, ?, ?, ?, ?)
+        INSERT INTO vulnerabilities (target_id, port_id, type, description, tool, command, severity)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
     """
-    conn = get_db_connection()
     try:
-        with conn:
-            conn.execute(sql, (target_id, port_id, vuln_type, description, tool, command))
-        log_message("info", f"Added new potential vulnerability '{vuln_type}' for target ID {target_id}")
+        with transaction() as conn:
+            conn.execute(sql, (target_id, port_id, vuln_type, description, tool, command, severity))
+        logger.info("Added new potential vulnerability '%s' for target ID %s", vuln_type, target_id)
     except sqlite3.Error as e:
-        log_message("error", f"Failed to add vulnerability for target ID {target_id}: {e}")
-    finally:
-        if conn:
-            conn.close()
+        logger.error("Failed to add vulnerability for target ID %s: %s", target_id, e)
 
 def get_potential_vulnerabilities(target_id):
     sql = "SELECT * FROM vulnerabilities WHERE target_id = ? AND status = 'potential'"
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute(sql, (target_id,))
-    vulns = cursor.fetchall()
-    conn.close()
-    return vulns
-    
+    return get_db_connection().execute(sql, (target_id,)).fetchall()
+
+@deferrable
 def update_vulnerability_status(vuln_id, status):
     """Updates the status of a specific vulnerability."""
     sql = "UPDATE vulnerabilities SET status = ? WHERE id = ?"
-    conn = get_db_connection()
     try:
-        with conn:
+        with transaction() as conn:
             conn.execute(sql, (status, vuln_id))
     except sqlite3.Error as e:
-        log_message("error", f"Failed to update status for vulnerability ID {vuln_id}: {e}")
-    finally:
-        if conn:
-            conn.close()
+        logger.error("Failed to update status for vulnerability ID %s: %s", vuln_id, e)
 
 # --- CREDENTIALS MANAGEMENT ---
+@deferrable
 def add_credentials(password, target_id=None, service=None, username=None, cred_type='plaintext', source='exploitation'):
     sql = """
         INSERT INTO credentials (target_id, service, username, password, type, source)
         VALUES (?, ?, ?, ?, ?, ?)
     """
-    conn = get_db_connection()
     try:
-        with conn:
+        with transaction() as conn:
             conn.execute(sql, (target_id, service, username, password, cred_type, source))
-        log_message("critical", f"New credentials captured and stored in KB.")
+        logger.critical("New credentials captured and stored in KB.")
     except sqlite3.Error as e:
-        log_message("error", f"Failed to store credentials in KB: {e}")
-    finally:
-        if conn:
-            conn.close()
+        logger.error("Failed to store credentials in KB: %s", e)
 
 # --- INTELLIGENCE MANAGEMENT ---
+@deferrable
 def add_intelligence(content, intel_type, source, target_id=None):
     """Adds a piece of intelligence to the database, ensuring no duplicates."""
-    # First, check if this exact piece of intel already exists
-    check_sql = "SELECT id FROM intelligence WHERE content = ? AND type = ?"
+    # The unique (content, type) index turns duplicates into a no-op
     insert_sql = """
-        INSERT INTO intelligence (target_id, type, source, content)
+        INSERT OR IGNORE INTO intelligence (target_id, type, source, content)
         VALUES (?, ?, ?, ?)
     """
-    conn = get_db_connection()
     try:
-        with conn:
-            cursor = conn.cursor()
-            cursor.execute(check_sql, (content, intel_type))
-            if cursor.fetchone():
-                log_message("debug", f"Intelligence '{content[:50]}...' already exists in KB.")
-                return
-
-            cursor.execute(insert_sql, (target_id, intel_type, source, content))
-            log_message("info", f"New intelligence stored: {intel_type} - '{content[:50]}...'")
+        with transaction() as conn:
+            cursor = conn.execute(insert_sql, (target_id, intel_type, source, content))
+        if cursor.rowcount:
+            logger.info("New intelligence stored: %s - '%s...'", intel_type, content[:50])
+        else:
+            logger.debug("Intelligence '%.50s...' already exists in KB.", content)
     except sqlite3.Error as e:
-        log_message("error", f"Failed to store intelligence in KB: {e}")
-    finally:
-        if conn:
-            conn.close()
+        logger.error("Failed to store intelligence in KB: %s", e)
+
+def add_intelligence_bulk(contents, intel_type, source, target_id=None):
+    """
+    Stores many pieces of intelligence of one type in a single transaction,
+    skipping duplicates. Returns (inserted, existing): two dicts mapping
+    content -> intelligence ID.
+    """
+    contents = list(dict.fromkeys(c for c in contents if c))
+    inserted, existing = {}, {}
+    if not contents:
+        return inserted, existing
+
+    select_sql = "SELECT content, id FROM intelligence WHERE type = ? AND content IN ({})"
+    insert_sql = """
+        INSERT OR IGNORE INTO intelligence (target_id, type, source, content)
+        VALUES (?, ?, ?, ?)
+    """
+    try:
+        with transaction() as conn:
+            for chunk in _chunked(contents):
+                for row in conn.execute(select_sql.format(_placeholders(chunk)), [intel_type, *chunk]):
+                    existing[row['content']] = row['id']
+
+            new_contents = [c for c in contents if c not in existing]
+            conn.executemany(insert_sql, ((target_id, intel_type, source, c) for c in new_contents))
+            for chunk in _chunked(new_contents):
+                for row in conn.execute(select_sql.format(_placeholders(chunk)), [intel_type, *chunk]):
+                    inserted[row['content']] = row['id']
+    except sqlite3.Error as e:
+        logger.error("Failed to bulk store %s intelligence entries in KB: %s", len(contents), e)
+        return {}, {}
+
+    logger.info("New intelligence stored: %s x %s (%s already known).", len(inserted), intel_type, len(existing))
+    return inserted, existing
+
+# --- INSTRUMENTATION ---
+
+def record_module_run(module, phase, subject, status, wall_ms, error_count=0, result_size=0, request_count=0):
+    """Records one module invocation in the module_runs table."""
+    sql = """
+        INSERT INTO module_runs (module, phase, subject, status, wall_ms, error_count, result_size, request_count)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """
+    try:
+        with transaction() as conn:
+            conn.execute(sql, (module, phase, None if subject is None else str(subject),
+                               status, wall_ms, error_count, result_size, request_count))
+    except sqlite3.Error as e:
+        logger.error("Failed to record run of module %s: %s", module, e)
+
+def _percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * pct // 100))  # ceil without floats
+    return sorted_values[int(rank) - 1]
+
+def get_module_run_stats(window=200):
+    """
+    Summarises the most recent `window` runs of every module: run, error and
+    skip counts, p50/p95 wall time (of runs that actually executed) and the
+    average result size and HTTP request count. Returns a list of dicts
+    ordered by p95 descending.
+    """
+    sql = """
+        SELECT module, phase, status, wall_ms, error_count, result_size, request_count FROM (
+            SELECT *, ROW_NUMBER() OVER (PARTITION BY module ORDER BY id DESC) AS recent
+            FROM module_runs
+        )
+        WHERE recent <= ?
+        ORDER BY module
+    """
+    stats = []
+    for module, rows in groupby(get_db_connection().execute(sql, (window,)), key=lambda r: r['module']):
+        rows = list(rows)
+        executed = [r for r in rows if r['status'] != 'skipped']
+        timings = sorted(r['wall_ms'] for r in executed if r['wall_ms'] is not None)
+        stats.append({
+            'module': module,
+            'phase': rows[0]['phase'],
+            'runs': len(executed),
+            'errors': sum(r['error_count'] for r in executed),
+            'skipped': len(rows) - len(executed),
+            'p50_ms': _percentile(timings, 50),
+            'p95_ms': _percentile(timings, 95),
+            'avg_results': sum(r['result_size'] for r in executed) / len(executed) if executed else 0,
+            'avg_requests': sum(r['request_count'] for r in executed) / len(executed) if executed else 0,
+        })
+    stats.sort(key=lambda s: s['p95_ms'] or 0, reverse=True)
+    return stats
+
+# --- REACHABILITY ---
+
+def save_reachability(target_id, schemes):
+    """
+    Stores the latest probe result of each scheme for a target. schemes maps
+    'http'/'https' to dicts with 'reachable', 'status_code', 'rtt_ms' and 'error'.
+    """
+    sql = """
+        INSERT OR REPLACE INTO reachability (target_id, scheme, reachable, status_code, rtt_ms, error, checked_at)
+        VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+    """
+    rows = [(target_id, scheme, int(bool(r['reachable'])), r.get('status_code'), r.get('rtt_ms'), r.get('error'))
+            for scheme, r in schemes.items()]
+    try:
+        with transaction() as conn:
+            conn.executemany(sql, rows)
+    except sqlite3.Error as e:
+        logger.error("Failed to save reachability for target ID %s: %s", target_id, e)
+        if in_transaction():
+            raise
+
+def get_reachability(target_id):
+    """Returns the stored reachability rows of a target, keyed by scheme."""
+    rows = get_db_connection().execute("SELECT * FROM reachability WHERE target_id = ?", (target_id,))
+    return {row['scheme']: row for row in rows}
+
+# --- JOB QUEUE ---
+# Jobs are mostly enqueued by triggers on the targets table (see migration 8).
+# Writers that may have enqueued one call _notify_jobs() so a scheduler
+# waiting in this process wakes at once instead of at its next poll.
+
+_job_listeners = []
+MAX_JOB_ATTEMPTS = 3  # a job interrupted or failed this many times is not retried again
+
+def add_job_listener(callback):
+    """Registers a no-argument callable invoked whenever jobs may have been enqueued."""
+    _job_listeners.append(callback)
+
+def remove_job_listener(callback):
+    if callback in _job_listeners:
+        _job_listeners.remove(callback)
+
+def _notify_jobs():
+    for callback in list(_job_listeners):
+        callback()
+
+def enqueue_job(kind, target_id=None, subject=None):
+    """Queues a job unless an identical one is already pending or running."""
+    sql = "INSERT OR IGNORE INTO jobs (kind, target_id, subject) VALUES (?, ?, ?)"
+    try:
+        with transaction() as conn:
+            conn.execute(sql, (kind, target_id, subject))
+    except sqlite3.Error as e:
+        logger.error("Failed to enqueue %s job: %s", kind, e)
+        return
+    _notify_jobs()
+
+def claim_job(kinds):
+    """
+    Marks the oldest pending job of one of the given kinds as running and
+    returns it, or returns None when there is none.
+    """
+    select_sql = f"SELECT * FROM jobs WHERE status = 'pending' AND kind IN ({_placeholders(kinds)}) ORDER BY id LIMIT 1"
+    claim_sql = """
+        UPDATE jobs SET status = 'running', attempts = attempts + 1, updated_at = CURRENT_TIMESTAMP
+        WHERE id = ? AND status = 'pending'
+    """
+    with transaction() as conn:
+        job = conn.execute(select_sql, list(kinds)).fetchone()
+        if job is None or not conn.execute(claim_sql, (job['id'],)).rowcount:
+            return None
+    return job
+
+def finish_job(job_id, status='done', error=None):
+    """Closes a claimed job as 'done' or 'failed'."""
+    sql = "UPDATE jobs SET status = ?, error = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?"
+    try:
+        with transaction() as conn:
+            conn.execute(sql, (status, error, job_id))
+    except sqlite3.Error as e:
+        logger.error("Failed to close job %s: %s", job_id, e)
+
+def fail_job(job_id, error, max_attempts=MAX_JOB_ATTEMPTS):
+    """
+    Closes a claimed job whose handler raised. It goes back in the queue
+    (keeping its attempt count, so checkpoints let the retry resume) until
+    it has been attempted max_attempts times, then stays 'failed'.
+    Returns the job's new status.
+    """
+    sql = """
+        UPDATE jobs SET status = CASE WHEN attempts < ? THEN 'pending' ELSE 'failed' END,
+                        error = ?, updated_at = CURRENT_TIMESTAMP
+        WHERE id = ?
+    """
+    try:
+        with transaction() as conn:
+            conn.execute(sql, (max_attempts, error, job_id))
+            status = conn.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()['status']
+    except sqlite3.Error as e:
+        logger.error("Failed to close job %s: %s", job_id, e)
+        return 'failed'
+    if status == 'pending':
+        _notify_jobs()
+    return status
+
+def requeue_interrupted_jobs(max_attempts=MAX_JOB_ATTEMPTS):
+    """
+    Puts jobs left 'running' by a process that died back in the queue, and
+    gives up on ones that have already been attempted max_attempts times.
+    Returns (requeued, abandoned).
+    """
+    try:
+        with transaction() as conn:
+            abandoned = conn.execute("""
+                UPDATE jobs SET status = 'failed', error = 'interrupted too many times', updated_at = CURRENT_TIMESTAMP
+                WHERE status = 'running' AND attempts >= ?
+            """, (max_attempts,)).rowcount
+            requeued = conn.execute("""
+                UPDATE jobs SET status = 'pending', updated_at = CURRENT_TIMESTAMP WHERE status = 'running'
+            """).rowcount
+    except sqlite3.Error as e:
+        logger.error("Failed to requeue interrupted jobs: %s", e)
+        return 0, 0
+    return requeued, abandoned
+
+def count_jobs(status='pending'):
+    """Returns the number of jobs per kind in the given status."""
+    rows = get_db_connection().execute("SELECT kind, COUNT(*) FROM jobs WHERE status = ? GROUP BY kind", (status,))
+    return {kind: count for kind, count in rows}
+
+def get_data_version():
+    """
+    SQLite's data_version for this thread's connection: it changes whenever
+    another connection commits, so a poller can skip querying when it hasn't.
+    """
+    return get_db_connection().execute("PRAGMA data_version").fetchone()[0]
+
+# --- CHECKPOINTS ---
+
+@deferrable
+def save_module_checkpoint(target_id, phase, module, result=None):
+    """Marks a module as done against a target; result must be JSON-serialisable."""
+    sql = """
+        INSERT OR REPLACE INTO module_checkpoints (target_id, phase, module, result_json)
+        VALUES (?, ?, ?, ?)
+    """
+    try:
+        with transaction() as conn:
+            conn.execute(sql, (target_id, phase, module, None if result is None else json.dumps(result)))
+    except (sqlite3.Error, TypeError, ValueError) as e:
+        logger.error("Failed to checkpoint module %s for target ID %s: %s", module, target_id, e)
+
+def get_module_checkpoints(target_id, phase):
+    """Returns {module name: stored result or None} for the modules done in an unfinished phase."""
+    sql = "SELECT module, result_json FROM module_checkpoints WHERE target_id = ? AND phase = ?"
+    return {row['module']: None if row['result_json'] is None else json.loads(row['result_json'])
+            for row in get_db_connection().execute(sql, (target_id, phase))}
+
+def clear_module_checkpoints(target_id, phase):
+    """Forgets a phase's progress once the phase has completed."""
+    with transaction() as conn:
+        conn.execute("DELETE FROM module_checkpoints WHERE target_id = ? AND phase = ?", (target_id, phase))
+
+def record_osint_seed(seed, query):
+    """Records that the OSINT query for a seed has been run."""
+    with transaction() as conn:
+        conn.execute("INSERT OR REPLACE INTO osint_ledger (seed, query) VALUES (?, ?)", (seed, query))
+
+def get_osint_seeds():
+    """Returns the set of seeds whose OSINT queries have already been run."""
+    return {row['seed'] for row in get_db_connection().execute("SELECT seed FROM osint_ledger")}
+
+# --- RECON FRESHNESS ---
+
+@deferrable
+def save_recon_freshness(target_id, module, result, ttl):
+    """Stores a recon module's latest result for a target, to be reused for ttl seconds."""
+    try:
+        result_json = json.dumps(result, sort_keys=True)
+    except (TypeError, ValueError) as e:
+        logger.debug("Result of %s is not JSON-serialisable; not kept for reuse: %s", module, e)
+        return
+    digest = hashlib.sha256(result_json.encode()).hexdigest()
+    sql = """
+        INSERT OR REPLACE INTO recon_freshness (target_id, module, last_run, digest, result_json, ttl)
+        VALUES (?, ?, CURRENT_TIMESTAMP, ?, ?, ?)
+    """
+    try:
+        with transaction() as conn:
+            previous = conn.execute("SELECT digest FROM recon_freshness WHERE target_id = ? AND module = ?",
+                                    (target_id, module)).fetchone()
+            conn.execute(sql, (target_id, module, digest, result_json, ttl))
+    except sqlite3.Error as e:
+        logger.error("Failed to store recon freshness of %s for target ID %s: %s", module, target_id, e)
+        return
+    if previous is not None:
+        logger.debug("%s result for target ID %s %s since its last run.", module, target_id,
+                     "is unchanged" if previous['digest'] == digest else "has changed")
+
+def get_fresh_recon_results(target_id):
+    """
+    Returns {module: (result, age in seconds)} for the target's stored recon
+    results still within their TTL. Stored empty results (None, written by
+    earlier versions after a module soft-failed) never count as fresh.
+    """
+    sql = """
+        SELECT module, result_json, age FROM (
+            SELECT *, (julianday('now') - julianday(last_run)) * 86400 AS age
+            FROM recon_freshness WHERE target_id = ? AND result_json != 'null'
+        )
+        WHERE age < ttl
+    """
+    return {row['module']: (json.loads(row['result_json']), row['age'])
+            for row in get_db_connection().execute(sql, (target_id,))}
 
 # --- REPORTING HELPERS ---
 
 def get_all_targets():
     """Retrieves all targets from the database."""
     sql = "SELECT * FROM targets ORDER BY created_at DESC"
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute(sql)
-    targets = cursor.fetchall()
-    conn.close()
-    return targets
+    return get_db_connection().execute(sql).fetchall()
 
 def get_ports_by_target(target_id):
     """Wrapper for get_open_ports_for_target to match ReportGenerator expectation."""
@@ -335,19 +787,116 @@ def get_ports_by_target(target_id):
 def get_vulnerabilities(target_id):
     """Retrieves ALL vulnerabilities for a target, regardless of status."""
     sql = "SELECT * FROM vulnerabilities WHERE target_id = ?"
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute(sql, (target_id,))
-    vulns = cursor.fetchall()
-    conn.close()
-    return vulns
+    return get_db_connection().execute(sql, (target_id,)).fetchall()
 
 def get_credentials(target_id):
     """Retrieves credentials for a specific target."""
     sql = "SELECT * FROM credentials WHERE target_id = ?"
+    return get_db_connection().execute(sql, (target_id,)).fetchall()
+
+def count_targets():
+    """Returns the number of targets in the KB."""
+    return get_db_connection().execute("SELECT COUNT(*) FROM targets").fetchone()[0]
+
+class _TargetGroups:
+    """
+    Walks a cursor ordered by target_id DESC one target at a time, so it can be
+    merge-joined against the targets table without loading the whole result.
+    """
+    def __init__(self, cursor):
+        self._groups = groupby(cursor, key=lambda row: row['target_id'])
+        self._advance()
+
+    def _advance(self):
+        head = next(self._groups, None)
+        self._head_id = head[0] if head else None
+        self._head_rows = head[1] if head else None
+
+    def pop(self, target_id):
+        """Returns the rows belonging to target_id (ascending order), or []."""
+        # Skip rows left behind by targets that no longer exist
+        while self._head_id is not None and self._head_id > target_id:
+            self._advance()
+        if self._head_id != target_id:
+            return []
+        # The queries scan their index backwards; flip each group back
+        rows = list(self._head_rows)
+        rows.reverse()
+        self._advance()
+        return rows
+
+def iter_target_records(since=None):
+    """
+    Streams targets (newest first) with their open ports, vulnerabilities
+    and credentials as (target, ports, vulns, creds) tuples. If since is
+    given, only targets whose updated_at is at or after it are included.
+
+    Uses one index-ordered query per table and merges them on target_id, so
+    only a single target's rows are in memory at any time.
+    """
+    if since is None:
+        id_filter = target_filter = ""
+        params = ()
+    else:
+        changed = "SELECT id FROM targets WHERE updated_at >= ?"
+        id_filter = f"AND id IN ({changed})"
+        target_filter = f"AND target_id IN ({changed})"
+        params = (since,)
+
     conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute(sql, (target_id,))
-    creds = cursor.fetchall()
-    conn.close()
-    return creds
+    targets = conn.execute(f"""
+        SELECT * FROM targets WHERE 1 {id_filter}
+        ORDER BY id DESC
+    """, params)
+    ports = _TargetGroups(conn.execute(f"""
+        SELECT * FROM ports WHERE state = 'open' {target_filter}
+        ORDER BY target_id DESC, port_number DESC, protocol DESC
+    """, params))
+    vulns = _TargetGroups(conn.execute(f"""
+        SELECT * FROM vulnerabilities WHERE 1 {target_filter}
+        ORDER BY target_id DESC, status DESC, id DESC
+    """, params))
+    creds = _TargetGroups(conn.execute(f"""
+        SELECT * FROM credentials WHERE target_id IS NOT NULL {target_filter}
+        ORDER BY target_id DESC, id DESC
+    """, params))
+
+    for target in targets:
+        target_id = target['id']
+        yield target, ports.pop(target_id), vulns.pop(target_id), creds.pop(target_id)
+
+# --- INCREMENTAL REPORT STATE ---
+
+def get_kb_timestamp():
+    """Returns the database's CURRENT_TIMESTAMP, comparable with updated_at."""
+    return get_db_connection().execute("SELECT CURRENT_TIMESTAMP").fetchone()[0]
+
+def get_meta(key, default=None):
+    row = get_db_connection().execute("SELECT value FROM kb_meta WHERE key = ?", (key,)).fetchone()
+    return row['value'] if row else default
+
+def set_meta(key, value):
+    with transaction() as conn:
+        conn.execute("INSERT OR REPLACE INTO kb_meta (key, value) VALUES (?, ?)", (key, value))
+
+def save_report_sections(sections):
+    """Stores rendered report sections, given as (target_id, body) pairs."""
+    with transaction() as conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO report_sections (target_id, body) VALUES (?, ?)",
+            sections
+        )
+
+def clear_report_sections():
+    with transaction() as conn:
+        conn.execute("DELETE FROM report_sections")
+
+def iter_report_sections():
+    """Streams cached report section bodies in report order (newest target first)."""
+    sql = """
+        SELECT s.body FROM report_sections s
+        JOIN targets t ON t.id = s.target_id
+        ORDER BY s.target_id DESC
+    """
+    for row in get_db_connection().execute(sql):
+        yield row['body']
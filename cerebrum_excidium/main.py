@@ -1,6 +1,19 @@
 
+import sys
+from core.profiler import profiler
+
+# Must happen before the heavy imports below so their cost is recorded
+if '--profile-startup' in sys.argv:
+    profiler.enable()
+
 import argparse
 from core.brain import Brain
+from core.exporters import EXPORTERS
+from core.logger import LEVELS, configure_logging
+from core.nmap_xml import ARCHIVE_DIR, archived_scans
+from core.report_generator import ReportGenerator
+from core.scope import load_scope
+import database as db
 
 def main():
     banner = r"""
@@ -45,11 +58,44 @@ def main():
     parser = argparse.ArgumentParser(description="Cerebrum Excidium - Autonomous Hacking AI")
     parser.add_argument('--target', help="Initial target URL or IP address")
     parser.add_argument('--mode', choices=['recon', 'full_attack', 'social'], default='recon', help="Operation mode")
+    parser.add_argument('--export', choices=list(EXPORTERS), help="Export the Knowledge Base in the given format and exit")
+    parser.add_argument('--profile-startup', action='store_true', help="Print a ranked table of startup costs and exit")
+    parser.add_argument('--log-level', choices=list(LEVELS), help="Minimum level to log (default: info)")
+    parser.add_argument('--log-file', help="Also write logs to this file as JSON lines")
+    parser.add_argument('--scope', help="Scope file (CIDRs, domains, *.wildcards, !exclusions); out-of-scope hosts are never targeted")
+    parser.add_argument('--analysis-workers', type=int, help="Analysis modules to run in parallel per target (default: 1)")
+    parser.add_argument('--force', action='store_true', help="Rescan targets even if their stored recon results are still fresh")
+    parser.add_argument('--ingest-nmap', nargs='?', const=ARCHIVE_DIR, metavar='PATH',
+                        help="Load port data from archived nmap XML (a file or directory; default scans/nmap) into the KB and exit")
     
     args = parser.parse_args()
+    configure_logging(level=args.log_level, log_file=args.log_file)
+    if args.scope:
+        load_scope(args.scope)
+
+    if args.export:
+        db.initialize_db()
+        filename = ReportGenerator().generate_report(fmt=args.export)
+        print(f"[+] Mission Report exported: {filename}")
+        return
+
+    if args.ingest_nmap:
+        db.initialize_db()
+        for path in archived_scans(args.ingest_nmap):
+            ingested, skipped = db.ingest_nmap_xml(path)
+            print(f"[+] {path}: {ingested} host(s) ingested, {skipped} not in the KB")
+        return
 
     print(f"[*] AI Core instantiated. Target: {args.target} | Mode: {args.mode}")
-    ai_brain = Brain(target=args.target, mode=args.mode)
+    with profiler.timed('startup', 'Brain.__init__'):
+        ai_brain = Brain(target=args.target, mode=args.mode, analysis_workers=args.analysis_workers,
+                         force_rescan=args.force)
+
+    if args.profile_startup:
+        # Plugins are normally constructed on first use; build them all here
+        ai_brain.module_manager.preload()
+        profiler.report()
+        return
     
     try:
         ai_brain.run()
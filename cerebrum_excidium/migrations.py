@@ -0,0 +1,336 @@
+# Schema migrations for the Cerebrum Excidium Knowledge Base
+from core.logger import get_logger
+
+logger = get_logger(__name__)
+
+# The schema version is stored in SQLite's own header via PRAGMA user_version,
+# so a database created before migrations existed reports version 0 and simply
+# runs every step (the initial schema uses IF NOT EXISTS throughout).
+
+def _initial_schema(conn):
+    # Target Table: Main table for discovered hosts
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS targets (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            hostname TEXT UNIQUE NOT NULL,
+            ip_address TEXT,
+            status TEXT NOT NULL DEFAULT 'new', -- e.g., 'new', 'scanned', 'compromised', 'scan_failed'
+            os TEXT,
+            state TEXT, -- 'up', 'down'
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+    """)
+
+    # Ports Table: Stores open ports and services for each target
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS ports (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            target_id INTEGER NOT NULL,
+            port_number INTEGER NOT NULL,
+            protocol TEXT NOT NULL,
+            service_name TEXT,
+            product TEXT,
+            version TEXT,
+            state TEXT DEFAULT 'open',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (target_id) REFERENCES targets (id),
+            UNIQUE (target_id, port_number, protocol)
+        );
+    """)
+
+    # Vulnerabilities Table
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS vulnerabilities (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            target_id INTEGER NOT NULL,
+            port_id INTEGER,
+            type TEXT NOT NULL, -- e.g., 'SQL_INJECTION_COMMAND', 'WEAK_SSH_CREDENTIALS'
+            description TEXT,
+            tool TEXT, -- e.g., 'sqlmap', 'nmap'
+            command TEXT,
+            status TEXT NOT NULL DEFAULT 'potential', -- 'potential', 'confirmed', 'failed'
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (target_id) REFERENCES targets (id),
+            FOREIGN KEY (port_id) REFERENCES ports (id)
+        );
+    """)
+
+    # Credentials Table
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS credentials (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            target_id INTEGER,
+            service TEXT,
+            username TEXT,
+            password TEXT NOT NULL,
+            type TEXT, -- e.g., 'hash', 'plaintext'
+            source TEXT, -- Where it was found, e.g., 'exploitation', 'osint'
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (target_id) REFERENCES targets (id)
+        );
+    """)
+
+    # Intelligence Table: For storing unstructured data, links, notes, etc.
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS intelligence (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            target_id INTEGER,
+            type TEXT NOT NULL, -- e.g., 'social_media_profile', 'email_address', 'employee_name'
+            source TEXT, -- The module or method that found it
+            content TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (target_id) REFERENCES targets (id)
+        );
+    """)
+
+    # Triggers to update 'updated_at' timestamps
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS update_targets_updated_at
+        AFTER UPDATE ON targets
+        FOR EACH ROW
+        BEGIN
+            UPDATE targets SET updated_at = CURRENT_TIMESTAMP WHERE id = OLD.id;
+        END;
+    """)
+
+def _lookup_indexes(conn):
+    # get_targets_by_status / the brain's per-cycle target selection
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_targets_status ON targets (status)")
+    # get_potential_vulnerabilities and get_vulnerabilities
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_vulnerabilities_target_status ON vulnerabilities (target_id, status)")
+    # Duplicate check in add_intelligence; covers the lookup (id is the rowid)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_intelligence_content_type ON intelligence (content, type)")
+    # get_credentials
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_credentials_target ON credentials (target_id)")
+    conn.execute("ANALYZE")
+
+def _unique_intelligence(conn):
+    # Collapse any duplicates that slipped past the old check-then-insert,
+    # then let the index enforce uniqueness so bulk ingestion can rely on
+    # INSERT OR IGNORE.
+    conn.execute("""
+        DELETE FROM intelligence
+        WHERE id NOT IN (SELECT MIN(id) FROM intelligence GROUP BY content, type)
+    """)
+    conn.execute("DROP INDEX IF EXISTS idx_intelligence_content_type")
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_intelligence_content_type ON intelligence (content, type)")
+
+def _vulnerability_severity(conn):
+    # Analysis modules grade their findings ('info' .. 'critical'); keep it.
+    conn.execute("ALTER TABLE vulnerabilities ADD COLUMN severity TEXT")
+
+def _report_sections(conn):
+    # Any finding recorded against a target bumps its updated_at, so
+    # "targets changed since T" covers ports, vulnerabilities and loot too.
+    for table in ("ports", "vulnerabilities", "credentials"):
+        for event in ("INSERT", "UPDATE"):
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS touch_target_on_{table}_{event.lower()}
+                AFTER {event} ON {table}
+                FOR EACH ROW WHEN NEW.target_id IS NOT NULL
+                BEGIN
+                    UPDATE targets SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.target_id;
+                END;
+            """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_targets_updated_at ON targets (updated_at)")
+
+    # Rendered per-target report sections, patched by incremental reports
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS report_sections (
+            target_id INTEGER PRIMARY KEY,
+            body TEXT NOT NULL,
+            rendered_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (target_id) REFERENCES targets (id)
+        );
+    """)
+
+    # Small key/value store for bookkeeping such as report watermarks
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS kb_meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        );
+    """)
+
+def _module_runs(conn):
+    # One row per module invocation, written by ModuleManager
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS module_runs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            module TEXT NOT NULL,
+            phase TEXT NOT NULL, -- 'osint', 'recon', 'analysis', 'exploitation'
+            subject TEXT, -- hostname, target ID or query the module ran against
+            status TEXT NOT NULL, -- 'ok', 'error', 'skipped'
+            wall_ms REAL,
+            error_count INTEGER NOT NULL DEFAULT 0,
+            result_size INTEGER NOT NULL DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_module_runs_module ON module_runs (module, id)")
+
+def _reachability(conn):
+    # Latest probe result per target and URL scheme
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS reachability (
+            target_id INTEGER NOT NULL,
+            scheme TEXT NOT NULL, -- 'http', 'https'
+            reachable INTEGER NOT NULL,
+            status_code INTEGER,
+            rtt_ms REAL,
+            error TEXT,
+            checked_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (target_id, scheme),
+            FOREIGN KEY (target_id) REFERENCES targets (id)
+        );
+    """)
+
+# Target status -> the job a target entering that status needs next
+JOB_FOR_STATUS = {
+    'new': 'recon',
+    'scanned': 'analysis',
+    'analysis_complete': 'exploitation',
+}
+
+def _job_queue(conn):
+    # Persistent work queue the brain's scheduler drains. Target state
+    # transitions enqueue their follow-up job from inside the KB (triggers
+    # below), so every writer feeds the queue without knowing about it.
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL, -- 'osint', 'recon', 'analysis', 'exploitation'
+            target_id INTEGER,
+            subject TEXT, -- e.g. the OSINT seed for jobs not tied to a target
+            status TEXT NOT NULL DEFAULT 'pending', -- 'pending', 'running', 'done', 'failed'
+            attempts INTEGER NOT NULL DEFAULT 0,
+            error TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (target_id) REFERENCES targets (id)
+        );
+    """)
+    # At most one open job per (kind, target/subject): re-enqueueing is a no-op
+    conn.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_open ON jobs (kind, IFNULL(target_id, 0), IFNULL(subject, ''))
+        WHERE status IN ('pending', 'running')
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, id)")
+
+    for status, kind in JOB_FOR_STATUS.items():
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS enqueue_{kind}_on_target_insert
+            AFTER INSERT ON targets
+            FOR EACH ROW WHEN NEW.status = '{status}'
+            BEGIN
+                INSERT OR IGNORE INTO jobs (kind, target_id) VALUES ('{kind}', NEW.id);
+            END;
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS enqueue_{kind}_on_target_status
+            AFTER UPDATE OF status ON targets
+            FOR EACH ROW WHEN NEW.status = '{status}' AND OLD.status IS NOT NEW.status
+            BEGIN
+                INSERT OR IGNORE INTO jobs (kind, target_id) VALUES ('{kind}', NEW.id);
+            END;
+        """)
+
+    # Backfill: targets already waiting on a phase get their job now
+    for status, kind in JOB_FOR_STATUS.items():
+        conn.execute("INSERT OR IGNORE INTO jobs (kind, target_id) SELECT ?, id FROM targets WHERE status = ? ORDER BY id",
+                     (kind, status))
+
+def _checkpoints(conn):
+    # Modules that finished against a target in a phase that has not
+    # completed yet, so a restart resumes the phase instead of redoing it.
+    # Recon modules keep their result until the phase stores them all.
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS module_checkpoints (
+            target_id INTEGER NOT NULL,
+            phase TEXT NOT NULL, -- 'recon', 'analysis'
+            module TEXT NOT NULL,
+            result_json TEXT,
+            completed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (target_id, phase, module),
+            FOREIGN KEY (target_id) REFERENCES targets (id)
+        );
+    """)
+
+    # OSINT seeds already searched, so restarts do not repeat the queries
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS osint_ledger (
+            seed TEXT PRIMARY KEY,
+            query TEXT NOT NULL,
+            completed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+    """)
+
+def _module_request_counts(conn):
+    # HTTP requests each module run sent over the network
+    conn.execute("ALTER TABLE module_runs ADD COLUMN request_count INTEGER NOT NULL DEFAULT 0")
+
+def _recon_freshness(conn):
+    # Latest result of each recon module per target, reused while younger
+    # than its TTL instead of scanning the host again
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS recon_freshness (
+            target_id INTEGER NOT NULL,
+            module TEXT NOT NULL,
+            last_run TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            digest TEXT NOT NULL, -- sha256 of result_json
+            result_json TEXT NOT NULL,
+            ttl INTEGER NOT NULL, -- seconds
+            PRIMARY KEY (target_id, module),
+            FOREIGN KEY (target_id) REFERENCES targets (id)
+        );
+    """)
+
+# Ordered list of (version, description, step). Append new steps at the end;
+# never renumber or edit a step that has shipped.
+MIGRATIONS = [
+    (1, "initial schema", _initial_schema),
+    (2, "secondary lookup indexes", _lookup_indexes),
+    (3, "unique intelligence entries", _unique_intelligence),
+    (4, "vulnerability severity", _vulnerability_severity),
+    (5, "incremental report sections", _report_sections),
+    (6, "module run instrumentation", _module_runs),
+    (7, "per-target reachability profile", _reachability),
+    (8, "event-driven job queue", _job_queue),
+    (9, "resumable cycle checkpoints", _checkpoints),
+    (10, "module run request counts", _module_request_counts),
+    (11, "recon result freshness", _recon_freshness),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+def get_schema_version(conn):
+    """Returns the schema version recorded in the database header."""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def migrate(conn, target_version=LATEST_VERSION):
+    """
+    Applies every migration newer than the database's current version, up to
+    target_version. Each step runs in its own transaction together with the
+    version bump, so an interrupted upgrade resumes at the failed step.
+    """
+    current = get_schema_version(conn)
+    if current > LATEST_VERSION:
+        logger.warning("Knowledge Base schema v%s is newer than this build (v%s).", current, LATEST_VERSION)
+        return current
+
+    for version, description, step in MIGRATIONS:
+        if version <= current or version > target_version:
+            continue
+        logger.info("Migrating Knowledge Base schema to v%s: %s", version, description)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            step(conn)
+            conn.execute(f"PRAGMA user_version = {version}")
+            conn.execute("COMMIT")
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        current = version
+    return current
@@ -4,10 +4,47 @@ class BaseModule:
     Base class for all modules.
     Provides a name and description for each module.
     """
+    # Set by the ModuleManager to the response cache and circuit breaker shared by all modules
+    response_cache = None
+    circuit_breaker = None
+
+    # True for modules that only talk HTTP(S) to the target; the manager
+    # skips them when the target answers on neither scheme.
+    http_module = False
+
+    # Service names (as reported by nmap) and port numbers an analysis module
+    # consumes. The manager only runs it against targets exposing at least
+    # one of them; leave both empty for modules that apply to every target.
+    services = ()
+    ports = ()
+
     def __init__(self):
         self.name = "Unnamed Module"
         self.description = "No description provided."
 
+    @property
+    def http(self):
+        """
+        The pooled keep-alive HTTP client shared by all modules. Use it like
+        requests: self.http.get(url, timeout=3).
+        """
+        from core.http_client import get_http_client
+        return get_http_client()
+
+    def cached_get(self, url, timeout=5):
+        """
+        GETs a URL through the shared response cache, so a target's root page
+        is only fetched once per cycle however many modules look at it.
+        Returns a CachedResponse (status_code, headers, text); raises the
+        original exception if the request failed, or CircuitOpenError without
+        sending anything if the scheme is known to be down for this host.
+        """
+        from core.http_cache import cached_get
+
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.check(url)
+        return cached_get(self.response_cache, url, timeout)
+
     def run(self, **kwargs):
         """
         The main method for the module. This must be implemented by subclasses.
@@ -23,10 +60,20 @@ class ReconModule(BaseModule):
         super().__init__()
         self.module_type = "recon"
 
+    # What run() returns, one of core.recon_results.KINDS; the manager wraps
+    # the return value in a ReconResult envelope of this kind
+    result_kind = None
+
+    # Seconds a result stays fresh. Within that time the manager hands out
+    # the result stored in the KB instead of running the module again
+    # (unless a rescan is forced); 0 always runs it.
+    freshness_ttl = 0
+
     def run(self, target_hostname):
         """
         Runs the reconnaissance module against a given hostname.
-        It should return a results dictionary or None.
+        It should return its results (shaped as documented for its
+        result_kind in core.recon_results) or None.
         """
         raise NotImplementedError("Recon modules must implement the 'run' method.")
 
@@ -39,10 +86,13 @@ class AnalysisModule(BaseModule):
         super().__init__()
         self.module_type = "analysis"
 
-    def run(self, target_id):
+    def run(self, context):
         """
-        Runs the analysis module against a target identified by its database ID.
+        Runs the analysis module against a target, described by a read-only
+        core.target_context.TargetContext (target row, open ports, reachability).
         It should add any findings directly to the database.
+        Modules whose run() takes 'target_id' instead are still supported and
+        receive the bare database ID.
         """
         raise NotImplementedError("Analysis modules must implement the 'run' method.")
 
@@ -1,55 +1,52 @@
-import requests
 from modules.base_module import AnalysisModule
-from core.brain import log_message
+from core.fingerprints import get_fingerprint_engine
+from core.logger import get_logger
 import database as db
 
+logger = get_logger(__name__)
+
+# Signatures below this confidence (see core/fingerprints.json) are not reported
+MIN_CONFIDENCE = 50
+
 class CmsDetectorModule(AnalysisModule):
+    http_module = True
+    services = ('http', 'https', 'http-alt', 'http-proxy', 'https-alt')
+    ports = (80, 443, 8000, 8008, 8080, 8443)
+
     def __init__(self):
         super().__init__()
         self.name = "CMS Detector"
         self.description = "Identifies Content Management Systems (WordPress, Joomla, etc)."
 
-    def run(self, target_id):
-        # Get target info
-        target = db.get_target_by_id(target_id)
-        if not target:
-            return
-            
-        host = target['hostname']
-        log_message("info", f"[{self.name}] Checking {host} for CMS signatures...")
-        
-        protocols = ["http", "https"]
-        detected_cms = None
+    def run(self, context):
+        host = context.hostname
+        target_id = context.target_id
+        logger.info("[%s] Checking %s for CMS signatures...", self.name, host)
         
-        for proto in protocols:
+        engine = get_fingerprint_engine()
+        detected = []
+
+        for url in context.http_urls:
             try:
-                url = f"{proto}://{host}"
-                res = requests.get(url, timeout=5)
-                content = res.text.lower()
-                headers = str(res.headers).lower()
-                
-                if "wp-content" in content or "wordpress" in content:
-                    detected_cms = "WordPress"
-                elif "joomla" in content or "option=com_content" in content:
-                    detected_cms = "Joomla"
-                elif "drupal" in content or "drupal.org" in content:
-                    detected_cms = "Drupal"
-                elif "content-generator" in headers and "magento" in headers:
-                    detected_cms = "Magento"
-                
-                if detected_cms:
-                    break
-            except:
-                pass
-        
-        if detected_cms:
-            log_message("success", f"[{self.name}] DETECTED CMS: {detected_cms} on {host}")
-            # Identify as a vulnerability/finding
-            db.add_vulnerability(
-                target_id=target_id,
-                vuln_type="TECH_DISCLOSURE",
-                description=f"Target is running {detected_cms} CMS.",
-                severity="info"
-            )
+                res = self.cached_get(url, timeout=5)
+            except Exception:
+                continue
+            detected = [m for m in engine.match_response(res, category='cms') if m.confidence >= MIN_CONFIDENCE]
+            if detected:
+                break
+
+        if detected:
+            for cms in detected:
+                version = f" {cms.version}" if cms.version else ""
+                logger.success("[%s] DETECTED CMS: %s%s on %s (%s%% confidence)",
+                               self.name, cms.name, version, host, cms.confidence)
+                # Identify as a vulnerability/finding
+                db.add_vulnerability(
+                    target_id=target_id,
+                    vuln_type="TECH_DISCLOSURE",
+                    description=f"Target is running {cms.name}{version} CMS (confidence {cms.confidence}%: "
+                                f"{'; '.join(cms.evidence)}).",
+                    severity="info"
+                )
         else:
-            log_message("info", f"[{self.name}] No common CMS detected on {host}.")
+            logger.info("[%s] No common CMS detected on %s.", self.name, host)
@@ -1,9 +1,32 @@
-import requests
+import re
+import secrets
 from modules.base_module import AnalysisModule
-from core.brain import log_message
+from core.logger import get_logger
+from core.simhash import ResponseFingerprint
 import database as db
 
+logger = get_logger(__name__)
+
+# Content that only the targeted system files contain. Words such as "fonts"
+# on their own turn up in ordinary pages and are not evidence.
+_PASSWD_ENTRY = re.compile(r"\broot:[^:\n]*:0:0:")
+_WIN_INI_SECTIONS = ("[fonts]", "[extensions]")
+
+def file_indicators(text):
+    """Names the system files whose content appears in a response body."""
+    found = []
+    if _PASSWD_ENTRY.search(text):
+        found.append("/etc/passwd")
+    lowered = text.lower()
+    if all(section in lowered for section in _WIN_INI_SECTIONS) or "; for 16-bit app support" in lowered:
+        found.append("win.ini")
+    return found
+
 class LfiScannerModule(AnalysisModule):
+    http_module = True
+    services = ('http', 'https', 'http-alt', 'http-proxy', 'https-alt')
+    ports = (80, 443, 8000, 8008, 8080, 8443)
+
     def __init__(self):
         super().__init__()
         self.name = "LFI Scanner"
@@ -16,47 +39,54 @@ class LfiScannerModule(AnalysisModule):
         ]
         self.test_params = ["page", "file", "doc", "view", "include", "template"]
 
-    def run(self, target_id):
-        target = db.get_target_by_id(target_id)
-        if not target:
-            return
-            
-        host = target['hostname']
-        log_message("info", f"[{self.name}] Scanning {host} for LFI...")
-        
-        base_urls = [f"http://{host}", f"https://{host}"]
+    def run(self, context):
+        host = context.hostname
+        target_id = context.target_id
+        logger.info("[%s] Scanning %s for LFI...", self.name, host)
+
+        base_urls = context.http_urls
         vulnerable_urls = []
 
         for url in base_urls:
             try:
-                if requests.get(url, timeout=3).status_code not in [200, 403]:
+                if self.cached_get(url, timeout=3).status_code not in [200, 403]:
                     continue
-                
-                for param in self.test_params:
-                    for payload in self.payloads:
-                        fuzzed_url = f"{url}/?{param}={payload}"
-                        try:
-                            res = requests.get(fuzzed_url, timeout=3)
-                            content = res.text.lower()
-                            
-                            # Indicators of success
-                            if "root:x:0:0:" in content or "[extensions]" in content or "fonts" in content:
-                                log_message("critical", f"[{self.name}] LFI CONFIRMED at {fuzzed_url}")
-                                vulnerable_urls.append(fuzzed_url)
-                                
-                                db.add_vulnerability(
-                                    target_id=target_id,
-                                    vuln_type="LFI",
-                                    description=f"Read system file via '{param}': {payload}",
-                                    severity="critical"
-                                )
-                                break
-                        except:
-                            pass
-            except:
-                pass
-                
+            except Exception:
+                continue
+
+            for param in self.test_params:
+                # What the page looks like for a harmless value of this parameter
+                try:
+                    baseline_res = self.http.get(f"{url}/?{param}=sj{secrets.token_hex(4)}.txt", timeout=3)
+                except Exception:
+                    continue
+                baseline = ResponseFingerprint.of(baseline_res)
+                # Indicators the page shows anyway prove nothing
+                already_there = set(file_indicators(baseline_res.text))
+
+                for payload in self.payloads:
+                    fuzzed_url = f"{url}/?{param}={payload}"
+                    try:
+                        res = self.http.get(fuzzed_url, timeout=3)
+                    except Exception:
+                        continue
+                    # Only responses that changed the page are worth a look
+                    if not ResponseFingerprint.of(res).differs_from(baseline, allowance=len(payload)):
+                        continue
+                    found = [name for name in file_indicators(res.text) if name not in already_there]
+                    if found:
+                        logger.critical("[%s] LFI CONFIRMED at %s", self.name, fuzzed_url)
+                        vulnerable_urls.append(fuzzed_url)
+
+                        db.add_vulnerability(
+                            target_id=target_id,
+                            vuln_type="LFI",
+                            description=f"Read system file via '{param}': {payload} ({', '.join(found)} in response)",
+                            severity="critical"
+                        )
+                        break
+
         if vulnerable_urls:
-            log_message("success", f"[{self.name}] Found {len(vulnerable_urls)} LFI vectors.")
+            logger.success("[%s] Found %s LFI vectors.", self.name, len(vulnerable_urls))
         else:
-            log_message("info", f"[{self.name}] No LFI found on common parameters.")
+            logger.info("[%s] No LFI found on common parameters.", self.name)
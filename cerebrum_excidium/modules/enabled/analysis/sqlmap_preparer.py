@@ -1,32 +1,31 @@
 
-from utils import log_message
+from core.logger import get_logger
 import database as db
 from modules.base_module import AnalysisModule
 
+logger = get_logger(__name__)
+
 class SqlmapPreparerModule(AnalysisModule):
+    # Matches the web ports _check_for_web_vulns looks for
+    ports = (80, 443, 8000, 8080)
+
     def __init__(self):
         super().__init__()
         self.name = "SQLmap Command Preparer"
         self.description = "Analyzes web ports and prepares a basic sqlmap command if a web server is suspected."
 
-    def run(self, target_id):
+    def run(self, context):
         """
         Analyzes a target for potential web vulnerabilities and records them in the database.
         """
-        target = db.get_target_by_id(target_id)
-        if not target:
-            log_message("error", f"[{self.name}] Analysis failed: Could not find target with ID {target_id} in KB.")
-            return
-
-        host = target['hostname']
-        log_message("info", f"[{self.name}] Starting analysis for {host} (ID: {target_id}).")
+        host = context.hostname
+        logger.info("[%s] Starting analysis for %s (ID: %s).", self.name, host, context.target_id)
 
-        open_ports = db.get_open_ports_for_target(target_id)
-        if not open_ports:
-            log_message("info", f"[{self.name}] No open ports found for {host} in KB. Skipping.")
+        if not context.ports:
+            logger.info("[%s] No open ports found for %s in KB. Skipping.", self.name, host)
             return
 
-        self._check_for_web_vulns(target, open_ports)
+        self._check_for_web_vulns(context.target, context.ports)
 
     def _check_for_web_vulns(self, target, open_ports):
         """Checks for web-related vulnerabilities."""
@@ -38,7 +37,8 @@ class SqlmapPreparerModule(AnalysisModule):
 
         if found_web_port:
             port_id = found_web_port['id']
-            log_message("info", f"[{self.name}] Web port {found_web_port['port_number']} detected on {host}. Crafting SQLMap command.")
+            logger.info("[%s] Web port %s detected on %s. Crafting SQLMap command.",
+                        self.name, found_web_port['port_number'], host)
             
             protocol = 'https' if found_web_port['port_number'] == 443 else 'http'
             target_url = f"{protocol}://{host}/index.php?id=1" # Simplistic assumption
@@ -54,4 +54,4 @@ class SqlmapPreparerModule(AnalysisModule):
                 description=f"Potential SQL Injection vulnerability at {target_url}"
             )
         else:
-            log_message("info", f"[{self.name}] No common web ports open on {host}. Skipping web vulnerability scan.")
+            logger.info("[%s] No common web ports open on %s. Skipping web vulnerability scan.", self.name, host)
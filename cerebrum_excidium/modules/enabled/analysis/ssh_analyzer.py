@@ -1,38 +1,38 @@
 
-from utils import log_message
+from core.logger import get_logger
 import database as db
 from modules.base_module import AnalysisModule
 
+logger = get_logger(__name__)
+
 class SshAnalyzerModule(AnalysisModule):
+    services = ('ssh',)
+    ports = (22,)
+
     def __init__(self):
         super().__init__()
         self.name = "SSH Analyzer"
         self.description = "Checks for open SSH ports and flags them for brute-force analysis."
         self.ssh_port = 22
 
-    def run(self, target_id):
+    def run(self, context):
         """
         Checks if port 22 is open for a target and adds a 'WEAK_SSH_CREDENTIALS'
         vulnerability if it is.
         """
-        target = db.get_target_by_id(target_id)
-        if not target:
-            log_message("error", f"[{self.name}] Analysis failed: Could not find target with ID {target_id} in KB.")
-            return
-
-        host = target['hostname']
-        log_message("info", f"[{self.name}] Starting analysis for {host} (ID: {target_id}).")
+        host = context.hostname
+        target_id = context.target_id
+        logger.info("[%s] Starting analysis for %s (ID: %s).", self.name, host, target_id)
 
-        open_ports = db.get_open_ports_for_target(target_id)
-        if not open_ports:
-            log_message("info", f"[{self.name}] No open ports found for {host} in KB. Skipping.")
+        if not context.ports:
+            logger.info("[%s] No open ports found for %s in KB. Skipping.", self.name, host)
             return
 
-        ssh_port_open = next((port for port in open_ports if port['port_number'] == self.ssh_port), None)
+        ssh_port_open = context.port(self.ssh_port)
 
         if ssh_port_open:
             port_id = ssh_port_open['id']
-            log_message("warning", f"[{self.name}] Port {self.ssh_port} (SSH) is open on {host}. Flagging for bruteforce.")
+            logger.warning("[%s] Port %s (SSH) is open on %s. Flagging for bruteforce.", self.name, self.ssh_port, host)
 
             # This vulnerability is just a flag for the next module, it has no 'command'.
             db.add_vulnerability(
@@ -44,4 +44,4 @@ class SshAnalyzerModule(AnalysisModule):
                 description=f"Port {self.ssh_port} is open, making it a potential target for SSH credential stuffing."
             )
         else:
-            log_message("info", f"[{self.name}] Port {self.ssh_port} is not open on {host}. Skipping.")
+            logger.info("[%s] Port %s is not open on %s. Skipping.", self.name, self.ssh_port, host)
@@ -1,58 +1,51 @@
-import requests
 from modules.base_module import AnalysisModule
-from core.brain import log_message
+from core.fingerprints import get_fingerprint_engine
+from core.logger import get_logger
 import database as db
 
+logger = get_logger(__name__)
+
+# Signatures below this confidence (see core/fingerprints.json) are not reported
+MIN_CONFIDENCE = 50
+
 class WafDetectorModule(AnalysisModule):
+    http_module = True
+    services = ('http', 'https', 'http-alt', 'http-proxy', 'https-alt')
+    ports = (80, 443, 8000, 8008, 8080, 8443)
+
     def __init__(self):
         super().__init__()
         self.name = "WAF Detector"
         self.description = "Identifies Web Application Firewalls (Cloudflare, AWS, etc.)"
 
-    def run(self, target_id):
-        target = db.get_target_by_id(target_id)
-        if not target:
-            return
-            
-        host = target['hostname']
-        log_message("info", f"[{self.name}] Checking {host} for WAF presence...")
-        
-        waf_signatures = {
-            "Cloudflare": ["cf-ray", "__cfduid", "cf-cache-status", "cloudflare-nginx"],
-            "AWS WAF": ["x-amz-cf-id", "x-amzn-requestid", "awselb"],
-            "Akamai": ["akamai-x-cache", "x-akamai-request-id"],
-            "Incapsula": ["incap-ses", "visid_incap"],
-            "F5 BIG-IP": ["bigipserver", "x-cnection"],
-            "Sucuri": ["sucuri", "x-sucuri-id"]
-        }
+    def run(self, context):
+        host = context.hostname
+        target_id = context.target_id
+        logger.info("[%s] Checking %s for WAF presence...", self.name, host)
         
-        detected_waf = None
-        
-        try:
-            url = f"http://{host}"
-            # Send a request that might trigger a WAF block or reveal headers
-            # Using a slightly suspicious User-Agent or payload might help, but standard headers often reveal it too.
-            res = requests.get(url, timeout=5)
-            headers = str(res.headers).lower()
-            
-            for waf, sigs in waf_signatures.items():
-                for sig in sigs:
-                    if sig in headers:
-                        detected_waf = waf
-                        break
-                if detected_waf:
-                    break
-            
-            if detected_waf:
-                log_message("success", f"[{self.name}] DETECTED WAF: {detected_waf} on {host}")
+        engine = get_fingerprint_engine()
+        detected = []
+
+        for url in context.http_urls:
+            try:
+                # Standard responses usually reveal the WAF in their headers or cookies
+                res = self.cached_get(url, timeout=5)
+            except Exception as e:
+                logger.error("[%s] Failed to check WAF on %s: %s", self.name, url, e)
+                continue
+            detected = [m for m in engine.match_response(res, category='waf') if m.confidence >= MIN_CONFIDENCE]
+            if detected:
+                break
+
+        if detected:
+            for waf in detected:
+                logger.success("[%s] DETECTED WAF: %s on %s (%s%% confidence)",
+                               self.name, waf.name, host, waf.confidence)
                 db.add_vulnerability(
                     target_id=target_id,
                     vuln_type="DEFENSE_MECHANISM",
-                    description=f"Protected by {detected_waf} WAF.",
+                    description=f"Protected by {waf.name} WAF (confidence {waf.confidence}%: {'; '.join(waf.evidence)}).",
                     severity="info"
                 )
-            else:
-                log_message("info", f"[{self.name}] No common WAF signatures found on {host}.")
-                
-        except Exception as e:
-            log_message("error", f"[{self.name}] Failed to check WAF: {e}")
+        else:
+            logger.info("[%s] No common WAF signatures found on %s.", self.name, host)
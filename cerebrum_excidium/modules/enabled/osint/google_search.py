@@ -1,10 +1,12 @@
 
 import re
 from urllib.parse import urlparse
-from utils import log_message
+from core.logger import get_logger
 import database as db
 from modules.base_module import OSINTModule
 
+logger = get_logger(__name__)
+
 # The 'google_web_search' tool is assumed to be available in the global scope
 # where this code will be executed.
 
@@ -18,29 +20,28 @@ class GoogleSearchModule(OSINTModule):
         """
         Runs a Google search and parses the results for new hostnames.
         """
-        log_message("info", f"[{self.name}] Running Google search for query: '{query}'")
+        logger.info("[%s] Running Google search for query: '%s'", self.name, query)
 
         try:
             # The tool is called directly. The environment handles the execution.
             search_results = google_web_search(query=query)
         except NameError:
-            log_message("error", f"[{self.name}] The 'google_web_search' tool is not available in the current environment.")
+            logger.error("[%s] The 'google_web_search' tool is not available in the current environment.", self.name)
             return
         except Exception as e:
-            log_message("error", f"[{self.name}] Google search failed: {e}")
+            logger.error("[%s] Google search failed: %s", self.name, e)
             return
 
         if not search_results:
-            log_message("info", f"[{self.name}] No search results found for query.")
+            logger.info("[%s] No search results found for query.", self.name)
             return
 
         hostnames = self._parse_for_hostnames(search_results)
-        log_message("info", f"[{self.name}] Found {len(hostnames)} unique potential hostnames from search.")
+        logger.info("[%s] Found %s unique potential hostnames from search.", self.name, len(hostnames))
 
-        for hostname in hostnames:
-            if not db.get_target_by_hostname(hostname):
-                log_message("info", f"[{self.name}] Discovered new potential target via OSINT: {hostname}")
-                db.add_target(hostname=hostname, status='new')
+        inserted, _ = db.add_targets_bulk(hostnames, status='new')
+        for hostname in inserted:
+            logger.info("[%s] Discovered new potential target via OSINT: %s", self.name, hostname)
 
     def _parse_for_hostnames(self, search_results):
         """
@@ -57,6 +58,6 @@ class GoogleSearchModule(OSINTModule):
                     if parsed_url.hostname:
                         found_hostnames.add(parsed_url.hostname)
             except Exception as e:
-                log_message("debug", f"[{self.name}] Could not parse URL from search result: {link} - {e}")
+                logger.debug("[%s] Could not parse URL from search result: %s - %s", self.name, link, e)
         
         return list(found_hostnames)
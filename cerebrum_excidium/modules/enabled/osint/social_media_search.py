@@ -1,9 +1,11 @@
 
 from urllib.parse import urlparse
-from utils import log_message
+from core.logger import get_logger
 import database as db
 from modules.base_module import OSINTModule
 
+logger = get_logger(__name__)
+
 # The 'google_web_search' tool is assumed to be available in the global scope.
 
 class SocialMediaSearchModule(OSINTModule):
@@ -17,33 +19,35 @@ class SocialMediaSearchModule(OSINTModule):
         """
         Runs Google searches for social media profiles related to the query.
         """
-        log_message("info", f"[{self.name}] Searching for social media profiles related to '{query}'")
+        logger.info("[%s] Searching for social media profiles related to '%s'", self.name, query)
 
-        target_id = db.get_target_by_hostname(query)['id'] if db.get_target_by_hostname(query) else None
+        target = db.get_target_by_hostname(query)
+        target_id = target['id'] if target else None
+        profile_links = []
 
         for site in self.social_sites:
             search_query = f'site:{site} "{query}"'
-            log_message("info", f"[{self.name}] Running search: {search_query}")
+            logger.info("[%s] Running search: %s", self.name, search_query)
             
             try:
                 search_results = google_web_search(query=search_query)
             except NameError:
-                log_message("error", f"[{self.name}] The 'google_web_search' tool is not available.")
+                logger.error("[%s] The 'google_web_search' tool is not available.", self.name)
                 continue # Skip this site
             except Exception as e:
-                log_message("error", f"[{self.name}] Google search failed for site {site}: {e}")
+                logger.error("[%s] Google search failed for site %s: %s", self.name, site, e)
                 continue
 
             if not search_results:
                 continue
 
-            for result in search_results:
-                link = result.get('link')
-                if link:
-                    # We found a potential profile, let's store it.
-                    db.add_intelligence(
-                        target_id=target_id,
-                        intel_type='social_media_profile',
-                        source=self.name,
-                        content=link
-                    )
+            # Collect potential profiles; they are stored in one batch below.
+            profile_links.extend(result.get('link') for result in search_results if result.get('link'))
+
+        if profile_links:
+            db.add_intelligence_bulk(
+                profile_links,
+                intel_type='social_media_profile',
+                source=self.name,
+                target_id=target_id
+            )
@@ -1,9 +1,10 @@
-import requests
 import json
 from modules.base_module import OSINTModule
-from core.brain import log_message
+from core.logger import get_logger
 import database as db
 
+logger = get_logger(__name__)
+
 class SubdomainEnumModule(OSINTModule):
     def __init__(self):
         super().__init__()
@@ -14,11 +15,11 @@ class SubdomainEnumModule(OSINTModule):
         """
         Query is a domain name (e.g., example.com).
         """
-        log_message("info", f"[{self.name}] Searching for subdomains of: {query}")
+        logger.info("[%s] Searching for subdomains of: %s", self.name, query)
         
         try:
             url = f"https://crt.sh/?q=%25.{query}&output=json"
-            response = requests.get(url, timeout=10)
+            response = self.http.get(url, timeout=10)
             
             if response.status_code == 200:
                 data = response.json()
@@ -31,16 +32,14 @@ class SubdomainEnumModule(OSINTModule):
                         if query in sub and '*' not in sub:
                             subdomains.add(sub.strip().lower())
                 
-                log_message("success", f"[{self.name}] Found {len(subdomains)} unique subdomains.")
+                logger.success("[%s] Found %s unique subdomains.", self.name, len(subdomains))
                 
-                # Add found subdomains to DB
-                for sub in subdomains:
-                    existing = db.get_target_by_hostname(sub)
-                    if not existing:
-                        db.add_target(hostname=sub)
-                        log_message("info", f"[{self.name}] Added new target: {sub}")
+                # Add found subdomains to DB in one batch
+                inserted, _ = db.add_targets_bulk(sorted(subdomains))
+                for sub in inserted:
+                    logger.info("[%s] Added new target: %s", self.name, sub)
             else:
-                log_message("error", f"[{self.name}] Failed to fetch data: HTTP {response.status_code}")
+                logger.error("[%s] Failed to fetch data: HTTP %s", self.name, response.status_code)
                 
         except Exception as e:
-            log_message("error", f"[{self.name}] Error: {str(e)}")
+            logger.error("[%s] Error: %s", self.name, str(e))
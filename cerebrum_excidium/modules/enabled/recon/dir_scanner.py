@@ -1,8 +1,13 @@
-import requests
 from modules.base_module import ReconModule
-from core.brain import log_message
+from core.logger import get_logger
+
+logger = get_logger(__name__)
 
 class DirScannerModule(ReconModule):
+    http_module = True
+    result_kind = "dir_scan"
+    freshness_ttl = 3600
+
     def __init__(self):
         super().__init__()
         self.name = "Web Directory Scanner"
@@ -15,18 +20,18 @@ class DirScannerModule(ReconModule):
     def run(self, target_hostname):
         """
         Scans for common directories on the target.
-        Returns a dict with found paths.
+        Returns the list of found paths ({'url', 'status'}) or None.
         """
         found_paths = []
         protocols = ["http", "https"]
         
-        log_message("info", f"[{self.name}] Scanning {target_hostname} for {len(self.common_paths)} common paths...")
+        logger.info("[%s] Scanning %s for %s common paths...", self.name, target_hostname, len(self.common_paths))
         
         for proto in protocols:
             base_url = f"{proto}://{target_hostname}"
             try:
                 # Check root first to see if reachable
-                if requests.get(base_url, timeout=3).status_code not in [200, 403]:
+                if self.cached_get(base_url, timeout=3).status_code not in [200, 403]:
                     continue
             except:
                 continue
@@ -34,13 +39,11 @@ class DirScannerModule(ReconModule):
             for path in self.common_paths:
                 url = f"{base_url}/{path}/"
                 try:
-                    res = requests.get(url, timeout=2, allow_redirects=False)
+                    res = self.http.get(url, timeout=2, allow_redirects=False)
                     if res.status_code in [200, 403, 301, 302]:
                          found_paths.append({"url": url, "status": res.status_code})
-                         log_message("success", f"[{self.name}] Found: {url} ({res.status_code})")
+                         logger.success("[%s] Found: %s (%s)", self.name, url, res.status_code)
                 except:
                     pass
         
-        if found_paths:
-            return {"dir_scan": found_paths}
-        return None
+        return found_paths or None
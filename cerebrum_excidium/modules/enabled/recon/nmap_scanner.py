@@ -1,73 +1,86 @@
 
-import nmap
+import os
+import shutil
 import socket
-from utils import log_message
+import subprocess
+from core import nmap_xml
+from core.logger import get_logger
 from modules.base_module import ReconModule
 
+logger = get_logger(__name__)
+
 class NmapScannerModule(ReconModule):
+    result_kind = "port_scan"
+    freshness_ttl = 21600     # 6 hours; a literal, so the module manifest can read it
+    scan_timeout = 3 * 3600   # seconds; nmap is killed after this
+
     def __init__(self):
         super().__init__()
         self.name = "Nmap Port Scanner"
         self.description = "Investigates a target using Nmap to find open ports and services."
-        try:
-            self.nm = nmap.PortScanner()
-        except nmap.PortScannerError:
-            log_message("error", "Nmap binary not found. NmapScannerModule will be disabled.")
-            self.nm = None
-        except Exception as e:
-            log_message("error", f"Error initializing NmapPortScanner: {e}")
-            self.nm = None
+        self.nmap_path = shutil.which("nmap")
+        if not self.nmap_path:
+            logger.error("Nmap binary not found. NmapScannerModule will be disabled.")
 
     def run(self, target_hostname):
         """
         Investigates a single target using Nmap.
         This is the core logic of the module.
         """
-        if not self.nm:
-            log_message("warning", f"Skipping Nmap investigation for {target_hostname}: Nmap is not available.")
+        if not self.nmap_path:
+            logger.warning("Skipping Nmap investigation for %s: Nmap is not available.", target_hostname)
             return None
 
         try:
             ip_address = socket.gethostbyname(target_hostname)
-            log_message("info", f"Resolved {target_hostname} to {ip_address}.")
+            logger.info("Resolved %s to %s.", target_hostname, ip_address)
         except socket.gaierror:
-            log_message("error", f"Could not resolve hostname {target_hostname}. Skipping scan.")
+            logger.error("Could not resolve hostname %s. Skipping scan.", target_hostname)
             return None
 
-        log_message("info", f"Starting Evasive Nmap port scan on {ip_address} ({target_hostname})...")
+        logger.info("Starting Evasive Nmap port scan on %s (%s)...", ip_address, target_hostname)
         try:
             # -sT: TCP Connect (Non-privileged), -T2: Slow/sneaky timing, --scan-delay: avoid IDS, -D RND:10: use decoys
             # Changed from -sS (root required) to -sT for unprivileged safety
             evasive_args = '-sT -T2 --scan-delay 1s -D RND:10 -Pn'
-            log_message("debug", f"Nmap arguments: {evasive_args}")
-            self.nm.scan(hosts=ip_address, arguments=evasive_args)
-            
-            host_info = self.nm[ip_address] if ip_address in self.nm else None
+            logger.debug("Nmap arguments: %s", evasive_args)
+            # nmap writes its XML straight into the scan archive; it is kept
+            # gzipped so the scan can be ingested again without rerunning it.
+            # Output of a failed or killed scan is incomplete and is removed,
+            # so the archive only ever holds finished, compressed scans.
+            xml_path = nmap_xml.archive_path(target_hostname)
+            try:
+                proc = subprocess.run([self.nmap_path, *evasive_args.split(), '-oX', xml_path, ip_address],
+                                      stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+                                      timeout=self.scan_timeout)
+                if proc.returncode != 0:
+                    logger.error("Nmap scan of %s failed: %s", target_hostname, proc.stderr.strip())
+                    return None
+                xml_path = nmap_xml.compress(xml_path)
+            except subprocess.TimeoutExpired:
+                logger.error("Nmap scan of %s timed out after %ss.", target_hostname, self.scan_timeout)
+                return None
+            finally:
+                if not xml_path.endswith(".gz") and os.path.exists(xml_path):
+                    os.remove(xml_path)
+
+            host_info = next(nmap_xml.iter_hosts(xml_path), None)
             if not host_info:
-                log_message("warning", f"Host {target_hostname} ({ip_address}) appears down or did not respond to Nmap scan.")
+                logger.warning("Host %s (%s) appears down or did not respond to Nmap scan.",
+                               target_hostname, ip_address)
                 return None
 
             scan_results = {
                 "host": target_hostname,
                 "ip": ip_address,
-                "state": host_info.state(),
-                "protocols": {}
+                "state": host_info['state'],
+                "protocols": host_info['protocols'],
+                "xml": xml_path
             }
-
-            for proto in host_info.all_protocols():
-                scan_results["protocols"][proto] = {}
-                for port_num, port_data in host_info[proto].items():
-                    if port_data['state'] == 'open':
-                        scan_results["protocols"][proto][port_num] = {
-                            "name": port_data.get('name', 'unknown'),
-                            "product": port_data.get('product', 'unknown'),
-                            "version": port_data.get('version', 'unknown'),
-                            "state": port_data.get('state'),
-                            "reason": port_data.get('reason', 'unknown')
-                        }
-            log_message("info", f"Nmap scan of {target_hostname} completed. Status: {host_info.state()}")
+            logger.info("Nmap scan of %s completed. Status: %s (raw XML: %s)",
+                        target_hostname, host_info['state'], xml_path)
             return scan_results
 
         except Exception as e:
-            log_message("error", f"An unexpected error occurred during Nmap scan of {target_hostname}: {e}")
+            logger.error("An unexpected error occurred during Nmap scan of %s: %s", target_hostname, e)
             return None
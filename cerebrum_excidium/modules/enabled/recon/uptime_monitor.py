@@ -1,9 +1,13 @@
-import requests
-import time
 from modules.base_module import ReconModule
-from core.brain import log_message
+from core.logger import get_logger
+from core.reachability import probe_scheme
+
+logger = get_logger(__name__)
 
 class UptimeMonitorModule(ReconModule):
+    result_kind = "uptime"
+    freshness_ttl = 60
+
     def __init__(self):
         super().__init__()
         self.name = "Uptime Monitor"
@@ -12,39 +16,39 @@ class UptimeMonitorModule(ReconModule):
     def run(self, target_hostname):
         """
         Checks if the target is up and measures latency.
-        Returns a dict compatible with Recon results.
+        Returns a dict with the overall status, code, latency and URL, plus
+        the check of each scheme under 'schemes'.
         """
-        log_message("info", f"[{self.name}] Pinging {target_hostname} (HTTP)...")
+        logger.info("[%s] Pinging %s (HTTP and HTTPS)...", self.name, target_hostname)
         
         protocols = ["https", "http"]
         result = None
+        schemes = {}
         
+        # Both schemes are checked (not just the first that answers) so that
+        # the reachability profile learns about each of them. A scheme that
+        # answered at all, with any status code, is up; the target is DOWN
+        # only when neither scheme answered.
         for proto in protocols:
-            url = f"{proto}://{target_hostname}"
-            try:
-                start_time = time.time()
-                res = requests.get(url, timeout=5)
-                latency = (time.time() - start_time) * 1000 # ms
-                
-                status = "UP" if res.status_code < 500 else "DOWN"
-                color = "success" if status == "UP" else "error"
-                
-                log_message(color, f"[{self.name}] Target {target_hostname} is {status} ({res.status_code}). Latency: {latency:.2f}ms")
-                
-                result = {
-                    "uptime_scan": {
-                        "status": status,
-                        "code": res.status_code,
-                        "latency_ms": round(latency, 2),
-                        "url": url
-                    }
-                }
-                break # Stop if we got a response
-            except Exception:
+            check = probe_scheme(target_hostname, proto, self.response_cache, timeout=5)
+            schemes[proto] = check
+            if not check['reachable'] or result:
                 continue
+            
+            url = f"{proto}://{target_hostname}"
+            logger.success("[%s] Target %s is UP (%s). Latency: %.2fms",
+                           self.name, target_hostname, check['status_code'], check['rtt_ms'])
+            
+            result = {
+                "status": "UP",
+                "code": check['status_code'],
+                "latency_ms": check['rtt_ms'],
+                "url": url,
+                "schemes": schemes
+            }
         
         if not result:
-            log_message("warning", f"[{self.name}] Target {target_hostname} seems DOWN or unreachable.")
-            return {"uptime_scan": {"status": "DOWN", "latency_ms": 0}}
+            logger.warning("[%s] Target %s seems DOWN or unreachable.", self.name, target_hostname)
+            return {"status": "DOWN", "latency_ms": 0, "schemes": schemes}
             
         return result
@@ -1,12 +1,21 @@
 #!/usr/bin/env python3
 import sys
+from core.profiler import profiler
+
+# Must happen before the heavy imports below so their cost is recorded
+if '--profile-startup' in sys.argv:
+    profiler.enable()
+
 import time
 import argparse
 from core.brain import Brain
+from core.exporters import EXPORTERS
+from core.logger import LEVELS, configure_logging, flush_logs
+from core.scope import load_scope
 
 class SaintJosephBot:
-    def __init__(self):
-        self.brain = Brain()
+    def __init__(self, analysis_workers=None):
+        self.brain = Brain(analysis_workers=analysis_workers)
         self.running = True
 
     def display_banner(self):
@@ -78,12 +87,12 @@ class SaintJosephBot:
 
     def print_menu(self):
         print("\n=== COMMAND CENTER ===")
-        print("1. Scan Target (Recon)")
+        print("1. Scan Target (Recon) (or: scan --force to ignore fresh stored results)")
         print("2. Analyze Target (Vulnerability Check)")
         print("3. Attack Target (Exploit)")
-        print("4. Status Report")
+        print("4. Status Report (or: status --perf)")
         print("5. Toggle Self-Protection (Tor)") 
-        print("6. Generate Mission Report")
+        print("6. Generate Mission Report (or: report [markdown|jsonl|csv|html] [--full])")
         print("7. Exit")
         print("======================")
 
@@ -93,6 +102,8 @@ class SaintJosephBot:
         
         while self.running:
             try:
+                # Let queued log lines print before the prompt does
+                flush_logs()
                 cmd = input("\nSAINT-JOSEPH> ").strip().lower()
                 
                 if cmd in ['help', 'menu', '?']:
@@ -103,10 +114,11 @@ class SaintJosephBot:
                     self.running = False
                     
                 elif cmd.startswith('scan') or cmd == '1':
+                    # 'scan --force' reruns modules whose stored results are still fresh
                     target = input("Target Hostname/IP: ").strip()
                     if target:
                         print(f"[*] Initiating Recon on {target}...")
-                        self.brain.interactive_recon(target)
+                        self.brain.interactive_recon(target, force='--force' in cmd)
                         
                 elif cmd == '2':
                     target_id = input("Target ID to Analyze (leave empty for auto): ").strip()
@@ -118,15 +130,23 @@ class SaintJosephBot:
                     print(f"[*] AUTHORIZED. Launching Exploitation...")
                     self.brain.interactive_exploitation(target_id)
 
-                elif cmd == '4':
-                     self.brain.print_status()
+                elif cmd == '4' or cmd.startswith('status'):
+                    # 'status --perf' adds per-module latency percentiles
+                    self.brain.print_status(perf='--perf' in cmd)
 
                 elif cmd == '5':
                     current = self.brain.toggle_protection()
                     print(f"[*] Self-Protection Mode: {'ENABLED (Tor)' if current else 'DISABLED'}")
                     
-                elif cmd == '6':
-                    self.brain.generate_report()
+                elif cmd == '6' or cmd.startswith('report'):
+                    # e.g. 'report', 'report html', 'report --full' (rebuild every section)
+                    args = cmd.split()[1:]
+                    formats = [a for a in args if not a.startswith('--')]
+                    fmt = formats[0] if formats else 'markdown'
+                    if fmt not in EXPORTERS:
+                        print(f"[-] Unknown report format '{fmt}'. Choose from: {', '.join(EXPORTERS)}")
+                    else:
+                        self.brain.generate_report(fmt=fmt, incremental='--full' not in args)
 
                 else:
                     # Provide a "chat" like response or fallback
@@ -137,5 +157,24 @@ class SaintJosephBot:
                 self.running = False
 
 if __name__ == "__main__":
-    bot = SaintJosephBot()
+    parser = argparse.ArgumentParser(description="SAINT-JOSEPH interactive command center")
+    parser.add_argument('--profile-startup', action='store_true', help="Print a ranked table of startup costs and exit")
+    parser.add_argument('--log-level', choices=list(LEVELS), help="Minimum level to log (default: info)")
+    parser.add_argument('--log-file', help="Also write logs to this file as JSON lines")
+    parser.add_argument('--scope', help="Scope file (CIDRs, domains, *.wildcards, !exclusions); out-of-scope hosts are never targeted")
+    parser.add_argument('--analysis-workers', type=int, help="Analysis modules to run in parallel per target (default: 1)")
+    args = parser.parse_args()
+    configure_logging(level=args.log_level, log_file=args.log_file)
+    if args.scope:
+        load_scope(args.scope)
+
+    with profiler.timed('startup', 'SaintJosephBot.__init__'):
+        bot = SaintJosephBot(analysis_workers=args.analysis_workers)
+
+    if args.profile_startup:
+        # Plugins are normally constructed on first use; build them all here
+        bot.brain.module_manager.preload()
+        profiler.report()
+        sys.exit(0)
+
     bot.start()
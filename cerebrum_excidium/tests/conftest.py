@@ -0,0 +1,35 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import database as db
+from core.logger import set_level
+from core.scope import set_active_scope
+
+set_level('error')
+
+@pytest.fixture
+def kb(tmp_path, monkeypatch):
+    """A freshly migrated scratch Knowledge Base with no scope restriction."""
+    monkeypatch.setattr(db, "DB_PATH", str(tmp_path / "kb.db"))
+    set_active_scope(None)
+    db.initialize_db()
+    yield db
+    db.close_db_connection()
+
+@pytest.fixture
+def manager(kb):
+    """A ModuleManager with no modules loaded; tests install their own."""
+    from core.module_manager import ModuleManager
+
+    manager = ModuleManager(recon_workers=1)
+    manager.recon_modules = []
+    manager.analysis_modules = []
+    manager.exploitation_modules = []
+    manager.osint_modules = []
+    yield manager
+    manager.shutdown()
@@ -0,0 +1,90 @@
+from core.recon_results import DIR_SCAN
+from core.routing import RoutingIndex
+from modules.base_module import AnalysisModule, ReconModule
+
+class StubRecon(ReconModule):
+    result_kind = DIR_SCAN
+
+    def __init__(self, name, result=None, error=None):
+        super().__init__()
+        self.name = name
+        self.result = result
+        self.error = error
+        self.calls = 0
+
+    def run(self, target_hostname):
+        self.calls += 1
+        if self.error:
+            raise self.error
+        return self.result
+
+class StubAnalysis(AnalysisModule):
+    def __init__(self, name):
+        super().__init__()
+        self.name = name
+        self.calls = 0
+
+    def run(self, context):
+        self.calls += 1
+
+def test_checkpoint_round_trip(kb):
+    target_id = kb.add_target("web.lab.test")
+    kb.save_module_checkpoint(target_id, 'recon', "Dir Scan", [{"url": "/admin/", "status": 200}])
+    kb.save_module_checkpoint(target_id, 'analysis', "Header Check")
+    assert kb.get_module_checkpoints(target_id, 'recon') == {"Dir Scan": [{"url": "/admin/", "status": 200}]}
+    assert kb.get_module_checkpoints(target_id, 'analysis') == {"Header Check": None}
+
+    kb.clear_module_checkpoints(target_id, 'recon')
+    assert kb.get_module_checkpoints(target_id, 'recon') == {}
+    assert kb.get_module_checkpoints(target_id, 'analysis') == {"Header Check": None}
+
+def test_recon_resumes_from_checkpoints(manager, kb):
+    target_id = kb.add_target("web.lab.test")
+    done = StubRecon("First", [{"url": "/fresh/", "status": 200}])
+    pending = StubRecon("Second", [{"url": "/later/", "status": 200}])
+    manager.recon_modules = [done, pending]
+    # "First" finished before the restart
+    kb.save_module_checkpoint(target_id, 'recon', "First", [{"url": "/stored/", "status": 200}])
+
+    results = manager.run_recon_modules("web.lab.test", target_id)
+    assert (done.calls, pending.calls) == (0, 1)
+    assert [(r.module, r.data) for r in results] == [
+        ("First", [{"url": "/stored/", "status": 200}]),
+        ("Second", [{"url": "/later/", "status": 200}]),
+    ]
+    assert set(kb.get_module_checkpoints(target_id, 'recon')) == {"First", "Second"}
+
+def test_failed_recon_modules_are_not_checkpointed(manager, kb):
+    target_id = kb.add_target("web.lab.test")
+    soft = StubRecon("Soft Failure", None)
+    hard = StubRecon("Hard Failure", error=RuntimeError("boom"))
+    ok = StubRecon("Fine", [{"url": "/", "status": 200}])
+    manager.recon_modules = [soft, hard, ok]
+
+    manager.run_recon_modules("web.lab.test", target_id)
+    assert set(kb.get_module_checkpoints(target_id, 'recon')) == {"Fine"}
+
+    # After a restart only the failed modules run again
+    manager.run_recon_modules("web.lab.test", target_id)
+    assert (soft.calls, hard.calls, ok.calls) == (2, 2, 1)
+
+def test_analysis_resumes_from_checkpoints(manager, kb):
+    target_id = kb.add_target("web.lab.test")
+    done, pending = StubAnalysis("First"), StubAnalysis("Second")
+    manager.analysis_modules = [done, pending]
+    manager.analysis_routes = RoutingIndex(manager.analysis_modules)
+    kb.save_module_checkpoint(target_id, 'analysis', "First")
+
+    manager.run_analysis_modules(target_id)
+    assert (done.calls, pending.calls) == (0, 1)
+    assert set(kb.get_module_checkpoints(target_id, 'analysis')) == {"First", "Second"}
+
+def test_checkpoints_are_per_target(manager, kb):
+    first = kb.add_target("a.lab.test")
+    second = kb.add_target("b.lab.test")
+    module = StubRecon("Dir Scan", [{"url": "/", "status": 200}])
+    manager.recon_modules = [module]
+    kb.save_module_checkpoint(first, 'recon', "Dir Scan", [{"url": "/", "status": 200}])
+
+    manager.run_recon_modules("b.lab.test", second)
+    assert module.calls == 1
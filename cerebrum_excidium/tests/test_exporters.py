@@ -0,0 +1,80 @@
+import csv
+import io
+import json
+
+import pytest
+
+from core.exporters import EXPORTERS, CsvExporter
+from core.report_generator import ReportGenerator
+
+@pytest.fixture
+def report_kb(kb, tmp_path, monkeypatch):
+    """Two targets: one with ports, a finding and loot, one bare."""
+    monkeypatch.chdir(tmp_path)   # reports/ is created in the working directory
+    web = kb.add_target("web.lab.test")
+    kb.add_port_scan_results(web, {"ip": "10.0.0.5", "state": "up", "protocols": {"tcp": {
+        22: {"name": "ssh", "product": "OpenSSH", "version": "9.6", "state": "open"},
+        80: {"name": "http", "product": "nginx", "version": "", "state": "open"},
+    }}})
+    kb.add_vulnerability(web, "XSS", tool="probe", description="<script>alert(1)</script>", severity="high")
+    kb.add_credentials("s3cr3t", target_id=web, service="ssh", username="root")
+    kb.add_target("bare.lab.test")
+    return kb
+
+def export(fmt):
+    with open(ReportGenerator().export(fmt), encoding="utf-8", newline="") as f:
+        return f.read()
+
+def test_every_format_is_registered():
+    assert set(EXPORTERS) == {"markdown", "jsonl", "csv", "html"}
+    for name, cls in EXPORTERS.items():
+        assert cls.name == name and cls.extension
+
+def test_jsonl(report_kb):
+    records = [json.loads(line) for line in export("jsonl").splitlines()]
+    assert [r["hostname"] for r in records] == ["bare.lab.test", "web.lab.test"]   # newest first
+    bare, web = records
+    assert (bare["ports"], bare["vulnerabilities"], bare["credentials"]) == ([], [], [])
+    assert web["ip_address"] == "10.0.0.5"
+    assert [(p["port_number"], p["service_name"]) for p in web["ports"]] == [(22, "ssh"), (80, "http")]
+    assert [(v["type"], v["severity"]) for v in web["vulnerabilities"]] == [("XSS", "high")]
+    assert [(c["username"], c["password"]) for c in web["credentials"]] == [("root", "s3cr3t")]
+
+def test_csv(report_kb):
+    reader = csv.DictReader(io.StringIO(export("csv")))
+    assert reader.fieldnames == CsvExporter.columns
+    rows = list(reader)
+    assert [r["record_type"] for r in rows if r["hostname"] == "web.lab.test"] == \
+        ["target", "port", "port", "vulnerability", "credential"]
+    assert [r["record_type"] for r in rows if r["hostname"] == "bare.lab.test"] == ["target"]
+    vuln = next(r for r in rows if r["record_type"] == "vulnerability")
+    assert vuln["description"] == "<script>alert(1)</script>"
+    assert vuln["port"] == ""
+
+def test_html(report_kb):
+    page = export("html")
+    assert page.startswith("<!DOCTYPE html>")
+    assert page.endswith("</body></html>\n")
+    assert page.count("<section>") == 2
+    assert "<script>" not in page
+    assert "&lt;script&gt;alert(1)&lt;/script&gt;" in page
+    assert "<td>OpenSSH</td>" in page
+
+def test_markdown(report_kb):
+    with open(ReportGenerator().generate_report("markdown"), encoding="utf-8") as f:
+        report = f.read()
+    assert "**Total Targets**: 2" in report
+    assert "## Target: web.lab.test (10.0.0.5)" in report
+    assert "| 22 | tcp | ssh | OpenSSH | 9.6 |" in report
+    assert "## Target: bare.lab.test (N/A)" in report
+
+def test_empty_kb(kb, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert export("jsonl") == ""
+    assert export("csv").splitlines() == [",".join(CsvExporter.columns)]
+    assert "<section>" not in export("html")
+
+def test_unknown_format(kb, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with pytest.raises(ValueError):
+        ReportGenerator().export("pdf")
@@ -0,0 +1,50 @@
+import shutil
+import sqlite3
+
+import database as db
+import migrations
+
+TABLES = {"targets", "ports", "vulnerabilities", "credentials", "intelligence", "report_sections",
+          "module_runs", "reachability", "jobs", "module_checkpoints", "recon_freshness"}
+
+def tables(conn):
+    return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+def test_migrates_empty_database(tmp_path):
+    conn = sqlite3.connect(tmp_path / "empty.db", isolation_level=None)
+    assert migrations.migrate(conn) == migrations.LATEST_VERSION
+    assert migrations.get_schema_version(conn) == migrations.LATEST_VERSION
+    assert TABLES <= tables(conn)
+
+def test_migration_is_idempotent(tmp_path):
+    conn = sqlite3.connect(tmp_path / "empty.db", isolation_level=None)
+    migrations.migrate(conn)
+    before = conn.execute("SELECT sql FROM sqlite_master ORDER BY name").fetchall()
+    assert migrations.migrate(conn) == migrations.LATEST_VERSION
+    assert conn.execute("SELECT sql FROM sqlite_master ORDER BY name").fetchall() == before
+
+def test_migrates_step_by_step(tmp_path):
+    conn = sqlite3.connect(tmp_path / "empty.db", isolation_level=None)
+    for version, _, _ in migrations.MIGRATIONS:
+        assert migrations.migrate(conn, target_version=version) == version
+    assert TABLES <= tables(conn)
+
+def test_migrates_shipped_knowledge_base(tmp_path, monkeypatch):
+    # Work on a copy; the shipped KB itself must stay as it is
+    copy = tmp_path / "knowledge_base.db"
+    shutil.copyfile(db.DB_PATH, copy)
+    with sqlite3.connect(copy) as conn:
+        counts = {t: conn.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0]
+                  for t in ("targets", "ports", "vulnerabilities")}
+
+    monkeypatch.setattr(db, "DB_PATH", str(copy))
+    db.initialize_db()
+    conn = db.get_db_connection()
+    try:
+        assert migrations.get_schema_version(conn) == migrations.LATEST_VERSION
+        assert TABLES <= tables(conn)
+        for table, count in counts.items():
+            assert conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] == count
+        assert conn.execute("PRAGMA foreign_key_check").fetchall() == []
+    finally:
+        db.close_db_connection()
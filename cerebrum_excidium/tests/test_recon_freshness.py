@@ -0,0 +1,89 @@
+from core.recon_results import DIR_SCAN
+from modules.base_module import ReconModule
+
+class StubRecon(ReconModule):
+    """Returns a fixed result and counts how often it ran."""
+    result_kind = DIR_SCAN
+    freshness_ttl = 3600
+
+    def __init__(self, name, result):
+        super().__init__()
+        self.name = name
+        self.result = result
+        self.calls = 0
+
+    def run(self, target_hostname):
+        self.calls += 1
+        return self.result
+
+def scan(manager, db, target_id, force=False):
+    results = manager.run_recon_modules("web.lab.test", target_id, force=force)
+    # What Brain does once the phase's results are stored
+    db.clear_module_checkpoints(target_id, 'recon')
+    return results
+
+def test_fresh_result_is_reused(manager, kb):
+    target_id = kb.add_target("web.lab.test")
+    module = StubRecon("Dir Scan", [{"url": "/admin/", "status": 200}])
+    manager.recon_modules = [module]
+
+    first = scan(manager, kb, target_id)
+    second = scan(manager, kb, target_id)
+    assert module.calls == 1
+    assert first[0].age is None
+    assert second[0].data == first[0].data
+    assert second[0].age is not None and second[0].age >= 0
+
+def test_force_runs_again(manager, kb):
+    target_id = kb.add_target("web.lab.test")
+    module = StubRecon("Dir Scan", [{"url": "/admin/", "status": 200}])
+    manager.recon_modules = [module]
+    scan(manager, kb, target_id)
+    scan(manager, kb, target_id, force=True)
+    assert module.calls == 2
+
+def test_expired_result_is_not_reused(manager, kb):
+    target_id = kb.add_target("web.lab.test")
+    kb.save_recon_freshness(target_id, "Dir Scan", [{"url": "/old/", "status": 200}], 60)
+    assert "Dir Scan" in kb.get_fresh_recon_results(target_id)
+
+    with kb.transaction() as conn:
+        conn.execute("UPDATE recon_freshness SET last_run = datetime('now', '-2 minutes')")
+    assert kb.get_fresh_recon_results(target_id) == {}
+
+    module = StubRecon("Dir Scan", [{"url": "/new/", "status": 200}])
+    manager.recon_modules = [module]
+    results = scan(manager, kb, target_id)
+    assert module.calls == 1
+    assert results[0].data == [{"url": "/new/", "status": 200}]
+
+def test_none_result_is_not_kept(manager, kb):
+    target_id = kb.add_target("web.lab.test")
+    module = StubRecon("Port Scan", None)
+    manager.recon_modules = [module]
+
+    assert scan(manager, kb, target_id) == []
+    assert kb.get_db_connection().execute("SELECT COUNT(*) FROM recon_freshness").fetchone()[0] == 0
+    scan(manager, kb, target_id)
+    assert module.calls == 2
+
+def test_stored_null_is_a_miss(manager, kb):
+    # Rows like this were written by builds that saved soft failures
+    target_id = kb.add_target("web.lab.test")
+    kb.save_recon_freshness(target_id, "Port Scan", None, 3600)
+    assert kb.get_fresh_recon_results(target_id) == {}
+
+    module = StubRecon("Port Scan", {"host": "web.lab.test", "protocols": {}})
+    manager.recon_modules = [module]
+    scan(manager, kb, target_id)
+    assert module.calls == 1
+
+def test_zero_ttl_is_never_kept(manager, kb):
+    target_id = kb.add_target("web.lab.test")
+    module = StubRecon("Uptime", [{"url": "/", "status": 200}])
+    module.freshness_ttl = 0
+    manager.recon_modules = [module]
+    scan(manager, kb, target_id)
+    scan(manager, kb, target_id)
+    assert module.calls == 2
+    assert kb.get_fresh_recon_results(target_id) == {}
@@ -0,0 +1,120 @@
+import ipaddress
+
+import pytest
+
+import database as db
+from core.scope import Scope, in_scope, normalize_host, set_active_scope
+
+ENTRIES = [
+    "10.0.0.0/8",
+    "192.168.1.7",
+    "2001:db8::/32",
+    "example.com",
+    "*.corp.example",
+    "!10.66.0.0/16",
+    "!dev.corp.example",
+    "# comment line",
+    "",
+]
+
+def no_dns(host):
+    return []
+
+def resolver(table):
+    """A resolver answering from a {hostname: [addresses]} table."""
+    return lambda host: [ipaddress.ip_address(a) for a in table.get(host, [])]
+
+@pytest.fixture
+def scope():
+    return Scope(ENTRIES, resolver=no_dns)
+
+@pytest.mark.parametrize("target, expected", [
+    ("10.1.2.3", True),
+    ("10.66.1.1", False),            # excluded block inside an included one
+    ("11.0.0.1", False),
+    ("192.168.1.7", True),           # bare IP is a /32
+    ("192.168.1.8", False),
+    ("2001:db8::1", True),
+    ("2001:db9::1", False),
+    ("example.com", True),
+    ("www.example.com", False),      # exact entries do not cover subdomains
+    ("a.corp.example", True),
+    ("a.b.corp.example", True),
+    ("corp.example", False),         # wildcards do not cover the domain itself
+    ("dev.corp.example", False),
+    ("EXAMPLE.COM.", True),
+])
+def test_allows(scope, target, expected):
+    assert scope.allows(target) is expected
+
+@pytest.mark.parametrize("target, host", [
+    ("https://Example.com:8443/login", "example.com"),
+    ("example.com:80", "example.com"),
+    ("[2001:db8::1]:443", "2001:db8::1"),
+    ("2001:db8::1", "2001:db8::1"),
+    (" a.corp.example. ", "a.corp.example"),
+])
+def test_normalize_host(target, host):
+    assert normalize_host(target) == host
+
+def test_urls_and_ports_are_checked_by_host(scope):
+    assert scope.allows("http://10.1.2.3:8080/admin")
+    assert scope.allows("a.corp.example:22")
+    assert not scope.allows("https://dev.corp.example/")
+    assert not scope.allows("")
+
+def test_shorter_prefix_covers_longer():
+    narrow_then_wide = Scope(["10.1.2.0/24", "10.0.0.0/8"], resolver=no_dns)
+    wide_then_narrow = Scope(["10.0.0.0/8", "10.1.2.0/24"], resolver=no_dns)
+    for s in (narrow_then_wide, wide_then_narrow):
+        assert s.allows("10.200.0.1")
+        assert s.allows("10.1.2.3")
+
+def test_empty_scope_allows_everything():
+    assert Scope(resolver=no_dns).allows("anything.test")
+    assert Scope(["!bad.test"], resolver=no_dns).allows("good.test")
+    assert not Scope(["!bad.test"], resolver=no_dns).allows("bad.test")
+
+def test_hostname_resolved_against_cidrs():
+    s = Scope(["10.0.0.0/8", "!10.66.0.0/16"], resolver=resolver({
+        "inside.test": ["10.1.1.1"],
+        "split.test": ["10.1.1.1", "8.8.8.8"],
+        "excluded.test": ["10.1.1.1", "10.66.0.5"],
+    }))
+    assert s.allows("inside.test")
+    assert not s.allows("split.test")        # every address must be included
+    assert not s.allows("excluded.test")     # any excluded address excludes it
+    assert not s.allows("unresolvable.test")
+
+def test_resolver_only_used_when_cidrs_could_decide():
+    calls = []
+    def counting(host):
+        calls.append(host)
+        return []
+    s = Scope(["example.com", "*.corp.example"], resolver=counting)
+    assert s.allows("example.com")
+    assert not s.allows("other.test")
+    assert calls == []
+
+    s = Scope(["10.0.0.0/8", "example.com"], resolver=counting)
+    assert s.allows("example.com")           # decided by the domain entry
+    assert s.allows("10.0.0.1")
+    assert calls == []
+
+def test_from_file(tmp_path):
+    path = tmp_path / "scope.txt"
+    path.write_text("10.0.0.0/8  # lab\n*.lab.test\n!db.lab.test\n")
+    s = Scope.from_file(str(path))
+    assert len(s.include) == 2 and len(s.exclude) == 1
+    assert s.allows("web.lab.test")
+    assert not s.allows("db.lab.test")
+
+def test_active_scope_guards_the_kb(kb):
+    set_active_scope(Scope(["*.lab.test"], resolver=no_dns))
+    try:
+        assert in_scope("web.lab.test")
+        assert db.add_target("web.lab.test") is not None
+        assert db.add_target("elsewhere.test") is None
+        assert db.get_target_by_hostname("elsewhere.test") is None
+    finally:
+        set_active_scope(None)
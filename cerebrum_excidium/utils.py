@@ -1,9 +1,12 @@
 # Utility functions for Cerebrum Excidium
-import datetime
+from core.logger import LEVELS, get_logger
 
 def log_message(level, message):
     """
-    Simple logger to print messages with a timestamp and level.
+    Compatibility wrapper for modules written against the old print-based
+    logger. New code should use core.logger.get_logger(__name__) instead.
     """
-    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    print(f"[{timestamp}] [{level.upper()}] {message}")
+    logger = get_logger()
+    levelno = LEVELS.get(level.lower(), LEVELS["info"])
+    if logger.isEnabledFor(levelno):
+        logger.log(levelno, message)